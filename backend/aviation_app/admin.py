@@ -54,8 +54,8 @@ class FlyingOperationAdmin(admin.ModelAdmin):
 
 @admin.register(MaintenanceSchedule)
 class MaintenanceScheduleAdmin(admin.ModelAdmin):
-    list_display = ('aircraft', 'maintenance_type', 'scheduled_date', 'status', 'technician')
-    list_filter = ('maintenance_type', 'status', 'scheduled_date')
+    list_display = ('aircraft', 'maintenance_type', 'inspection_type', 'section', 'scheduled_date', 'status', 'technician')
+    list_filter = ('maintenance_type', 'section', 'status', 'scheduled_date')
     search_fields = ('aircraft__aircraft_number', 'technician__full_name')
     date_hierarchy = 'scheduled_date'
     ordering = ('-scheduled_date',)
@@ -5,3 +5,8 @@ class AviationAppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'aviation_app'
     verbose_name = 'Aviation Management'
+
+    def ready(self):
+        from . import checks, signals  # noqa: F401
+        # Instruments database connections as they open, so request metrics see every query
+        from . import metrics  # noqa: F401
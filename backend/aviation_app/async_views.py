@@ -0,0 +1,92 @@
+import asyncio
+
+from asgiref.sync import markcoroutinefunction, sync_to_async
+from django.conf import settings
+from rest_framework.settings import api_settings
+from rest_framework.views import APIView
+
+
+class AsyncDispatchMixin:
+    """
+    Dispatches DRF views as coroutines when ASYNC_VIEWS is on (asgi.py turns it on), so under
+    ASGI a request never blocks the event loop. Coroutine handlers are awaited after
+    authentication and permission checks; synchronous handlers, such as the ModelViewSet
+    actions, run together with those checks in one hop to the request's worker thread.
+    Under WSGI the regular synchronous dispatch is kept, avoiding an event loop per request.
+    """
+
+    @classmethod
+    def dispatches_async(cls):
+        return getattr(settings, 'ASYNC_VIEWS', False)
+
+    @classmethod
+    def as_view(cls, *args, **kwargs):
+        view = super().as_view(*args, **kwargs)
+        if cls.dispatches_async():
+            view = markcoroutinefunction(view)
+        return view
+
+    def dispatch(self, request, *args, **kwargs):
+        if self.dispatches_async():
+            return self.async_dispatch(request, *args, **kwargs)
+        return super().dispatch(request, *args, **kwargs)
+
+    def _get_handler(self, request):
+        if request.method.lower() in self.http_method_names:
+            return getattr(self, request.method.lower(), self.http_method_not_allowed)
+        return self.http_method_not_allowed
+
+    def _run_sync(self, handler, request, *args, **kwargs):
+        self.initial(request, *args, **kwargs)
+        return handler(request, *args, **kwargs)
+
+    async def async_dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            handler = self._get_handler(request)
+            if asyncio.iscoroutinefunction(handler):
+                await sync_to_async(self.initial)(request, *args, **kwargs)
+                response = await handler(request, *args, **kwargs)
+            else:
+                response = await sync_to_async(self._run_sync)(handler, request, *args, **kwargs)
+        except Exception as exc:
+            response = await sync_to_async(self.handle_exception)(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+
+class AsyncAPIView(AsyncDispatchMixin, APIView):
+    """APIView with `async def` handlers; always dispatched asynchronously"""
+
+    @classmethod
+    def dispatches_async(cls):
+        return True
+
+
+def async_api_view(http_method_names):
+    """Async counterpart of DRF's @api_view for `async def` function views"""
+    def decorator(func):
+        async def handler(self, *args, **kwargs):
+            return await func(*args, **kwargs)
+
+        attrs = {
+            '__doc__': func.__doc__,
+            'http_method_names': [method.lower() for method in http_method_names] + ['options'],
+            'renderer_classes': getattr(func, 'renderer_classes', api_settings.DEFAULT_RENDERER_CLASSES),
+            'parser_classes': getattr(func, 'parser_classes', api_settings.DEFAULT_PARSER_CLASSES),
+            'authentication_classes': getattr(func, 'authentication_classes', api_settings.DEFAULT_AUTHENTICATION_CLASSES),
+            'throttle_classes': getattr(func, 'throttle_classes', api_settings.DEFAULT_THROTTLE_CLASSES),
+            'permission_classes': getattr(func, 'permission_classes', api_settings.DEFAULT_PERMISSION_CLASSES),
+        }
+        for method in http_method_names:
+            attrs[method.lower()] = handler
+
+        view_class = type(func.__name__, (AsyncAPIView,), attrs)
+        return view_class.as_view()
+    return decorator
@@ -0,0 +1,160 @@
+"""
+List-payload create (POST) and partial update (PATCH) for viewsets. A batch is validated item
+by item with the referenced rows prefetched, then written with bulk_create/bulk_update in one
+transaction: either every item is saved or none is, and errors are reported per item.
+"""
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.routers import DefaultRouter
+
+from .prefetch import PrefetchedPrimaryKeyRelatedField
+from .signals import bulk_saved
+
+
+class BulkRouter(DefaultRouter):
+    """Routes PATCH on a list URL to the viewset's bulk_partial_update, when it has one"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        list_route = self.routes[0]
+        self.routes[0] = list_route._replace(mapping={**list_route.mapping, 'patch': 'bulk_partial_update'})
+
+
+def prefetch_related_rows(serializer, items):
+    """Load every row the items reference, one query per related model: {model: {pk: row}}"""
+    wanted = defaultdict(set)
+    querysets = {}
+    for field_name, field in serializer.fields.items():
+        if not isinstance(field, PrefetchedPrimaryKeyRelatedField) or field.read_only:
+            continue
+        model = field.get_queryset().model
+        querysets.setdefault(model, field.get_queryset())
+        for item in items:
+            value = item.get(field_name) if isinstance(item, dict) else None
+            if value is None:
+                continue
+            try:
+                wanted[model].add(model._meta.pk.to_python(value))
+            except (DjangoValidationError, TypeError):
+                # Reported by the field's own validation
+                pass
+    return {model: querysets[model].in_bulk(ids) for model, ids in wanted.items()}
+
+
+class BulkWriteViewSetMixin:
+    """
+    POST a list to create several rows; PATCH a list of objects with an `id` to update several.
+    Single-object requests behave as before. Related fields of the serializer must be
+    PrefetchedPrimaryKeyRelatedField for the batch to need one query per related model.
+    """
+    bulk_batch_size = 500
+
+    def bulk_error(self, message):
+        return Response({'error': message}, status=status.HTTP_400_BAD_REQUEST)
+
+    def check_bulk_payload(self, items):
+        limit = getattr(settings, 'BULK_MAX_ITEMS', 1000)
+        if not items:
+            return self.bulk_error('Expected a non-empty list of objects')
+        if len(items) > limit:
+            return self.bulk_error(f'At most {limit} objects can be sent at once')
+        return None
+
+    def bulk_context(self, items):
+        context = self.get_serializer_context()
+        context['prefetched'] = prefetch_related_rows(self.get_serializer_class()(context=context), items)
+        return context
+
+    def bulk_errors(self, errors):
+        """400 listing each failed item by its position in the payload"""
+        return Response(
+            {'errors': [{'index': index, **({'id': item_id} if item_id is not None else {}), 'errors': error}
+                        for index, item_id, error in errors]},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    def create(self, request, *args, **kwargs):
+        if not isinstance(request.data, list):
+            return super().create(request, *args, **kwargs)
+        items = request.data
+        invalid = self.check_bulk_payload(items)
+        if invalid:
+            return invalid
+
+        serializer_class = self.get_serializer_class()
+        context = self.bulk_context(items)
+        model = serializer_class.Meta.model
+        instances, errors = [], []
+        for index, item in enumerate(items):
+            serializer = serializer_class(data=item, context=context)
+            if serializer.is_valid():
+                instances.append(model(**serializer.validated_data))
+            else:
+                errors.append((index, None, serializer.errors))
+        if errors:
+            return self.bulk_errors(errors)
+
+        with transaction.atomic():
+            model.objects.bulk_create(instances, batch_size=self.bulk_batch_size)
+            bulk_saved(model, instances)
+        return Response(serializer_class(instances, many=True, context=context).data, status=status.HTTP_201_CREATED)
+
+    def bulk_partial_update(self, request, *args, **kwargs):
+        items = request.data
+        if not isinstance(items, list):
+            return self.bulk_error('Expected a list of objects, each with an id')
+        invalid = self.check_bulk_payload(items)
+        if invalid:
+            return invalid
+
+        errors = []
+        ids = set()
+        for index, item in enumerate(items):
+            item_id = item.get('id') if isinstance(item, dict) else None
+            if not isinstance(item_id, int) or isinstance(item_id, bool):
+                errors.append((index, None, {'id': ['An integer id is required']}))
+            elif item_id in ids:
+                errors.append((index, item_id, {'id': ['Listed more than once']}))
+            ids.add(item_id)
+        if errors:
+            return self.bulk_errors(errors)
+
+        serializer_class = self.get_serializer_class()
+        model = serializer_class.Meta.model
+        existing = self.filter_queryset(self.get_queryset()).in_bulk(list(ids))
+        context = self.bulk_context(items)
+        instances, changed_fields, previous_aircraft = [], set(), set()
+        for index, item in enumerate(items):
+            instance = existing.get(item['id'])
+            if instance is None:
+                errors.append((index, item['id'], {'id': ['Not found']}))
+                continue
+            serializer = serializer_class(instance, data=item, partial=True, context=context)
+            if not serializer.is_valid():
+                errors.append((index, item['id'], serializer.errors))
+                continue
+            previous_aircraft.add(getattr(instance, 'aircraft_id', None))
+            for name, value in serializer.validated_data.items():
+                setattr(instance, name, value)
+                changed_fields.add(name)
+            instances.append(instance)
+        if errors:
+            return self.bulk_errors(errors)
+
+        if changed_fields:
+            if any(field.name == 'updated_at' for field in model._meta.concrete_fields):
+                # bulk_update does not apply auto_now
+                now = timezone.now()
+                for instance in instances:
+                    instance.updated_at = now
+                changed_fields.add('updated_at')
+            with transaction.atomic():
+                model.objects.bulk_update(instances, sorted(changed_fields), batch_size=self.bulk_batch_size)
+                bulk_saved(model, instances, previous_aircraft)
+        return Response(serializer_class(instances, many=True, context=context).data)
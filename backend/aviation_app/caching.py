@@ -0,0 +1,65 @@
+import functools
+import hashlib
+import uuid
+from urllib.parse import urlencode
+
+from django.core.cache import cache
+from django.db.models import QuerySet
+from rest_framework.response import Response
+
+# Namespaces of cached reference data and the models whose changes invalidate them
+AIRCRAFT_NAMESPACE = 'aircraft'
+LEADING_PARTICULARS_NAMESPACE = 'leading-particulars'
+PERSONNEL_NAMESPACE = 'personnel'
+
+
+def _version_key(namespace):
+    return f'read-through:{namespace}:version'
+
+
+def namespace_version(namespace):
+    version = cache.get(_version_key(namespace))
+    if version is None:
+        version = uuid.uuid4().hex
+        # add() so concurrent first readers agree on one version
+        if not cache.add(_version_key(namespace), version, None):
+            version = cache.get(_version_key(namespace), version)
+    return version
+
+
+def invalidate_namespace(namespace):
+    """Make every cached response in the namespace unreachable; old entries expire on their own"""
+    cache.set(_version_key(namespace), uuid.uuid4().hex, None)
+
+
+def response_cache_key(namespace, request, kwargs):
+    query = urlencode(sorted(request.query_params.lists()), doseq=True)
+    # Scheme and host too: list responses hold absolute next/previous links
+    url = f'{request.scheme}://{request.get_host()}{request.path}?{query}'
+    digest = hashlib.md5(f'{url}:{sorted(kwargs.items())}'.encode('utf-8')).hexdigest()
+    return f'read-through:{namespace}:{namespace_version(namespace)}:{digest}'
+
+
+def read_through(namespace, timeout=None):
+    """
+    Cache successful GET responses of a view method in the shared cache, keyed by scheme, host,
+    path and query parameters. Entries are dropped by invalidate_namespace() from model signals.
+    """
+    def decorator(view_method):
+        @functools.wraps(view_method)
+        def wrapper(self, request, *args, **kwargs):
+            if request.method != 'GET':
+                return view_method(self, request, *args, **kwargs)
+
+            key = response_cache_key(namespace, request, kwargs)
+            data = cache.get(key)
+            if data is not None:
+                return Response(data)
+
+            response = view_method(self, request, *args, **kwargs)
+            if response.status_code == 200:
+                data = list(response.data) if isinstance(response.data, QuerySet) else response.data
+                cache.set(key, data, timeout)
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,37 @@
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.core.checks import Tags, Warning, register
+from rest_framework_simplejwt.settings import api_settings
+
+
+def _redis_server(location):
+    url = urlsplit(location)
+    return url.hostname, url.port or 6379
+
+
+@register(Tags.security, deploy=True)
+def check_token_cache(app_configs, **kwargs):
+    """Revoked refresh tokens live in the 'tokens' cache; a per-process one only protects its own worker"""
+    tokens = settings.CACHES.get('tokens', settings.CACHES['default'])
+    if not api_settings.BLACKLIST_AFTER_ROTATION:
+        return []
+    if tokens['BACKEND'].endswith('LocMemCache'):
+        return [Warning(
+            'Revoked refresh tokens are kept in a per-process cache, so a rotated or logged-out '
+            'refresh token is still accepted by every other worker.',
+            hint="Set CACHE_BACKEND to 'redis' (or 'file' for workers on one host).",
+            id='aviation_app.W001',
+        )]
+    default = settings.CACHES['default']
+    if tokens['BACKEND'].endswith('RedisCache') and default['BACKEND'].endswith('RedisCache') and (
+        _redis_server(tokens['LOCATION']) == _redis_server(default['LOCATION'])
+    ):
+        return [Warning(
+            'Revoked refresh tokens share a Redis server with the general cache, whose eviction '
+            'policy or restart can drop them and accept the revoked tokens again.',
+            hint='Point TOKEN_CACHE_LOCATION at a Redis server of its own, run with '
+                 'maxmemory-policy noeviction and append-only persistence.',
+            id='aviation_app.W002',
+        )]
+    return []
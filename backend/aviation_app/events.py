@@ -0,0 +1,217 @@
+import asyncio
+import json
+import logging
+import threading
+import time
+from collections import defaultdict, deque
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.module_loading import import_string
+
+from .models import BeforeFlyingService, PilotAcceptance, PostFlying
+
+logger = logging.getLogger(__name__)
+
+# Fields whose changes are pushed to workflow event streams, per model and event name
+WORKFLOW_MODELS = {
+    BeforeFlyingService: 'bfs',
+    PilotAcceptance: 'pilot_acceptance',
+    PostFlying: 'post_flying',
+}
+WORKFLOW_FIELDS = {
+    model: tuple(
+        field.attname for field in model._meta.concrete_fields
+        if field.name in ('status', 'flight_status') or field.name.endswith('_signed_at')
+    )
+    for model in WORKFLOW_MODELS
+}
+
+
+def workflow_state(instance):
+    """Current values of the instance's workflow fields; deferred fields are left out rather than loaded"""
+    return {
+        name: instance.__dict__[name]
+        for name in WORKFLOW_FIELDS[type(instance)] if name in instance.__dict__
+    }
+
+
+class Subscription:
+    """
+    Events for one stream, buffered until read. If the reader falls more than `max_pending`
+    events behind, the oldest are dropped and the next read reports `overflowed` so the
+    client can re-fetch the records instead of applying an incomplete set of diffs.
+    """
+
+    def __init__(self, broker, channels, max_pending):
+        self.broker = broker
+        self.channels = channels
+        self._pending = deque(maxlen=max_pending)
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self._async_waiter = None
+        self.overflowed = False
+
+    def deliver(self, message):
+        with self._lock:
+            if len(self._pending) == self._pending.maxlen:
+                self.overflowed = True
+            self._pending.append(message)
+            self._ready.set()
+            waiter = self._async_waiter
+        if waiter is not None:
+            loop, event = waiter
+            loop.call_soon_threadsafe(event.set)
+
+    def _drain(self):
+        with self._lock:
+            messages = list(self._pending)
+            self._pending.clear()
+            self._ready.clear()
+            overflowed, self.overflowed = self.overflowed, False
+        return messages, overflowed
+
+    def get(self, timeout):
+        """Wait up to `timeout` seconds; returns (messages, overflowed)"""
+        self._ready.wait(timeout)
+        return self._drain()
+
+    async def aget(self, timeout):
+        event = asyncio.Event()
+        with self._lock:
+            self._async_waiter = (asyncio.get_running_loop(), event)
+            if self._pending:
+                event.set()
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            with self._lock:
+                self._async_waiter = None
+        return self._drain()
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class InProcessBroker:
+    """Fans events out to the streams open in this process only"""
+
+    def __init__(self):
+        self._subscribers = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def subscribe(self, channels):
+        subscription = Subscription(self, channels, getattr(settings, 'EVENT_STREAM_BUFFER', 100))
+        with self._lock:
+            for channel in channels:
+                self._subscribers[channel].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            for channel in subscription.channels:
+                self._subscribers[channel].discard(subscription)
+                if not self._subscribers[channel]:
+                    del self._subscribers[channel]
+
+    def publish(self, channel, message):
+        self.deliver(channel, message)
+
+    def deliver(self, channel, message):
+        with self._lock:
+            subscribers = list(self._subscribers.get(channel, ()))
+        for subscription in subscribers:
+            subscription.deliver(message)
+
+
+class RedisBroker(InProcessBroker):
+    """
+    Relays events through Redis pub/sub, so a stream served by any worker or replica sees
+    events published by all of them. One listener thread per process delivers them locally.
+    """
+    prefix = 'aviation-events:'
+
+    def __init__(self):
+        super().__init__()
+        import redis
+        self._redis = redis.Redis.from_url(settings.EVENT_BROKER_URL)
+        self._listener = None
+        self._listener_lock = threading.Lock()
+
+    def subscribe(self, channels):
+        with self._listener_lock:
+            if self._listener is None or not self._listener.is_alive():
+                self._listener = threading.Thread(target=self._listen, name='event-broker', daemon=True)
+                self._listener.start()
+        return super().subscribe(channels)
+
+    def publish(self, channel, message):
+        self._redis.publish(self.prefix + channel, json.dumps(message, cls=DjangoJSONEncoder))
+
+    def _listen(self):
+        import redis
+        while True:
+            try:
+                pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+                pubsub.psubscribe(self.prefix + '*')
+                for item in pubsub.listen():
+                    channel = item['channel'].decode('utf-8')[len(self.prefix):]
+                    self.deliver(channel, json.loads(item['data']))
+            except redis.RedisError:
+                logger.exception('Event broker lost its Redis connection; reconnecting')
+                time.sleep(1)
+
+
+EVENT_BROKERS = {
+    'inprocess': 'aviation_app.events.InProcessBroker',
+    'redis': 'aviation_app.events.RedisBroker',
+}
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    """The process-wide broker named by EVENT_BROKER: 'inprocess', 'redis' or a dotted class path"""
+    global _broker
+    with _broker_lock:
+        if _broker is None:
+            name = getattr(settings, 'EVENT_BROKER', 'inprocess')
+            _broker = import_string(EVENT_BROKERS.get(name, name))()
+        return _broker
+
+
+def aircraft_channel(aircraft_id):
+    return f'aircraft:{aircraft_id}'
+
+
+def bfs_channel(bfs_id):
+    return f'bfs:{bfs_id}'
+
+
+def publish_workflow_change(model, record_id, aircraft_id, bfs_id, changes, created):
+    """Send one compact diff to the record's aircraft stream and its BFS record stream"""
+    message = {
+        'event': WORKFLOW_MODELS[model],
+        'data': json.loads(json.dumps({
+            'id': record_id,
+            'aircraft_id': aircraft_id,
+            'bfs_id': bfs_id,
+            'created': created,
+            'changes': changes,
+        }, cls=DjangoJSONEncoder)),
+    }
+    try:
+        broker = get_broker()
+        broker.publish(aircraft_channel(aircraft_id), message)
+        if bfs_id is not None:
+            broker.publish(bfs_channel(bfs_id), message)
+    except Exception:
+        # Runs after the write committed: a broker outage costs live updates, not the request
+        logger.exception('Could not publish %s %s change', WORKFLOW_MODELS[model], record_id)
+
+
+def format_event(message):
+    return f"event: {message['event']}\ndata: {json.dumps(message['data'], separators=(',', ':'))}\n\n"
@@ -0,0 +1,172 @@
+"""
+Streaming CSV and NDJSON export of flight, defect and maintenance history. Rows are read as
+value tuples through a database iterator (a server-side cursor on PostgreSQL), `chunk_size` at
+a time, and written out one block per chunk, so memory use does not depend on the row count.
+
+Foreign keys are exported by natural key, so the files read the same on any installation:
+an aircraft column holds the aircraft number and a user column the personnel number (pno).
+"""
+import csv
+import io
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
+from .models import Aircraft, User, FlyingOperation, DeferredDefect, MaintenanceSchedule
+
+NATURAL_KEYS = {Aircraft: 'aircraft_number', User: 'pno'}
+
+CONTENT_TYPES = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+}
+
+
+class Export:
+    """One exportable model: its columns as (header, ORM path) pairs and the field date ranges filter on"""
+
+    def __init__(self, model, date_field):
+        self.model = model
+        self.date_field = date_field
+        self.columns = []
+        for field in model._meta.concrete_fields:
+            if field.is_relation:
+                self.columns.append((field.name, f'{field.name}__{NATURAL_KEYS[field.related_model]}'))
+            else:
+                self.columns.append((field.name, field.attname))
+
+    @property
+    def headers(self):
+        return [header for header, path in self.columns]
+
+    def queryset(self, aircraft_id=None, start=None, end=None):
+        """Matching rows as value tuples, in the model's usual order"""
+        queryset = self.model.objects.all()
+        if aircraft_id:
+            queryset = queryset.filter(aircraft_id=aircraft_id)
+        if start:
+            queryset = queryset.filter(**{f'{self.date_field}__gte': start})
+        if end:
+            queryset = queryset.filter(**{f'{self.date_field}__lte': end})
+        ordering = [*self.model._meta.ordering, '-pk']
+        return queryset.order_by(*ordering).values_list(*(path for header, path in self.columns))
+
+
+EXPORTS = {
+    'flying-operations': Export(FlyingOperation, 'flight_date'),
+    'deferred-defects': Export(DeferredDefect, 'reported_date'),
+    'maintenance-schedules': Export(MaintenanceSchedule, 'scheduled_date'),
+}
+
+
+def _chunks(rows, chunk_size):
+    chunk = []
+    for row in rows.iterator(chunk_size=chunk_size):
+        chunk.append(row)
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+JSON_ENCODER = DjangoJSONEncoder(separators=(',', ':'))
+
+
+def _csv_value(value):
+    if value is None:
+        return ''
+    if hasattr(value, 'isoformat'):
+        # Dates and times written as in the NDJSON export
+        return JSON_ENCODER.default(value)
+    return value
+
+
+def export_csv(export, rows, chunk_size):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(export.headers)
+    for chunk in _chunks(rows, chunk_size):
+        writer.writerows([_csv_value(value) for value in row] for row in chunk)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    # The header row alone, when nothing matched
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def export_ndjson(export, rows, chunk_size):
+    headers = export.headers
+    for chunk in _chunks(rows, chunk_size):
+        yield ''.join(JSON_ENCODER.encode(dict(zip(headers, row))) + '\n' for row in chunk)
+
+
+WRITERS = {
+    'csv': export_csv,
+    'ndjson': export_ndjson,
+}
+
+
+def export_blocks(name, file_format, chunk_size=None, **filters):
+    """The export as text blocks of up to `chunk_size` rows each (default EXPORT_CHUNK_SIZE)"""
+    export = EXPORTS[name]
+    chunk_size = chunk_size or getattr(settings, 'EXPORT_CHUNK_SIZE', 2000)
+    return WRITERS[file_format](export, export.queryset(**filters), chunk_size)
+
+
+async def aiter_blocks(blocks):
+    """
+    Serve `export_blocks` from an async view. Each block is produced on the request's thread,
+    where the database cursor lives, one hop per block, instead of Django collecting the whole
+    synchronous iterator into a list before sending any of it.
+    """
+    next_block = sync_to_async(next, thread_sensitive=True)
+    while True:
+        block = await next_block(blocks, None)
+        if block is None:
+            return
+        yield block
+
+
+class ExportViewSetMixin:
+    """
+    Adds GET `export/csv/` and `export/ndjson/` to a viewset, streaming the `export_name` export
+    filtered by `?aircraft_id=` and by `?start=` / `?end=` dates, inclusive.
+    """
+    export_name = None
+
+    @action(detail=False, methods=['get'], url_path=r'export/(?P<file_format>csv|ndjson)')
+    def export(self, request, file_format):
+        filters = {}
+        aircraft_id = request.query_params.get('aircraft_id')
+        if aircraft_id:
+            if not aircraft_id.isdigit():
+                return Response({'error': 'aircraft_id must be a number'}, status=status.HTTP_400_BAD_REQUEST)
+            filters['aircraft_id'] = int(aircraft_id)
+        for param in ('start', 'end'):
+            value = request.query_params.get(param)
+            if value:
+                try:
+                    filters[param] = parse_date(value) if len(value) == 10 else None
+                except ValueError:
+                    filters[param] = None
+                if filters[param] is None:
+                    return Response({'error': f'{param} must be a date as YYYY-MM-DD'}, status=status.HTTP_400_BAD_REQUEST)
+
+        blocks = export_blocks(self.export_name, file_format, **filters)
+        if getattr(settings, 'ASYNC_VIEWS', False):
+            blocks = aiter_blocks(blocks)
+        response = StreamingHttpResponse(blocks, content_type=CONTENT_TYPES[file_format])
+        filename = f'{self.export_name}-{timezone.localdate():%Y%m%d}.{file_format}'
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        # Let nginx pass blocks on as they are written rather than buffering the file
+        response['X-Accel-Buffering'] = 'no'
+        return response
@@ -0,0 +1,66 @@
+from datetime import timedelta
+
+from django.db.models import Count, Max, Q, Sum
+from django.utils import timezone
+
+from .models import Aircraft, FlyingOperation, MaintenanceSchedule, DeferredDefect, Limitation
+
+# Same definitions as the per-aircraft dashboard sections in snapshots.py
+OPEN_DEFECT_STATUSES = ['OPEN', 'IN_PROGRESS', 'DEFERRED']
+PENDING_MAINTENANCE_STATUSES = ['SCHEDULED', 'IN_PROGRESS']
+MAINTENANCE_WINDOW_DAYS = 30
+
+
+def _grouped(queryset, aircraft, **aggregates):
+    """One GROUP BY aircraft query over `queryset`, returned as {aircraft_id: {name: value}}"""
+    rows = queryset.filter(aircraft__in=aircraft).order_by().values('aircraft_id').annotate(**aggregates)
+    return {row.pop('aircraft_id'): row for row in rows}
+
+
+def fleet_summary(aircraft_type=None, status=None):
+    """
+    Per-aircraft defect, limitation, maintenance and flight totals for the whole fleet in five
+    queries. Each related table is aggregated on its own so the joins cannot multiply each
+    other's rows, which a single query joining all four would do.
+    """
+    today = timezone.now().date()
+    aircraft = Aircraft.objects.all()
+    if aircraft_type:
+        aircraft = aircraft.filter(aircraft_type=aircraft_type)
+    if status:
+        aircraft = aircraft.filter(status=status)
+    aircraft_ids = aircraft.values('id')
+
+    severities = [value for value, label in DeferredDefect.SEVERITY_CHOICES]
+    defects = _grouped(
+        DeferredDefect.objects.filter(status__in=OPEN_DEFECT_STATUSES), aircraft_ids,
+        **{severity.lower(): Count('id', filter=Q(severity=severity)) for severity in severities},
+    )
+    limitations = _grouped(Limitation.objects.filter(is_active=True), aircraft_ids, active=Count('id'))
+    maintenance = _grouped(
+        MaintenanceSchedule.objects.filter(status__in=PENDING_MAINTENANCE_STATUSES), aircraft_ids,
+        due=Count('id', filter=Q(scheduled_date__lte=today + timedelta(days=MAINTENANCE_WINDOW_DAYS))),
+        overdue=Count('id', filter=Q(scheduled_date__lt=today)),
+    )
+    flights = _grouped(
+        FlyingOperation.objects.all(), aircraft_ids,
+        last_flight_date=Max('flight_date'), logged_hours=Sum('flight_hours'), flights=Count('id'),
+    )
+
+    no_defects = dict.fromkeys((severity.lower() for severity in severities), 0)
+    summary = []
+    for row in aircraft.values('id', 'aircraft_number', 'aircraft_type', 'model', 'status', 'total_flying_hours'):
+        open_defects = defects.get(row['id'], no_defects)
+        aircraft_maintenance = maintenance.get(row['id'], {})
+        aircraft_flights = flights.get(row['id'], {})
+        summary.append({
+            **row,
+            'open_defects': {'total': sum(open_defects.values()), **open_defects},
+            'active_limitations': limitations.get(row['id'], {}).get('active', 0),
+            'maintenance_due': aircraft_maintenance.get('due', 0),
+            'maintenance_overdue': aircraft_maintenance.get('overdue', 0),
+            'last_flight_date': aircraft_flights.get('last_flight_date'),
+            'flights': aircraft_flights.get('flights', 0),
+            'logged_flight_hours': aircraft_flights.get('logged_hours') or 0,
+        })
+    return summary
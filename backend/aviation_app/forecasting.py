@@ -0,0 +1,190 @@
+"""
+Maintenance forecasting for the whole fleet at once. Each aircraft's monthly flying hours are
+projected from its recent history, and the projection is checked against its thresholds:
+hour-based inspections every MAINTENANCE_INTERVAL_HOURS, pending MaintenanceSchedule rows and
+the aircraft's next_maintenance_due date. The arithmetic runs on NumPy arrays holding one row
+per aircraft and one column per month, never in a Python loop per aircraft.
+"""
+from datetime import date
+from decimal import Decimal
+
+import numpy as np
+from django.conf import settings
+from django.db.models import Sum
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from .models import Aircraft, FlyingOperation, MaintenanceSchedule, MaintenanceForecast
+from .rollups import completed_post_flying
+from .snapshots import mark_dashboards_stale
+
+
+def month_index(value):
+    return value.year * 12 + value.month - 1
+
+
+def month_start(index):
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def locate(sorted_ids, ids):
+    """Row positions of `ids` in `sorted_ids`, and a mask of those present (an aircraft added mid-run is not)"""
+    ids = np.asarray(ids, dtype=np.int64)
+    positions = np.minimum(np.searchsorted(sorted_ids, ids), max(len(sorted_ids) - 1, 0))
+    known = sorted_ids[positions] == ids if len(sorted_ids) else np.zeros(len(ids), dtype=bool)
+    return positions, known
+
+
+class FleetForecast:
+    """Projected figures for `aircraft_ids` (sorted) over `months` (month indexes), as arrays"""
+
+    def __init__(self, aircraft_ids, months, rate, flying_hours, maintenance_hours, inspections, major, next_due):
+        self.aircraft_ids = aircraft_ids
+        self.months = months
+        self.rate = rate
+        self.flying_hours = flying_hours
+        self.maintenance_hours = maintenance_hours
+        self.inspections = inspections
+        self.major = major
+        self.next_due = next_due
+
+    def records(self):
+        """MaintenanceForecast instances for every aircraft and month"""
+        interval = getattr(settings, 'MAINTENANCE_INTERVAL_HOURS', 100)
+        records = []
+        for row, aircraft_id in enumerate(self.aircraft_ids.tolist()):
+            for column, month in enumerate(self.months.tolist()):
+                notes = []
+                if self.inspections[row, column]:
+                    notes.append(f'{int(self.inspections[row, column])} x {interval:g}-hour inspection')
+                if self.next_due[row, column]:
+                    notes.append('next maintenance due')
+                records.append(MaintenanceForecast(
+                    aircraft_id=aircraft_id, forecast_month=month_start(int(month)),
+                    estimated_flying_hours=Decimal(f'{self.flying_hours[row, column]:.2f}'),
+                    estimated_maintenance_hours=Decimal(f'{self.maintenance_hours[row, column]:.2f}'),
+                    major_maintenance_due=bool(self.major[row, column]),
+                    notes='; '.join(notes) or None,
+                ))
+        return records
+
+
+def monthly_hours(aircraft_ids, first_month, last_month, scope):
+    """
+    Flown hours per aircraft (rows, in `aircraft_ids` order) and month (columns) from the flight
+    log. Months with no logged flights fall back to completed post-flying hours. `scope` is the
+    filter selecting those aircraft's rows.
+    """
+    shape = (len(aircraft_ids), last_month - first_month + 1)
+    window = {'gte': month_start(first_month), 'lt': month_start(last_month + 1)}
+    sources = [
+        (FlyingOperation.objects.filter(flight_date__gte=window['gte'], flight_date__lt=window['lt']), 'flight_date'),
+        (completed_post_flying().filter(post_flight_date__date__gte=window['gte'], post_flight_date__date__lt=window['lt']),
+         'post_flight_date'),
+    ]
+    hours = []
+    for queryset, date_field in sources:
+        grid = np.zeros(shape)
+        rows = list(
+            queryset.filter(**scope).order_by()
+            .annotate(month=TruncMonth(date_field)).values('aircraft_id', 'month')
+            .annotate(hours=Sum('flight_hours')).values_list('aircraft_id', 'month', 'hours')
+        )
+        if rows:
+            ids, months, values = zip(*rows)
+            positions, known = locate(aircraft_ids, ids)
+            columns = np.array([month_index(month) for month in months]) - first_month
+            grid[positions[known], columns[known]] = np.array(values, dtype=float)[known]
+        hours.append(grid)
+    logged, signed_off = hours
+    return np.where(logged > 0, logged, signed_off)
+
+
+def projected_rate(history, half_life):
+    """
+    Exponentially weighted mean of each row of `history`, recent months weighing most. Months
+    before an aircraft's first recorded flight are left out, so a newly inducted aircraft is
+    not averaged down by the months it did not exist.
+    """
+    months = history.shape[1]
+    weights = 0.5 ** ((months - 1 - np.arange(months)) / half_life)
+    active = np.arange(months) >= np.argmax(history > 0, axis=1)[:, None]
+    active &= (history > 0).any(axis=1)[:, None]
+    weighted = (history * weights * active).sum(axis=1)
+    total_weight = (weights * active).sum(axis=1)
+    return np.divide(weighted, total_weight, out=np.zeros(len(history)), where=total_weight > 0)
+
+
+def forecast_fleet(aircraft_ids=None, horizon=12, lookback=12, half_life=3.0, today=None):
+    """Compute the forecast for the given aircraft (default: the whole fleet) for the `horizon` months after this one"""
+    today = today or timezone.localdate()
+    interval = float(getattr(settings, 'MAINTENANCE_INTERVAL_HOURS', 100))
+    inspection_hours = float(getattr(settings, 'MAINTENANCE_INSPECTION_HOURS', 8))
+
+    aircraft = Aircraft.objects.order_by('id')
+    # Without a selection every row is read, rather than sending the whole fleet's ids as parameters
+    scope = {}
+    if aircraft_ids is not None:
+        aircraft = aircraft.filter(id__in=aircraft_ids)
+        scope = {'aircraft_id__in': list(aircraft_ids)}
+    fleet = list(aircraft.values_list('id', 'total_flying_hours', 'next_maintenance_due'))
+    ids = np.array([row[0] for row in fleet], dtype=np.int64)
+    total_hours = np.array([row[1] for row in fleet], dtype=float)
+
+    current = month_index(today)
+    months = np.arange(current + 1, current + 1 + horizon)
+    history = monthly_hours(ids, current - lookback, current - 1, scope)
+    rate = projected_rate(history, half_life) if lookback else np.zeros(len(ids))
+
+    # Hours flown by the end of each forecast month, starting from the rest of this month
+    days_in_month = (month_start(current + 1) - month_start(current)).days
+    remaining = (days_in_month - today.day + 1) / days_in_month
+    flown_by = total_hours[:, None] + rate[:, None] * (remaining + np.arange(horizon + 1))
+    inspections = np.diff(np.floor(flown_by / interval), axis=1)
+
+    # Pending scheduled maintenance falling in the horizon
+    scheduled_hours = np.zeros((len(ids), horizon))
+    major = np.zeros((len(ids), horizon), dtype=bool)
+    pending = list(
+        MaintenanceSchedule.objects.filter(
+            status__in=['SCHEDULED', 'IN_PROGRESS'], **scope,
+            scheduled_date__gte=month_start(current + 1),
+            scheduled_date__lt=month_start(current + 1 + horizon),
+        ).values_list('aircraft_id', 'scheduled_date', 'estimated_hours', 'maintenance_type')
+    )
+    if pending:
+        rows, known = locate(ids, [item[0] for item in pending])
+        columns = np.array([month_index(item[1]) for item in pending]) - (current + 1)
+        estimated = np.array([float(item[2]) for item in pending])
+        np.add.at(scheduled_hours, (rows[known], columns[known]), estimated[known])
+        is_major = known & np.array([item[3] == 'MAJOR' for item in pending])
+        major[rows[is_major], columns[is_major]] = True
+
+    # The month holding the aircraft's next_maintenance_due date, if it is within the horizon
+    due_months = np.array([month_index(row[2]) if row[2] else -1 for row in fleet], dtype=np.int64)
+    next_due = due_months[:, None] == months[None, :]
+
+    return FleetForecast(
+        aircraft_ids=ids, months=months, rate=rate,
+        flying_hours=np.repeat(rate[:, None], horizon, axis=1),
+        maintenance_hours=scheduled_hours + inspections * inspection_hours,
+        inspections=inspections, major=major | next_due, next_due=next_due,
+    )
+
+
+def write_forecasts(forecast, batch_size=1000):
+    """Upsert the forecast rows in bulk and refresh the affected dashboards; returns the row count"""
+    records = forecast.records()
+    MaintenanceForecast.objects.bulk_create(
+        records, batch_size=batch_size, update_conflicts=True, unique_fields=['aircraft', 'forecast_month'],
+        update_fields=['estimated_flying_hours', 'estimated_maintenance_hours', 'major_maintenance_due', 'notes', 'updated_at'],
+    )
+    # bulk_create sends no post_save, so the dashboards showing these forecasts are flagged here
+    mark_dashboards_stale(forecast.aircraft_ids.tolist())
+    return len(records)
+
+
+def generate_forecasts(aircraft_ids=None, **options):
+    """Forecast and store; returns (aircraft count, rows written)"""
+    forecast = forecast_fleet(aircraft_ids, **options)
+    return len(forecast.aircraft_ids), write_forecasts(forecast)
@@ -0,0 +1,344 @@
+"""
+Bulk import of legacy logbooks: aircraft, users, flying operations, deferred defects and
+maintenance history from CSV or NDJSON files laid out like the exports (see exports.py), with
+aircraft given by aircraft number and users by pno. Files are read one record at a time and
+written with bulk_create in batches. Each batch commits together with the file's
+ImportCheckpoint, so an interrupted import resumes after its last committed batch without
+duplicating or losing rows.
+
+Rows that fail validation are not imported; they are written to `<file>.rejects.ndjson` with
+their errors, before their batch commits. The rejects file is started afresh with the file's
+import and, when resuming, cut back to the rows the checkpoint covers.
+"""
+import csv
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.contrib.auth.hashers import make_password
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import DateTimeField
+from django.utils import timezone
+
+from .caching import invalidate_namespace, AIRCRAFT_NAMESPACE, PERSONNEL_NAMESPACE
+from .exports import NATURAL_KEYS
+from .models import Aircraft, User, FlyingOperation, DeferredDefect, MaintenanceSchedule, ImportCheckpoint
+from .rollups import rebuild_rollups
+from .snapshots import mark_dashboards_stale
+from .utils import available_cpus
+
+# In dependency order: aircraft and users before the history that refers to them
+IMPORT_MODELS = {
+    'aircraft': Aircraft,
+    'users': User,
+    'flying-operations': FlyingOperation,
+    'deferred-defects': DeferredDefect,
+    'maintenance-schedules': MaintenanceSchedule,
+}
+
+# Columns the database fills in; present in exported files and ignored on import
+SKIPPED_COLUMNS = frozenset(['id', 'created_at', 'updated_at'])
+# The only columns taken from a users file: the profile and a legacy password. Privileges,
+# groups, token revocation, login times and the signing PIN each user sets are never imported
+IMPORTABLE_COLUMNS = {
+    User: frozenset([
+        'pno', 'full_name', 'email', 'phone', 'rank', 'designation', 'is_active', 'date_joined', 'password',
+    ]),
+}
+
+
+def has_unique_key(model):
+    """Whether imported rows carry a unique value (aircraft number, pno, defect number) that catches repeats"""
+    return any(field.unique and not field.primary_key for field in model._meta.concrete_fields)
+
+
+class ImportFileError(Exception):
+    """The file as a whole cannot be imported, e.g. it has unknown columns or changed since its checkpoint"""
+
+
+def read_records(source, file_format):
+    """
+    (columns, records) for an open CSV or NDJSON file: the CSV header, None for NDJSON, and an
+    iterator of (record, error) pairs, the error set when an NDJSON line is not a JSON object.
+    """
+    if file_format == 'csv':
+        reader = csv.DictReader(source)
+        return reader.fieldnames, ((record, None) for record in reader)
+    return None, _ndjson_records(source)
+
+
+def _ndjson_records(source):
+    for line in source:
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as exc:
+            yield {}, f'Not valid JSON: {exc}'
+            continue
+        if not isinstance(record, dict):
+            yield {}, 'Expected a JSON object'
+            continue
+        yield record, None
+
+
+class NaturalKeys:
+    """aircraft_number -> id and pno -> id maps, loaded on first use and extended as rows are imported"""
+
+    def __init__(self):
+        self._maps = {}
+
+    def get_map(self, model):
+        if model not in self._maps:
+            self._maps[model] = dict(model.objects.values_list(NATURAL_KEYS[model], 'id'))
+        return self._maps[model]
+
+    def resolve(self, model, key):
+        pk = self.get_map(model).get(str(key))
+        if pk is None:
+            raise ValidationError(f'No {model._meta.verbose_name} with {NATURAL_KEYS[model]} {key}')
+        return pk
+
+    def learn(self, model, keys):
+        """Add the ids of rows just created with these natural keys"""
+        if model in self._maps and keys:
+            key_name = NATURAL_KEYS[model]
+            self._maps[model].update(model.objects.filter(**{f'{key_name}__in': keys}).values_list(key_name, 'id'))
+
+
+class RecordConverter:
+    """Turns one record's raw values into an unsaved model instance, or a dict of errors per column"""
+
+    def __init__(self, model, keys):
+        self.model = model
+        self.keys = keys
+        importable = IMPORTABLE_COLUMNS.get(model)
+        self.fields = {
+            field.name: field for field in model._meta.concrete_fields
+            if field.name not in SKIPPED_COLUMNS and (importable is None or field.name in importable)
+        }
+        self.required = [
+            name for name, field in self.fields.items()
+            if not field.null and not field.has_default() and name != 'password'
+        ]
+        self.unique = [name for name, field in self.fields.items() if field.unique]
+
+    def check_columns(self, columns):
+        unknown = set(columns) - set(self.fields) - SKIPPED_COLUMNS
+        if unknown:
+            raise ImportFileError(f"Unknown columns for {self.model._meta.verbose_name}: {', '.join(sorted(unknown))}")
+        missing = set(self.required) - set(columns)
+        if missing:
+            raise ImportFileError(f"Missing columns for {self.model._meta.verbose_name}: {', '.join(sorted(missing))}")
+
+    def convert(self, record):
+        values, errors = {}, {}
+        for name, raw in record.items():
+            if name in SKIPPED_COLUMNS:
+                continue
+            field = self.fields.get(name)
+            if field is None:
+                errors[name] = ['Unknown column']
+                continue
+            if raw == '' and (field.null or field.is_relation or field.has_default()):
+                raw = None
+            if raw is None and field.has_default():
+                continue
+            try:
+                if field.is_relation:
+                    if raw is None:
+                        if not field.null:
+                            raise ValidationError('This field is required.')
+                        values[field.attname] = None
+                    else:
+                        values[field.attname] = self.keys.resolve(field.related_model, raw)
+                elif name == 'password':
+                    # Plain text from the legacy system; hashed when the batch is written
+                    values[name] = str(raw) if raw else None
+                else:
+                    value = field.clean(raw, None)
+                    if isinstance(field, DateTimeField) and value is not None and timezone.is_naive(value):
+                        value = timezone.make_aware(value)
+                    values[name] = value
+            except ValidationError as exc:
+                errors[name] = exc.messages
+        for name in self.required:
+            if name not in record:
+                errors[name] = ['This field is required.']
+        if errors:
+            return None, errors
+        return self.model(**values), None
+
+
+class LogbookImporter:
+    """
+    Imports files one after another, then applies the side effects the bulk inserts skipped:
+    cache invalidation, stale dashboards and the utilization rollups. Call finish() at the end.
+    """
+
+    def __init__(self, batch_size=1000, workers=None, progress=None):
+        self.batch_size = batch_size
+        self.workers = available_cpus() if workers is None else workers
+        self.progress = progress
+        self.keys = NaturalKeys()
+        self.touched_models = set()
+        self.touched_aircraft = set()
+        self.records_read = 0
+        self._pool = None
+
+    def hash_passwords(self, passwords):
+        """make_password for each plain text password, spread over a process pool; no password gives an unusable one"""
+        to_hash = [password for password in passwords if password]
+        if self.workers > 1 and len(to_hash) > 1:
+            if self._pool is None:
+                # Spawned workers import only Django's settings and hashers, never the parent's database connection
+                self._pool = ProcessPoolExecutor(
+                    self.workers, mp_context=multiprocessing.get_context('spawn'), initializer=django.setup
+                )
+            hashed = iter(self._pool.map(make_password, to_hash, chunksize=max(1, len(to_hash) // (self.workers * 4))))
+        else:
+            hashed = iter(make_password(password) for password in to_hash)
+        return [next(hashed) if password else make_password(None) for password in passwords]
+
+    def checkpoint(self, kind, path, resume, restart, allow_duplicates=False):
+        source = os.path.abspath(path)
+        size = os.path.getsize(source)
+        checkpoint = ImportCheckpoint.objects.filter(kind=kind, source=source).first()
+        if checkpoint is not None and restart:
+            # Aircraft, users and defects imported before are rejected as duplicates; flights and
+            # maintenance have no unique key, so their rows would be inserted a second time
+            if checkpoint.imported and not has_unique_key(IMPORT_MODELS[kind]) and not allow_duplicates:
+                raise ImportFileError(
+                    f'{path} already imported {checkpoint.imported} {kind} records, which cannot be told apart '
+                    f'from new ones; --restart would import them twice. Delete them first, then pass '
+                    f'--restart --allow-duplicates'
+                )
+            checkpoint.delete()
+            checkpoint = None
+        if checkpoint is None:
+            return ImportCheckpoint.objects.create(kind=kind, source=source, source_size=size)
+        if not resume:
+            raise ImportFileError(
+                f'{path} has been imported as {kind} before ({checkpoint.records} records so far); '
+                f'pass --resume to continue the import or --restart to import it again'
+            )
+        if checkpoint.source_size != size:
+            raise ImportFileError(f'{path} changed since its import started; pass --restart to import it again')
+        return checkpoint
+
+    def import_file(self, kind, path, file_format=None, resume=False, restart=False, allow_duplicates=False):
+        """Import one file; returns its checkpoint. Already completed files are skipped when resuming"""
+        model = IMPORT_MODELS[kind]
+        file_format = file_format or ('csv' if path.lower().endswith('.csv') else 'ndjson')
+        checkpoint = self.checkpoint(kind, path, resume, restart, allow_duplicates)
+        if checkpoint.completed:
+            return checkpoint
+
+        converter = RecordConverter(model, self.keys)
+        started = time.perf_counter()
+        resumed_from = checkpoint.records
+        with open(path, newline='', encoding='utf-8-sig') as source:
+            columns, records = read_records(source, file_format)
+            if columns is not None:
+                converter.check_columns(columns)
+            with self.open_rejects(checkpoint) as rejects_file:
+                pending = []
+                for number, (record, error) in enumerate(records, start=1):
+                    if number <= resumed_from:
+                        continue
+                    instance, errors = (None, {'record': [error]}) if error else converter.convert(record)
+                    pending.append((number, record, instance, errors))
+                    if len(pending) == self.batch_size:
+                        self.write_batch(checkpoint, converter, pending, rejects_file)
+                        pending = []
+                        self.report(checkpoint, resumed_from, started)
+                self.write_batch(checkpoint, converter, pending, rejects_file, completed=True)
+        if not checkpoint.rejected:
+            os.remove(rejects_file.name)
+        self.report(checkpoint, resumed_from, started)
+        return checkpoint
+
+    def open_rejects(self, checkpoint):
+        """
+        The file's rejects file, open for appending: emptied when its import starts, and on resume
+        cut back to the rows up to the checkpoint, since rejects are written before their batch commits.
+        """
+        path = f'{checkpoint.source}.rejects.ndjson'
+        if checkpoint.records and os.path.exists(path):
+            with open(path, encoding='utf-8') as existing, open(f'{path}.tmp', 'w', encoding='utf-8') as kept:
+                for line in existing:
+                    if line.strip() and json.loads(line)['record_number'] <= checkpoint.records:
+                        kept.write(line)
+            os.replace(f'{path}.tmp', path)
+        elif os.path.exists(path):
+            os.remove(path)
+        return open(path, 'a', encoding='utf-8')
+
+    def write_batch(self, checkpoint, converter, pending, rejects_file, completed=False):
+        model = converter.model
+        self.reject_duplicates(converter, pending)
+        instances = [instance for number, record, instance, errors in pending if errors is None]
+        rejects = [(number, record, errors) for number, record, instance, errors in pending if errors is not None]
+        if model is User:
+            for instance, password in zip(instances, self.hash_passwords([instance.password for instance in instances])):
+                instance.password = password
+
+        for number, record, errors in rejects:
+            rejects_file.write(json.dumps({'record_number': number, 'errors': errors, 'record': record},
+                                          cls=DjangoJSONEncoder) + '\n')
+        rejects_file.flush()
+        with transaction.atomic():
+            model.objects.bulk_create(instances, batch_size=self.batch_size)
+            checkpoint.records += len(pending)
+            checkpoint.imported += len(instances)
+            checkpoint.rejected += len(rejects)
+            checkpoint.completed = completed
+            checkpoint.save()
+        self.records_read += len(pending)
+
+        if model in NATURAL_KEYS:
+            key_name = NATURAL_KEYS[model]
+            self.keys.learn(model, [getattr(instance, key_name) for instance in instances])
+        if instances:
+            self.touched_models.add(model)
+            if hasattr(model, 'aircraft_id'):
+                self.touched_aircraft.update(instance.aircraft_id for instance in instances)
+
+    def reject_duplicates(self, converter, pending):
+        """Reject rows whose unique values (aircraft number, pno, defect number) repeat within the batch or exist already"""
+        for name in converter.unique:
+            values = {getattr(instance, name) for number, record, instance, errors in pending if errors is None}
+            existing = set(converter.model.objects.filter(**{f'{name}__in': values}).values_list(name, flat=True))
+            seen = set()
+            for index, (number, record, instance, errors) in enumerate(pending):
+                if errors is not None:
+                    continue
+                value = getattr(instance, name)
+                if value in existing or value in seen:
+                    pending[index] = (number, record, None, {name: [f'{value} already exists']})
+                seen.add(value)
+
+    def report(self, checkpoint, resumed_from, started):
+        if self.progress is not None:
+            elapsed = time.perf_counter() - started
+            rate = (checkpoint.records - resumed_from) / elapsed if elapsed else 0
+            self.progress(checkpoint, rate)
+
+    def finish(self):
+        """Apply the side effects of everything imported and shut the hashing pool down"""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+        if Aircraft in self.touched_models:
+            invalidate_namespace(AIRCRAFT_NAMESPACE)
+        if User in self.touched_models:
+            invalidate_namespace(PERSONNEL_NAMESPACE)
+        if self.touched_aircraft:
+            mark_dashboards_stale(self.touched_aircraft)
+        if FlyingOperation in self.touched_models:
+            rebuild_rollups()
@@ -0,0 +1,82 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+from aviation_app.models import User, Aircraft, BeforeFlyingService, PilotAcceptance, PostFlying
+from aviation_app.management.commands.check_query_counts import BFS_USER_FIELDS
+
+ENDPOINTS = ['/api/before-flying-service/', '/api/post-flying/']
+
+
+class Command(BaseCommand):
+    help = 'Compare payload size, response time and query count of the default and compact BFS/post-flying formats'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--records', type=int, default=200, help='BFS records (each with a post-flying record) to seed')
+        parser.add_argument('--users', type=int, default=12, help='Distinct personnel shared across the records')
+        parser.add_argument('--repeat', type=int, default=5, help='Requests per format; the median time is reported')
+
+    def handle(self, *args, **options):
+        # Seed inside a transaction that is always rolled back so the database is left untouched
+        with transaction.atomic():
+            client = APIClient()
+            client.force_authenticate(self.seed(options['records'], options['users']))
+            for endpoint in ENDPOINTS:
+                default = self.measure(client, f"{endpoint}?page_size={options['records']}", options['repeat'])
+                compact = self.measure(client, f"{endpoint}?page_size={options['records']}&compact=1", options['repeat'])
+                if any(key.endswith('_pin') for result in (default, compact) for row in result['results'] for key in row):
+                    raise CommandError(f'{endpoint} returned signing PINs')
+                for label, result in (('default', default), ('compact', compact)):
+                    self.stdout.write(
+                        f"{endpoint + ' ' + label:40} {result['bytes']:9,} bytes  "
+                        f"{result['seconds'] * 1000:7.1f} ms  {result['queries']} queries"
+                    )
+                self.stdout.write(f"{'':40} compact is {compact['bytes'] / default['bytes']:.0%} of the default size")
+            transaction.set_rollback(True)
+
+    def measure(self, client, url, repeat):
+        timings = []
+        for _ in range(repeat):
+            with CaptureQueriesContext(connection) as queries:
+                started = time.perf_counter()
+                response = client.get(url)
+                body = response.content
+                timings.append(time.perf_counter() - started)
+            if response.status_code != 200:
+                raise CommandError(f'{url} returned {response.status_code}')
+        timings.sort()
+        data = json.loads(body)
+        return {
+            'bytes': len(body), 'seconds': timings[len(timings) // 2], 'queries': len(queries),
+            'results': data['results'],
+        }
+
+    def seed(self, records, users):
+        """Fully signed BFS chains whose roles rotate through a small crew, as on a real squadron"""
+        crew = [
+            User.objects.create_user(f'BF-{index}', None, full_name=f'Format Bench {index}', rank='Sergeant')
+            for index in range(users)
+        ]
+        now = timezone.now()
+        for index in range(records):
+            aircraft = Aircraft.objects.create(
+                aircraft_number=f'BF-{index}', aircraft_type='FIGHTER', model='Format Bench', fuel_capacity=1000
+            )
+            values = {field: crew[(index + offset) % users] for offset, field in enumerate(BFS_USER_FIELDS)}
+            for field in BeforeFlyingService._meta.concrete_fields:
+                if field.name.endswith('_signed_at'):
+                    values[field.name] = now
+            bfs = BeforeFlyingService.objects.create(aircraft=aircraft, status='FSI_APPROVED', **values)
+            acceptance = PilotAcceptance.objects.create(
+                bfs_record=bfs, aircraft=aircraft, pilot=crew[index % users], status='ACCEPTED', pilot_signed_at=now
+            )
+            PostFlying.objects.create(
+                pilot_acceptance=acceptance, aircraft=aircraft, pilot=crew[index % users], status='COMPLETED',
+                engineer=crew[(index + 1) % users],
+                pilot_signed_at=now, engineer_signed_at=now,
+            )
+        return crew[0]
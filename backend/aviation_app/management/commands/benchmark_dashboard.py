@@ -0,0 +1,218 @@
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.core.servers.basehttp import WSGIServer, WSGIRequestHandler
+from django.core.wsgi import get_wsgi_application
+from django.db import connection
+from aviation_app.tokens import ClaimsRefreshToken
+from aviation_app.utils import percentile
+from aviation_app.models import User, Aircraft
+
+# Connection settings compared by --compare, applied through the environment of a child process
+CONNECTION_MODES = {
+    'per-request': {'DB_CONN_MAX_AGE': '0', 'DB_POOL': 'False'},
+    'persistent': {'DB_CONN_MAX_AGE': '60', 'DB_POOL': 'False'},
+    'pooled': {'DB_POOL': 'True'},
+}
+
+# Servers compared by --compare-servers. ASGI runs sync code on a fresh thread per request, so
+# connections are returned after each request there (see aviation_project/asgi.py).
+SERVER_MODES = {
+    'wsgi': {},
+    'asgi': {'DB_CONN_MAX_AGE': '0', 'ASYNC_VIEWS': 'True'},
+}
+
+
+class QuietRequestHandler(WSGIRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+class WorkerPoolWSGIServer(WSGIServer):
+    """
+    Serves requests on a fixed set of long-lived threads, like gunicorn's workers, so
+    persistent connections behave as they do in production (runserver's thread per
+    request would reconnect every time regardless of CONN_MAX_AGE).
+    """
+
+    def __init__(self, *args, workers, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.executor = ThreadPoolExecutor(workers)
+
+    def process_request(self, request, client_address):
+        self.executor.submit(self.process_request_thread, request, client_address)
+
+    def process_request_thread(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        self.executor.shutdown(wait=True)
+
+
+def start_wsgi_server(workers):
+    server = WorkerPoolWSGIServer(('127.0.0.1', 0), QuietRequestHandler, workers=workers)
+    server.set_app(get_wsgi_application())
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    def stop():
+        server.shutdown()
+        server.server_close()
+    return f'http://127.0.0.1:{server.server_port}', stop
+
+
+def start_asgi_server():
+    import uvicorn
+    from aviation_project.asgi import application
+
+    sock = socket.socket()
+    sock.bind(('127.0.0.1', 0))
+    server = uvicorn.Server(uvicorn.Config(application, lifespan='off', log_level='warning'))
+    thread = threading.Thread(target=server.run, kwargs={'sockets': [sock]}, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+
+    def stop():
+        server.should_exit = True
+        thread.join()
+        sock.close()
+    return f'http://127.0.0.1:{sock.getsockname()[1]}', stop
+
+
+def run_load(url, token, requests, concurrency):
+    """Issue `requests` GETs from `concurrency` client threads; returns (elapsed seconds, latencies, errors)"""
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+
+    def worker(count):
+        for _ in range(count):
+            request = urllib.request.Request(url, headers={'Authorization': f'Bearer {token}'})
+            started = time.perf_counter()
+            try:
+                with urllib.request.urlopen(request, timeout=60) as response:
+                    response.read()
+            except (urllib.error.URLError, OSError) as error:
+                with lock:
+                    errors.append(str(error))
+                continue
+            with lock:
+                latencies.append(time.perf_counter() - started)
+
+    shares = [requests // concurrency + (1 if index < requests % concurrency else 0) for index in range(concurrency)]
+    threads = [threading.Thread(target=worker, args=(share,)) for share in shares]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - started, latencies, errors
+
+
+class Command(BaseCommand):
+    help = (
+        'Measure requests per second and latency on /api/dashboard/ under concurrent load, '
+        'optionally comparing connection settings or WSGI against ASGI serving'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=1000, help='Total requests to send')
+        parser.add_argument('--concurrency', default='8',
+                            help='Concurrent client threads; a comma-separated list runs each level')
+        parser.add_argument('--workers', type=int, default=8, help='Server threads for the built-in WSGI server')
+        parser.add_argument('--server', choices=['wsgi', 'asgi'], default='wsgi', help='Built-in server to run')
+        parser.add_argument('--path', default='/api/dashboard/?aircraft_id={aircraft_id}', help='Endpoint to request')
+        parser.add_argument('--aircraft-id', type=int, help='Aircraft to request (default: the first one)')
+        parser.add_argument('--url', help='Benchmark a running server sharing this database and SECRET_KEY instead of the built-in one')
+        parser.add_argument('--compare', action='store_true',
+                            help='Run once per connection mode (per-request, persistent, pooled on PostgreSQL)')
+        parser.add_argument('--compare-servers', action='store_true', help='Run once under WSGI and once under ASGI')
+        parser.add_argument('--label', help='Name printed with the result')
+
+    def handle(self, *args, **options):
+        if options['compare']:
+            return self.compare(options, CONNECTION_MODES)
+        if options['compare_servers']:
+            return self.compare(options, SERVER_MODES)
+
+        levels = [int(level) for level in options['concurrency'].split(',')]
+        aircraft_id = options['aircraft_id'] or Aircraft.objects.order_by('id').values_list('id', flat=True).first()
+        if aircraft_id is None:
+            raise CommandError('No aircraft to request; create one first or pass --aircraft-id')
+
+        user = User.objects.create_user(f'BENCH-{os.getpid()}', None, full_name='Dashboard Benchmark')
+        stop = None
+        results = []
+        try:
+            token = str(ClaimsRefreshToken.for_user(user).access_token)
+            if options['url']:
+                base_url = options['url'].rstrip('/')
+            elif options['server'] == 'asgi':
+                base_url, stop = start_asgi_server()
+            else:
+                base_url, stop = start_wsgi_server(options['workers'])
+            url = base_url + options['path'].format(aircraft_id=aircraft_id)
+
+            # Warm up: builds the snapshot and opens whatever connections the mode keeps
+            run_load(url, token, max(levels), max(levels))
+            for level in levels:
+                results.append((level, *run_load(url, token, options['requests'], level)))
+        finally:
+            if stop is not None:
+                stop()
+            connection.close()
+            user.delete()
+
+        database = settings.DATABASES['default']
+        label = options['label'] or (
+            f"{options['server']}, {connection.vendor}, CONN_MAX_AGE={database['CONN_MAX_AGE']}"
+            f"{', pooled' if database['ENGINE'].endswith('pooled_postgresql') else ''}"
+        )
+        for level, elapsed, latencies, errors in results:
+            if not latencies:
+                raise CommandError(f'Every request failed, e.g. {errors[0]}')
+            self.stdout.write(
+                f'{label:<32} c={level:<4} {len(latencies) / elapsed:8.0f} req/s   '
+                f'p50 {statistics.median(latencies) * 1000:6.1f} ms   '
+                f'p99 {percentile(latencies, 0.99) * 1000:6.1f} ms   errors {len(errors)}'
+            )
+
+    def compare(self, options, modes):
+        modes = dict(modes)
+        if 'pooled' in modes and settings.DATABASES['default']['ENGINE'] not in ('django.db.backends.postgresql', 'aviation_project.pooled_postgresql'):
+            # The pool is PostgreSQL-only
+            modes.pop('pooled')
+            self.stdout.write(f'{connection.vendor}: comparing without the pooled mode')
+
+        for name, environment in modes.items():
+            command = [
+                sys.executable, str(settings.BASE_DIR / 'manage.py'), 'benchmark_dashboard',
+                '--requests', str(options['requests']), '--concurrency', options['concurrency'],
+                '--workers', str(options['workers']), '--path', options['path'], '--label', name,
+                '--server', name if name in SERVER_MODES else options['server'],
+            ]
+            if options['aircraft_id']:
+                command += ['--aircraft-id', str(options['aircraft_id'])]
+            child_environment = {**os.environ, **environment}
+            if name == 'pooled':
+                child_environment['DB_ENGINE'] = 'django.db.backends.postgresql'
+            result = subprocess.run(command, env=child_environment, capture_output=True, text=True)
+            if result.returncode != 0:
+                raise CommandError(f'{name} run failed:\n{result.stderr}')
+            self.stdout.write(result.stdout.rstrip())
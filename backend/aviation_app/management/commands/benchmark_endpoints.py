@@ -0,0 +1,219 @@
+import json
+import os
+import platform
+import statistics
+import time
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from aviation_app.management.commands.benchmark_dashboard import run_load, start_asgi_server, start_wsgi_server
+from aviation_app.tokens import ClaimsRefreshToken
+from aviation_app.utils import percentile
+from aviation_app.models import (
+    User, Aircraft, FlyingOperation, MaintenanceSchedule, DeferredDefect, Limitation,
+    BeforeFlyingService, PilotAcceptance, PostFlying
+)
+from aviation_app.urls import router
+
+# Query strings for GET list actions that need parameters; other patterned actions are skipped
+ACTION_PATHS = {
+    'by_type': 'by_type?type={aircraft_type}',
+    'export/(?P<file_format>csv|ndjson)': 'export/csv?aircraft_id={aircraft_id}',
+}
+
+# Function views benchmarked alongside the router's viewsets (the event stream never ends, so it is left out)
+VIEW_PATHS = [
+    '/api/dashboard/?aircraft_id={aircraft_id}',
+    '/api/dashboard/fleet/',
+    '/api/auth/profile/',
+]
+
+# Row counts stored with the report, so runs on different datasets are not mistaken for regressions
+DATASET_MODELS = [
+    User, Aircraft, FlyingOperation, MaintenanceSchedule, DeferredDefect, Limitation,
+    BeforeFlyingService, PilotAcceptance, PostFlying,
+]
+
+
+def endpoint_paths():
+    """(path template, model whose first row fills {pk}) for every GET endpoint of the API"""
+    paths = []
+    for prefix, viewset, basename in router.registry:
+        paths.append((f'/api/{prefix}/', None))
+        paths.append((f'/api/{prefix}/{{pk}}/', viewset.queryset.model))
+        for action in viewset.get_extra_actions():
+            if action.detail or 'get' not in action.mapping:
+                continue
+            url_path, _, query = ACTION_PATHS.get(action.url_path, action.url_path).partition('?')
+            if '(?P<' not in url_path:
+                paths.append((f'/api/{prefix}/{url_path}/' + (f'?{query}' if query else ''), None))
+    paths.extend((path, None) for path in VIEW_PATHS)
+    return paths
+
+
+def latency_summary(latencies, elapsed):
+    return {
+        'requests': len(latencies),
+        'throughput_rps': round(len(latencies) / elapsed, 1) if elapsed else None,
+        'mean_ms': round(statistics.fmean(latencies) * 1000, 2),
+        'p50_ms': round(statistics.median(latencies) * 1000, 2),
+        'p90_ms': round(percentile(latencies, 0.90) * 1000, 2),
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 2),
+        'max_ms': round(max(latencies) * 1000, 2),
+    }
+
+
+def read_body(response):
+    return b''.join(response.streaming_content) if response.streaming else response.content
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark every GET endpoint of the API against the current database: query counts, latency '
+        'percentiles and throughput, written to a JSON report that later runs can be compared with'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=50, help='Timed requests per endpoint')
+        parser.add_argument('--warmup', type=int, default=3, help='Untimed requests per endpoint first (builds caches and snapshots)')
+        parser.add_argument('--server', choices=['in-process', 'wsgi', 'asgi'], default='in-process',
+                            help='Send the timed requests through the Django test client or over HTTP to a built-in server')
+        parser.add_argument('--url', help='Time requests against a running server sharing this database and SECRET_KEY')
+        parser.add_argument('--concurrency', type=int, default=1, help='Client threads for the HTTP modes')
+        parser.add_argument('--workers', type=int, default=8, help='Server threads for the built-in WSGI server')
+        parser.add_argument('--only', action='append', help='Benchmark only endpoints whose path contains this; repeat for several')
+        parser.add_argument('--output', default='endpoint-benchmark.json', help='Where to write the JSON report')
+        parser.add_argument('--baseline', help='Earlier report to compare with; regressions make the command fail')
+        parser.add_argument('--tolerance', type=float, default=0.25,
+                            help='Allowed p50 latency increase over the baseline, as a fraction (default 0.25)')
+
+    def handle(self, *args, **options):
+        aircraft = Aircraft.objects.order_by('id').first()
+        if aircraft is None:
+            raise CommandError('The database has no aircraft; run generate_synthetic_fleet first')
+        if options['concurrency'] > 1 and options['server'] == 'in-process' and not options['url']:
+            raise CommandError('--concurrency needs --server wsgi/asgi or --url')
+
+        baseline = None
+        if options['baseline']:
+            with open(options['baseline'], encoding='utf-8') as baseline_file:
+                baseline = json.load(baseline_file)
+
+        values = {'aircraft_id': aircraft.id, 'aircraft_type': aircraft.aircraft_type}
+        endpoints = []
+        for template, model in endpoint_paths():
+            if options['only'] and not any(part in template for part in options['only']):
+                continue
+            if model is not None:
+                pk = model.objects.order_by('pk').values_list('pk', flat=True).first()
+                if pk is None:
+                    continue
+                values['pk'] = pk
+            endpoints.append((template, template.format(**values)))
+
+        user = User.objects.create_user(f'BENCH-{os.getpid()}', None, full_name='Endpoint Benchmark')
+        stop = None
+        results = {}
+        try:
+            token = str(ClaimsRefreshToken.for_user(user).access_token)
+            client = Client(HTTP_AUTHORIZATION=f'Bearer {token}')
+            base_url = None
+            if options['url']:
+                base_url = options['url'].rstrip('/')
+            elif options['server'] == 'wsgi':
+                base_url, stop = start_wsgi_server(options['workers'])
+            elif options['server'] == 'asgi':
+                base_url, stop = start_asgi_server()
+
+            for template, path in endpoints:
+                results[template] = self.benchmark(client, base_url, token, path, options)
+                result = results[template]
+                self.stdout.write(
+                    f"{template:<58} {result['status']:>3} {result['queries']:>3} q  "
+                    f"p50 {result['p50_ms']:8.2f} ms  p99 {result['p99_ms']:8.2f} ms  {result['throughput_rps']:8.1f} req/s"
+                )
+        finally:
+            if stop is not None:
+                stop()
+            connection.close()
+            user.delete()
+
+        report = {
+            'created_at': timezone.now().isoformat(),
+            'mode': 'url' if options['url'] else options['server'],
+            'requests': options['requests'],
+            'concurrency': options['concurrency'],
+            'environment': {
+                'database': connection.vendor,
+                'debug': settings.DEBUG,
+                'async_views': getattr(settings, 'ASYNC_VIEWS', False),
+                'python': platform.python_version(),
+                'django': django.get_version(),
+            },
+            'dataset': {model._meta.model_name: model.objects.count() for model in DATASET_MODELS},
+            'endpoints': results,
+        }
+        with open(options['output'], 'w', encoding='utf-8') as output:
+            json.dump(report, output, indent=2)
+        self.stdout.write(self.style.SUCCESS(f"Wrote {len(results)} endpoints to {options['output']}"))
+
+        if baseline is not None:
+            self.compare(baseline, report, options['tolerance'])
+
+    def benchmark(self, client, base_url, token, path, options):
+        """Query count from one in-process request, then timings in-process or over HTTP"""
+        for _ in range(options['warmup']):
+            read_body(client.get(path))
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(path)
+            body = read_body(response)
+        result = {'path': path, 'status': response.status_code, 'queries': len(queries), 'bytes': len(body)}
+
+        if base_url is None:
+            latencies = []
+            for _ in range(options['requests']):
+                started = time.perf_counter()
+                read_body(client.get(path))
+                latencies.append(time.perf_counter() - started)
+            result.update(latency_summary(latencies, sum(latencies)))
+            return result
+
+        url = base_url + path
+        run_load(url, token, options['warmup'] * options['concurrency'], options['concurrency'])
+        elapsed, latencies, errors = run_load(url, token, options['requests'], options['concurrency'])
+        if not latencies:
+            raise CommandError(f'Every request to {path} failed, e.g. {errors[0]}')
+        result.update(latency_summary(latencies, elapsed), errors=len(errors))
+        return result
+
+    def compare(self, baseline, report, tolerance):
+        """Print changes against the baseline report and fail on more queries, slower p50 or a changed status"""
+        if baseline.get('dataset') != report['dataset']:
+            self.stdout.write(self.style.WARNING('The baseline was measured on a different dataset; latencies may not be comparable'))
+        regressions = []
+        for template, result in report['endpoints'].items():
+            before = baseline.get('endpoints', {}).get(template)
+            if before is None:
+                continue
+            change = result['p50_ms'] / before['p50_ms'] - 1 if before['p50_ms'] else 0
+            problems = []
+            if result['status'] != before['status']:
+                problems.append(f"status {before['status']} -> {result['status']}")
+            if result['queries'] > before['queries']:
+                problems.append(f"queries {before['queries']} -> {result['queries']}")
+            if change > tolerance:
+                problems.append(f"p50 {before['p50_ms']:.2f} -> {result['p50_ms']:.2f} ms")
+            line = f'{template:<58} p50 {change:+7.1%}  queries {result["queries"] - before["queries"]:+d}'
+            if problems:
+                regressions.append(f"{template}: {', '.join(problems)}")
+                self.stdout.write(self.style.ERROR(line))
+            else:
+                self.stdout.write(line)
+        if regressions:
+            raise CommandError('Regressions against the baseline:\n' + '\n'.join(regressions))
+        self.stdout.write(self.style.SUCCESS('No regressions against the baseline'))
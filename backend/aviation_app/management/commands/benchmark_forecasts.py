@@ -0,0 +1,117 @@
+import math
+import time
+
+import numpy as np
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Sum
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+from aviation_app.forecasting import forecast_fleet, write_forecasts, month_index, month_start
+from aviation_app.models import Aircraft, FlyingOperation, MaintenanceSchedule
+from aviation_app.rollups import completed_post_flying
+from aviation_app.synthetic import generate_fleet
+
+
+def forecast_per_aircraft(aircraft_ids, horizon, lookback, half_life, today):
+    """
+    The same forecast computed the straightforward way: queries and arithmetic one aircraft
+    at a time. Kept as the baseline, and to check the vectorized results against.
+    """
+    interval = float(settings.MAINTENANCE_INTERVAL_HOURS)
+    inspection_hours = float(settings.MAINTENANCE_INSPECTION_HOURS)
+    current = month_index(today)
+    window_start, window_end = month_start(current - lookback), month_start(current)
+    days_in_month = (month_start(current + 1) - window_end).days
+    remaining = (days_in_month - today.day + 1) / days_in_month
+    results = {}
+
+    for aircraft in Aircraft.objects.filter(id__in=aircraft_ids).order_by('id'):
+        history = [0.0] * lookback
+        for month, hours in (
+            FlyingOperation.objects.filter(aircraft=aircraft, flight_date__gte=window_start, flight_date__lt=window_end)
+            .annotate(month=TruncMonth('flight_date')).values_list('month').annotate(Sum('flight_hours')).order_by()
+        ):
+            history[month_index(month) - current + lookback] = float(hours)
+        for month, hours in (
+            completed_post_flying().filter(aircraft=aircraft, post_flight_date__date__gte=window_start,
+                                           post_flight_date__date__lt=window_end)
+            .annotate(month=TruncMonth('post_flight_date')).values_list('month').annotate(Sum('flight_hours')).order_by()
+        ):
+            column = month_index(month) - current + lookback
+            if not history[column]:
+                history[column] = float(hours)
+
+        first = next((index for index, hours in enumerate(history) if hours > 0), None)
+        weighted = total_weight = 0.0
+        if first is not None:
+            for index in range(first, lookback):
+                weight = 0.5 ** ((lookback - 1 - index) / half_life)
+                weighted += history[index] * weight
+                total_weight += weight
+        rate = weighted / total_weight if total_weight else 0.0
+
+        maintenance = []
+        for offset in range(horizon):
+            before = float(aircraft.total_flying_hours) + rate * (remaining + offset)
+            after = before + rate
+            inspections = math.floor(after / interval) - math.floor(before / interval)
+            scheduled = MaintenanceSchedule.objects.filter(
+                aircraft=aircraft, status__in=['SCHEDULED', 'IN_PROGRESS'],
+                scheduled_date__gte=month_start(current + 1 + offset), scheduled_date__lt=month_start(current + 2 + offset),
+            ).aggregate(hours=Sum('estimated_hours'))['hours'] or 0
+            maintenance.append(float(scheduled) + inspections * inspection_hours)
+        results[aircraft.id] = (rate, maintenance)
+    return results
+
+
+class Command(BaseCommand):
+    help = 'Seed a synthetic fleet and time the vectorized forecast against a per-aircraft loop'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--aircraft', type=int, default=1000, help='Number of synthetic aircraft')
+        parser.add_argument('--days', type=int, default=3650, help='Days of history per aircraft')
+        parser.add_argument('--horizon', type=int, default=12)
+        parser.add_argument('--lookback', type=int, default=12)
+        parser.add_argument('--loop-sample', type=int, default=100,
+                            help='Aircraft the per-aircraft loop runs for; its time is scaled up to the fleet')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        today = timezone.localdate()
+        # Everything happens in one transaction that is rolled back
+        with transaction.atomic():
+            started = time.perf_counter()
+            counts = generate_fleet(options['aircraft'], days=options['days'], seed=options['seed'], prefix='FCST', today=today)
+            self.stdout.write(f"Seeded {counts['flying_operations']} flights for {counts['aircraft']} aircraft "
+                              f'in {time.perf_counter() - started:.1f}s')
+            aircraft_ids = list(
+                Aircraft.objects.filter(aircraft_number__startswith='FCST-').order_by('id').values_list('id', flat=True)
+            )
+            parameters = {'horizon': options['horizon'], 'lookback': options['lookback'], 'half_life': 3.0, 'today': today}
+
+            started = time.perf_counter()
+            forecast = forecast_fleet(aircraft_ids, **parameters)
+            vectorized = time.perf_counter() - started
+
+            started = time.perf_counter()
+            written = write_forecasts(forecast)
+            writing = time.perf_counter() - started
+
+            sample = aircraft_ids[:options['loop_sample']]
+            started = time.perf_counter()
+            expected = forecast_per_aircraft(sample, **parameters)
+            looped = (time.perf_counter() - started) * len(aircraft_ids) / max(len(sample), 1)
+            transaction.set_rollback(True)
+
+        rows = np.searchsorted(forecast.aircraft_ids, sample)
+        if not np.allclose(forecast.rate[rows], [expected[aircraft_id][0] for aircraft_id in sample]) or not np.allclose(
+            forecast.maintenance_hours[rows], [expected[aircraft_id][1] for aircraft_id in sample]
+        ):
+            raise CommandError('The vectorized forecast differs from the per-aircraft computation')
+
+        self.stdout.write(f'Vectorized forecast for {len(aircraft_ids)} aircraft: {vectorized:8.2f}s')
+        self.stdout.write(f'Per-aircraft loop (from {len(sample)} aircraft):  {looped:8.2f}s  ({looped / vectorized:.0f}x slower)')
+        self.stdout.write(f'Bulk upsert of {written} forecast rows:        {writing:8.2f}s')
+        self.stdout.write(self.style.SUCCESS(f'Results match for the {len(sample)} aircraft checked'))
@@ -0,0 +1,105 @@
+import statistics
+import time
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from aviation_app.models import (
+    FlyingOperation, MaintenanceSchedule, DeferredDefect, Limitation,
+    MaintenanceForecast, BeforeFlyingService, PilotAcceptance, PostFlying
+)
+from aviation_app.synthetic import generate_fleet
+
+INDEXED_MODELS = [
+    FlyingOperation, MaintenanceSchedule, DeferredDefect, Limitation,
+    BeforeFlyingService, PilotAcceptance, PostFlying,
+]
+
+
+def aircraft_query_patterns(today):
+    """The aircraft-scoped queries issued by the dashboard and the list endpoints"""
+    return {
+        'recent flights': lambda aircraft_id: FlyingOperation.objects.filter(aircraft_id=aircraft_id)[:10],
+        'upcoming maintenance': lambda aircraft_id: MaintenanceSchedule.objects.filter(
+            aircraft_id=aircraft_id, scheduled_date__lte=today + timedelta(days=30), status__in=['SCHEDULED', 'IN_PROGRESS']
+        ),
+        'active defects': lambda aircraft_id: DeferredDefect.objects.filter(
+            aircraft_id=aircraft_id, status__in=['OPEN', 'IN_PROGRESS', 'DEFERRED']
+        ),
+        'active limitations': lambda aircraft_id: Limitation.objects.filter(aircraft_id=aircraft_id, is_active=True),
+        'forecasts': lambda aircraft_id: MaintenanceForecast.objects.filter(aircraft_id=aircraft_id, forecast_month__gte=today)[:12],
+        'flights page': lambda aircraft_id: FlyingOperation.objects.filter(aircraft_id=aircraft_id)[:50],
+    }
+
+
+class Command(BaseCommand):
+    help = 'Seed a synthetic fleet and compare query plans and latencies with and without the aircraft-scoped indexes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--aircraft', type=int, default=200, help='Number of synthetic aircraft')
+        parser.add_argument('--days', type=int, default=730, help='Days of history per aircraft')
+        parser.add_argument('--repeat', type=int, default=50, help='Timed runs per query')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        if connection.vendor not in ('sqlite', 'postgresql'):
+            raise CommandError(f'Unsupported database backend: {connection.vendor}')
+
+        today = date.today()
+        patterns = aircraft_query_patterns(today)
+
+        # Everything happens in one transaction that is rolled back, including the index drops
+        with transaction.atomic():
+            self.stdout.write(f'Seeding {options["aircraft"]} aircraft with {options["days"]} days of history...')
+            started = time.perf_counter()
+            counts = generate_fleet(options['aircraft'], days=options['days'], seed=options['seed'], prefix='BENCH', today=today)
+            self.stdout.write(f'Seeded {counts} in {time.perf_counter() - started:.1f}s on {connection.vendor}')
+
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE')
+            aircraft_ids = list(
+                FlyingOperation.objects.filter(aircraft__aircraft_number__startswith='BENCH-')
+                .values_list('aircraft_id', flat=True).distinct()[:20]
+            )
+
+            after = self.measure(patterns, aircraft_ids, options['repeat'])
+            self.drop_indexes()
+            before = self.measure(patterns, aircraft_ids, options['repeat'])
+            transaction.set_rollback(True)
+
+        self.stdout.write('\n' + '=' * 90)
+        self.stdout.write(f'{"query":22} {"without idx p50":>16} {"with idx p50":>14} {"without p95":>12} {"with p95":>10} {"speedup":>8}')
+        for name in patterns:
+            speedup = before[name]['p50'] / after[name]['p50'] if after[name]['p50'] else 0
+            self.stdout.write(
+                f'{name:22} {before[name]["p50"]:>14.3f}ms {after[name]["p50"]:>12.3f}ms '
+                f'{before[name]["p95"]:>10.3f}ms {after[name]["p95"]:>8.3f}ms {speedup:>7.1f}x'
+            )
+        self.stdout.write('=' * 90)
+        for name in patterns:
+            self.stdout.write(f'\n{name}\n  without indexes: {before[name]["plan"]}\n  with indexes:    {after[name]["plan"]}')
+
+    def measure(self, patterns, aircraft_ids, repeat):
+        results = {}
+        for name, build_query in patterns.items():
+            timings = []
+            for run in range(repeat):
+                queryset = build_query(aircraft_ids[run % len(aircraft_ids)])
+                started = time.perf_counter()
+                list(queryset)
+                timings.append((time.perf_counter() - started) * 1000)
+            timings.sort()
+            results[name] = {
+                'p50': statistics.median(timings),
+                'p95': timings[min(len(timings) - 1, int(len(timings) * 0.95))],
+                'plan': ' | '.join(line.strip() for line in build_query(aircraft_ids[0]).explain().splitlines()),
+            }
+        return results
+
+    def drop_indexes(self):
+        with connection.cursor() as cursor:
+            for model in INDEXED_MODELS:
+                for index in model._meta.indexes:
+                    cursor.execute(f'DROP INDEX {connection.ops.quote_name(index.name)}')
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
@@ -0,0 +1,114 @@
+import os
+import statistics
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher, make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import override_settings
+from aviation_app.models import User
+from aviation_app.utils import available_cpus, percentile
+
+PASSWORD = 'Storm-Benchmark-1'
+
+# The old login path: PBKDF2 hashes checked by Django's backend on the request thread
+BEFORE_SETTINGS = {
+    'PASSWORD_HASHERS': ['django.contrib.auth.hashers.PBKDF2PasswordHasher'] + [
+        path for path in settings.PASSWORD_HASHERS if path != 'django.contrib.auth.hashers.PBKDF2PasswordHasher'
+    ],
+    'AUTHENTICATION_BACKENDS': ['django.contrib.auth.backends.ModelBackend'],
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Log many users in at once through /api/auth/login/, with PBKDF2 on the request thread (before), '
+        'while their hashes are upgraded, and with the configured hasher and pool (after); reports logins per second per core'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=40, help='Users logging in; the upgrade phase logs each in once')
+        parser.add_argument('--logins', type=int, default=80, help='Logins in the before and after phases')
+        parser.add_argument('--concurrency', type=int, default=8, help='Concurrent login threads')
+
+    def handle(self, *args, **options):
+        if options['users'] < 1 or options['logins'] < 1:
+            raise CommandError('--users and --logins must be positive')
+        cores = available_cpus()
+        prefix = f'LOGINSTORM-{os.getpid()}-'
+        User.objects.bulk_create([
+            User(pno=f'{prefix}{index:05d}', full_name=f'Login Storm {index}')
+            for index in range(options['users'])
+        ])
+        users = User.objects.filter(pno__startswith=prefix)
+        pnos = list(users.order_by('pno').values_list('pno', flat=True))
+        # One hash per phase, shared by every user: verifying costs the same whatever the salt
+        pbkdf2_hash = make_password(PASSWORD, hasher=PBKDF2PasswordHasher())
+
+        self.stdout.write(
+            f"{options['users']} users, {options['concurrency']} threads, {cores} core(s), "
+            f"hasher after: {settings.PASSWORD_HASHER}"
+        )
+        try:
+            users.update(password=pbkdf2_hash)
+            with override_settings(**BEFORE_SETTINGS):
+                before = self.storm('before', pnos, options['logins'], options['concurrency'], cores)
+
+            upgrade = self.storm('upgrade', pnos, len(pnos), options['concurrency'], cores)
+            upgraded = users.exclude(password=pbkdf2_hash).count()
+            if upgraded != len(pnos):
+                raise CommandError(f'Only {upgraded} of {len(pnos)} password hashes were upgraded')
+
+            after = self.storm('after', pnos, options['logins'], options['concurrency'], cores)
+        finally:
+            users.delete()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Logins per second per core: {before:.1f} before, {upgrade:.1f} while upgrading, "
+            f"{after:.1f} after ({after / before:.1f}x)"
+        ))
+
+    def storm(self, label, pnos, logins, concurrency, cores):
+        """Send `logins` logins over `concurrency` threads; returns logins per second per core"""
+        latencies = []
+        failures = []
+        lock = threading.Lock()
+
+        def log_in(worker):
+            client = Client()
+            try:
+                for index in range(worker, logins, concurrency):
+                    started = time.perf_counter()
+                    response = client.post(
+                        '/api/auth/login/', {'pno': pnos[index % len(pnos)], 'password': PASSWORD},
+                        content_type='application/json'
+                    )
+                    elapsed = time.perf_counter() - started
+                    with lock:
+                        if response.status_code == 200:
+                            latencies.append(elapsed)
+                        else:
+                            failures.append(response.status_code)
+            finally:
+                connection.close()
+
+        started = time.perf_counter()
+        threads = [threading.Thread(target=log_in, args=(worker,)) for worker in range(concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        if failures:
+            raise CommandError(f'{len(failures)} of {logins} logins failed in the {label} phase, e.g. status {failures[0]}')
+        per_core = len(latencies) / elapsed / cores
+        self.stdout.write(
+            f'{label:<8} {len(latencies):>5} logins in {elapsed:6.2f}s  {len(latencies) / elapsed:7.1f}/s  '
+            f'{per_core:6.1f}/s per core  p50 {statistics.median(latencies) * 1000:7.1f} ms  '
+            f'p99 {percentile(latencies, 0.99) * 1000:7.1f} ms'
+        )
+        return per_core
@@ -0,0 +1,79 @@
+import statistics
+import time
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncMonth
+from aviation_app.models import (
+    FlyingOperation, AircraftDailyUtilization, AircraftMissionUtilization, PilotUtilization
+)
+from aviation_app.rollups import rebuild_rollups
+from aviation_app.synthetic import generate_fleet
+
+
+def utilization_queries(aircraft_id, pilot_id, since):
+    """Each report as (scan of the flight history, read of the rollup)"""
+    return {
+        'aircraft hours by month': (
+            lambda: FlyingOperation.objects.filter(aircraft_id=aircraft_id, flight_date__gte=since)
+            .annotate(month=TruncMonth('flight_date')).values('month').annotate(hours=Sum('flight_hours')).order_by(),
+            lambda: AircraftMissionUtilization.objects.filter(aircraft_id=aircraft_id, month__gte=since)
+            .values('month').annotate(hours=Sum('flight_hours')).order_by(),
+        ),
+        'pilot hours by month': (
+            lambda: FlyingOperation.objects.filter(pilot_id=pilot_id, flight_date__gte=since)
+            .annotate(month=TruncMonth('flight_date')).values('month').annotate(hours=Sum('flight_hours')).order_by(),
+            lambda: PilotUtilization.objects.filter(pilot_id=pilot_id, month__gte=since).values('month', 'flight_hours'),
+        ),
+        'fleet hours by mission': (
+            lambda: FlyingOperation.objects.filter(flight_date__gte=since).values('mission_type')
+            .annotate(flights=Count('id'), hours=Sum('flight_hours')).order_by(),
+            lambda: AircraftMissionUtilization.objects.filter(month__gte=since).values('mission_type')
+            .annotate(flights=Sum('flights'), hours=Sum('flight_hours')).order_by(),
+        ),
+        'aircraft hours by day': (
+            lambda: FlyingOperation.objects.filter(aircraft_id=aircraft_id, flight_date__gte=since)
+            .values('flight_date').annotate(hours=Sum('flight_hours')).order_by(),
+            lambda: AircraftDailyUtilization.objects.filter(aircraft_id=aircraft_id, date__gte=since).values('date', 'flight_hours'),
+        ),
+    }
+
+
+class Command(BaseCommand):
+    help = 'Seed a synthetic fleet and compare utilization reports computed from the history against the rollups'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--aircraft', type=int, default=100, help='Number of synthetic aircraft')
+        parser.add_argument('--days', type=int, default=730, help='Days of history per aircraft')
+        parser.add_argument('--repeat', type=int, default=20, help='Timed runs per query')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        today = date.today()
+        # Everything happens in one transaction that is rolled back
+        with transaction.atomic():
+            counts = generate_fleet(options['aircraft'], days=options['days'], seed=options['seed'], prefix='ROLL', today=today)
+            self.stdout.write(f"Seeded {counts['flying_operations']} flights")
+
+            started = time.perf_counter()
+            rows = rebuild_rollups()
+            self.stdout.write(f'Rebuilt rollups ({rows}) in {time.perf_counter() - started:.1f}s')
+
+            flight = FlyingOperation.objects.filter(aircraft__aircraft_number__startswith='ROLL-').first()
+            queries = utilization_queries(flight.aircraft_id, flight.pilot_id, (today - timedelta(days=365)).replace(day=1))
+            results = {name: [self.time_query(query, options['repeat']) for query in pair] for name, pair in queries.items()}
+            transaction.set_rollback(True)
+
+        self.stdout.write(f'\n{"report":26} {"history p50":>12} {"rollup p50":>12} {"speedup":>8}')
+        for name, (history, rollup) in results.items():
+            self.stdout.write(f'{name:26} {history:>10.2f}ms {rollup:>10.2f}ms {history / rollup:>7.1f}x')
+
+    def time_query(self, build_query, repeat):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            list(build_query())
+            timings.append((time.perf_counter() - started) * 1000)
+        return statistics.median(timings)
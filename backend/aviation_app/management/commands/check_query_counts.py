@@ -0,0 +1,321 @@
+import json
+from datetime import date, time, timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import URLResolver, reverse
+from rest_framework.test import APIClient
+from aviation_app.personnel import personnel_directory
+from aviation_app.querylog import QueryLog, query_budget
+from aviation_app.rollups import rebuild_rollups
+from aviation_app.tokens import ClaimsRefreshToken
+from aviation_app.urls import urlpatterns
+from aviation_app.models import (
+    User, Aircraft, LeadingParticulars, FlyingOperation,
+    MaintenanceSchedule, DeferredDefect, Limitation, MaintenanceForecast,
+    BeforeFlyingService, PilotAcceptance, PostFlying, DashboardSnapshot
+)
+
+LIST_ENDPOINTS = [
+    '/api/aircraft/',
+    '/api/leading-particulars/',
+    '/api/flying-operations/',
+    '/api/maintenance-schedules/',
+    '/api/deferred-defects/',
+    '/api/limitations/',
+    '/api/maintenance-forecasts/',
+    '/api/before-flying-service/',
+    '/api/pilot-acceptance/',
+    '/api/post-flying/',
+    '/api/post-flying/?fields=id,status',
+    '/api/before-flying-service/?compact=1',
+    '/api/post-flying/?compact=1',
+    '/api/dashboard/fleet/',
+    '/api/dashboard/fleet/?aircraft_type=FIGHTER&status=OPERATIONAL',
+    '/api/utilization/daily/',
+    '/api/utilization/missions/',
+    '/api/utilization/pilots/',
+]
+
+# Streamed; the queries run while the body is read
+EXPORT_ENDPOINTS = [
+    '/api/flying-operations/export/csv/',
+    '/api/deferred-defects/export/ndjson/',
+    '/api/maintenance-schedules/export/csv/?start=2000-01-01',
+]
+
+# List payloads for the bulk create endpoints, one item per seeded aircraft
+BULK_PAYLOADS = {
+    '/api/flying-operations/': lambda user, aircraft, today: {
+        'aircraft': aircraft.id, 'pilot': user.id, 'co_pilot': user.id, 'mission_type': 'TRAINING',
+        'flight_date': today.isoformat(), 'takeoff_time': '10:00', 'landing_time': '11:00', 'flight_hours': '1.00',
+        'departure_location': 'Base', 'arrival_location': 'Base', 'fuel_consumed': '100',
+    },
+    '/api/maintenance-schedules/': lambda user, aircraft, today: {
+        'aircraft': aircraft.id, 'maintenance_type': 'ROUTINE', 'scheduled_date': today.isoformat(),
+        'description': 'Bulk check', 'technician': user.id, 'estimated_hours': '2',
+    },
+}
+
+# Endpoints of aviation_app/urls.py left out of the query budget check, with the reason
+UNBUDGETED_ENDPOINTS = {
+    'workflow-events': 'an event stream, open until EVENT_STREAM_MAX_SECONDS',
+}
+
+# Query strings for GET endpoints that need parameters
+BUDGET_QUERY_STRINGS = {
+    'aircraft-by-type': 'type=FIGHTER',
+    'dashboard': 'aircraft_id={aircraft_id}',
+}
+
+BUDGET_PASSWORD = 'query-budget'
+
+# Requests for endpoints without GET; the other write endpoints are covered by the bulk checks
+# and the workflow load test
+BUDGET_POST_REQUESTS = {
+    'login': lambda user: {'pno': user.pno, 'password': BUDGET_PASSWORD},
+    'token_refresh': lambda user: {'refresh': str(ClaimsRefreshToken.for_user(user))},
+}
+
+BFS_USER_FIELDS = [
+    'fsi_initial_signature', 'assigned_ae', 'assigned_al', 'assigned_ao', 'assigned_ar', 'assigned_se',
+    'assigned_supervisor', 'ae_signature', 'al_signature', 'ao_signature', 'ar_signature', 'se_signature',
+    'supervisor_signature', 'fsi_signature',
+]
+
+
+def budget_patterns(patterns):
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            yield from budget_patterns(pattern.url_patterns)
+        else:
+            yield pattern
+
+
+class Command(BaseCommand):
+    help = (
+        'Assert that every list, export and bulk write endpoint runs the same number of queries whatever '
+        'the number of rows, and that every endpoint stays within its query budget (see querylog.py)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='2,20', help='Comma separated row counts to compare')
+        parser.add_argument(
+            '--fleet', action='store_true',
+            help='Check only the query budgets, against the data already in the database (e.g. from '
+                 'generate_synthetic_fleet) rather than seeded rows, rebuilding every aircraft\'s dashboard'
+        )
+
+    def handle(self, *args, **options):
+        if options['fleet']:
+            return self.check_fleet()
+        sizes = [int(size) for size in options['sizes'].split(',')]
+        counts = {endpoint: [] for endpoint in LIST_ENDPOINTS + EXPORT_ENDPOINTS}
+        counts.update({f'{method} {endpoint} (bulk)': [] for endpoint in BULK_PAYLOADS for method in ('POST', 'PATCH')})
+
+        budget_failures = []
+        for size in sizes:
+            # Seed inside a transaction that is always rolled back so the database is left untouched
+            with transaction.atomic():
+                user = self.seed(size)
+                client = APIClient()
+                client.force_authenticate(user)
+                for endpoint in LIST_ENDPOINTS:
+                    with CaptureQueriesContext(connection) as queries:
+                        response = client.get(endpoint)
+                    if response.status_code != 200:
+                        raise CommandError(f'{endpoint} returned {response.status_code}')
+                    counts[endpoint].append(len(queries))
+                for endpoint in EXPORT_ENDPOINTS:
+                    with CaptureQueriesContext(connection) as queries:
+                        response = client.get(endpoint)
+                        b''.join(response.streaming_content)
+                    if response.status_code != 200:
+                        raise CommandError(f'{endpoint} returned {response.status_code}')
+                    counts[endpoint].append(len(queries))
+                self.check_bulk_endpoints(client, counts)
+                if size == max(sizes):
+                    budget_failures = self.check_budgets(user)
+                transaction.set_rollback(True)
+
+        failures = []
+        for endpoint, endpoint_counts in counts.items():
+            line = f'{endpoint:40} ' + '  '.join(f'{size} rows: {count} queries' for size, count in zip(sizes, endpoint_counts))
+            if len(set(endpoint_counts)) == 1:
+                self.stdout.write(self.style.SUCCESS(f'✓ {line}'))
+            else:
+                failures.append(endpoint)
+                self.stdout.write(self.style.ERROR(f'✗ {line}'))
+
+        if failures:
+            raise CommandError(f'Query count grows with row count on: {", ".join(failures)}')
+        if budget_failures:
+            raise CommandError(f'Over their query budget or repeating queries: {", ".join(budget_failures)}')
+
+    def check_fleet(self):
+        # Rolled back like the seeded checks, so snapshots and the staff flag are left as they were
+        with transaction.atomic():
+            user = User.objects.filter(is_active=True).order_by('id').first()
+            if user is None or not Aircraft.objects.exists():
+                raise CommandError('No aircraft or users to check; run generate_synthetic_fleet first')
+            budget_failures = self.check_budgets(user) + self.check_dashboard_rebuilds(user)
+            transaction.set_rollback(True)
+        if budget_failures:
+            raise CommandError(f'Over their query budget or repeating queries: {", ".join(budget_failures)}')
+
+    def check_dashboard_rebuilds(self, user):
+        """Rebuild every aircraft's dashboard once; returns ['dashboard'] if the worst is over budget"""
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {ClaimsRefreshToken.for_user(user).access_token}')
+        DashboardSnapshot.objects.all().delete()
+        budget = query_budget('dashboard')
+        worst, worst_aircraft = 0, None
+        # Every cache a no-op, so each rebuild runs cold: token state and user details come from the database
+        dummy_caches = {alias: {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'} for alias in settings.CACHES}
+        for aircraft_id in Aircraft.objects.order_by('id').values_list('id', flat=True):
+            personnel_directory.clear_local()
+            with override_settings(CACHES=dummy_caches), CaptureQueriesContext(connection) as queries:
+                response = client.get(f"{reverse('dashboard')}?aircraft_id={aircraft_id}")
+            if response.status_code != 200:
+                raise CommandError(f'Dashboard of aircraft {aircraft_id} returned {response.status_code}')
+            if len(queries) > worst:
+                worst, worst_aircraft = len(queries), aircraft_id
+        line = f'dashboard rebuilds: worst {worst} / {budget} queries (aircraft {worst_aircraft})'
+        if worst > budget:
+            self.stdout.write(self.style.ERROR(f'✗ {line}'))
+            return ['dashboard']
+        self.stdout.write(self.style.SUCCESS(f'✓ {line}'))
+        return []
+
+    def budget_requests(self, user):
+        """(URL name, method, path, data) for every endpoint of aviation_app/urls.py that can be requested"""
+        aircraft = Aircraft.objects.order_by('id').first()
+        requests, skipped, seen = [], {}, set()
+        for pattern in budget_patterns(urlpatterns):
+            name, view = pattern.name, pattern.callback
+            if name in seen:
+                # Format suffix variants of a route
+                continue
+            seen.add(name)
+            if name in UNBUDGETED_ENDPOINTS:
+                skipped[name] = UNBUDGETED_ENDPOINTS[name]
+                continue
+            if name in BUDGET_POST_REQUESTS:
+                requests.append((name, 'POST', reverse(name), BUDGET_POST_REQUESTS[name](user)))
+                continue
+            actions = getattr(view, 'actions', None)
+            if 'get' not in (actions or {}) and not (actions is None and hasattr(getattr(view, 'cls', None), 'get')):
+                skipped[name] = 'no GET'
+                continue
+            kwargs = {}
+            if 'pk' in pattern.pattern.regex.groupindex:
+                kwargs['pk'] = view.cls.queryset.model.objects.order_by('pk').values_list('pk', flat=True).first()
+            if 'file_format' in pattern.pattern.regex.groupindex:
+                kwargs['file_format'] = 'csv'
+            path = reverse(name, kwargs=kwargs)
+            if name in BUDGET_QUERY_STRINGS:
+                path += '?' + BUDGET_QUERY_STRINGS[name].format(aircraft_id=aircraft.id)
+            requests.append((name, 'GET', path, None))
+        return requests, skipped
+
+    def check_budgets(self, user):
+        """Request every endpoint once as a staff user with a real access token; returns the failed URL names"""
+        user.is_staff = True
+        user.set_password(BUDGET_PASSWORD)
+        user.save()
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {ClaimsRefreshToken.for_user(user).access_token}')
+        threshold = getattr(settings, 'DUPLICATE_QUERY_THRESHOLD', 3)
+
+        requests, skipped = self.budget_requests(user)
+        failures = []
+        for name, method, path, data in requests:
+            with CaptureQueriesContext(connection) as queries:
+                response = client.generic(method, path, json.dumps(data), content_type='application/json') if data else client.get(path)
+                if response.streaming:
+                    b''.join(response.streaming_content)
+            query_log = QueryLog()
+            for query in queries.captured_queries:
+                query_log.add(query['sql'])
+            repeated = query_log.repeated(threshold)
+            budget = query_budget(name)
+            line = f'{method} {path:58} {len(queries):>3} / {budget} queries'
+            if response.status_code >= 400 or len(queries) > budget or repeated:
+                failures.append(name)
+                self.stdout.write(self.style.ERROR(f'✗ {line}  (status {response.status_code})'))
+                for key, count, source in repeated:
+                    self.stdout.write(f'    {count}x {key[:200]}')
+            else:
+                self.stdout.write(self.style.SUCCESS(f'✓ {line}'))
+        for name, reason in skipped.items():
+            self.stdout.write(f'- {name}: not budgeted ({reason})')
+        return failures
+
+    def check_bulk_endpoints(self, client, counts):
+        """POST one new row per aircraft as a list, then PATCH them all back as a list"""
+        today = date.today()
+        user = User.objects.order_by('id').last()
+        aircraft = list(Aircraft.objects.order_by('id'))
+        for endpoint, payload in BULK_PAYLOADS.items():
+            with CaptureQueriesContext(connection) as queries:
+                response = client.post(endpoint, [payload(user, item, today) for item in aircraft], format='json')
+            if response.status_code != 201:
+                raise CommandError(f'Bulk POST {endpoint} returned {response.status_code}: {response.data}')
+            counts[f'POST {endpoint} (bulk)'].append(len(queries))
+
+            changes = [{'id': row['id'], 'remarks': 'Bulk update'} for row in response.data]
+            with CaptureQueriesContext(connection) as queries:
+                response = client.patch(endpoint, changes, format='json')
+            if response.status_code != 200:
+                raise CommandError(f'Bulk PATCH {endpoint} returned {response.status_code}: {response.data}')
+            counts[f'PATCH {endpoint} (bulk)'].append(len(queries))
+
+    def seed(self, size):
+        """Create `size` fully linked rows for every listed model and return a user to authenticate as"""
+        users = [
+            User.objects.create_user(f'QC{size}-{index}', None, full_name=f'Query Check {index}', rank='Sergeant')
+            for index in range(size)
+        ]
+        today = date.today()
+
+        for index in range(size):
+            user = users[index]
+            aircraft = Aircraft.objects.create(
+                aircraft_number=f'QC{size}-{index}', aircraft_type='FIGHTER', model='Query Check', fuel_capacity=1000
+            )
+            LeadingParticulars.objects.create(
+                aircraft=aircraft, engine_type='Turbofan', engine_serial_number=f'QC{size}-{index}',
+                maximum_takeoff_weight=10000, maximum_landing_weight=9000, fuel_tank_capacity=1000
+            )
+            FlyingOperation.objects.create(
+                aircraft=aircraft, pilot=user, co_pilot=users[0], mission_type='TRAINING', flight_date=today,
+                takeoff_time=time(8, 0), landing_time=time(9, 0), flight_hours=1,
+                departure_location='Base', arrival_location='Base', fuel_consumed=100
+            )
+            MaintenanceSchedule.objects.create(
+                aircraft=aircraft, maintenance_type='ROUTINE', scheduled_date=today, description='Check',
+                technician=user, estimated_hours=2
+            )
+            DeferredDefect.objects.create(
+                aircraft=aircraft, defect_number=f'QC{size}-{index}', title='Defect', description='Defect',
+                severity='MINOR', reported_by=user, reported_date=today
+            )
+            Limitation.objects.create(
+                aircraft=aircraft, limitation_type='Speed', description='Limit', imposed_date=today, imposed_by=user
+            )
+            MaintenanceForecast.objects.create(
+                aircraft=aircraft, forecast_month=today + timedelta(days=31 * index),
+                estimated_flying_hours=10, estimated_maintenance_hours=2
+            )
+            bfs = BeforeFlyingService.objects.create(aircraft=aircraft, **{field: user for field in BFS_USER_FIELDS})
+            acceptance = PilotAcceptance.objects.create(bfs_record=bfs, aircraft=aircraft, pilot=user)
+            PostFlying.objects.create(
+                pilot_acceptance=acceptance, aircraft=aircraft, pilot=user, engineer=user,
+                status='COMPLETED', flight_hours=1
+            )
+
+        # Rollups are refreshed on commit, which never comes here
+        rebuild_rollups()
+        return users[0]
@@ -0,0 +1,54 @@
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+from aviation_app.exports import EXPORTS, WRITERS, export_blocks
+from aviation_app.models import Aircraft
+
+
+class Command(BaseCommand):
+    help = 'Stream flight, defect or maintenance history to a CSV or NDJSON file, the same format as the export endpoints'
+
+    def add_arguments(self, parser):
+        parser.add_argument('export', choices=sorted(EXPORTS), help='What to export')
+        parser.add_argument('--format', choices=sorted(WRITERS), default='csv', dest='file_format')
+        parser.add_argument('--aircraft', help='Aircraft number to export (default: the whole fleet)')
+        parser.add_argument('--start', help='First date to include, YYYY-MM-DD')
+        parser.add_argument('--end', help='Last date to include, YYYY-MM-DD')
+        parser.add_argument('--output', help='File to write (default: standard output)')
+        parser.add_argument('--chunk-size', type=int, help='Rows fetched per round trip (default: EXPORT_CHUNK_SIZE)')
+
+    def handle(self, *args, **options):
+        filters = {}
+        if options['aircraft']:
+            aircraft_id = Aircraft.objects.filter(aircraft_number=options['aircraft']).values_list('id', flat=True).first()
+            if aircraft_id is None:
+                raise CommandError(f"Unknown aircraft number: {options['aircraft']}")
+            filters['aircraft_id'] = aircraft_id
+        for name in ('start', 'end'):
+            if options[name]:
+                try:
+                    filters[name] = parse_date(options[name])
+                except ValueError:
+                    filters[name] = None
+                if filters[name] is None:
+                    raise CommandError(f'--{name} must be a date as YYYY-MM-DD')
+        if options['chunk_size'] is not None and options['chunk_size'] < 1:
+            raise CommandError('--chunk-size must be at least 1')
+
+        started = time.perf_counter()
+        blocks = export_blocks(options['export'], options['file_format'], options['chunk_size'], **filters)
+        output = open(options['output'], 'w', newline='', encoding='utf-8') if options['output'] else sys.stdout
+        try:
+            for block in blocks:
+                output.write(block)
+            size = output.tell() if output is not sys.stdout else None
+        finally:
+            if output is not sys.stdout:
+                output.close()
+
+        if size is not None:
+            self.stdout.write(self.style.SUCCESS(
+                f"Wrote {size / 1e6:.1f} MB to {options['output']} in {time.perf_counter() - started:.1f}s"
+            ))
@@ -0,0 +1,27 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from aviation_app.forecasting import generate_forecasts
+
+
+class Command(BaseCommand):
+    help = 'Project monthly flying and maintenance hours for the fleet and store them as maintenance forecasts'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--aircraft-id', type=int, action='append', dest='aircraft_ids',
+                            help='Aircraft to forecast; repeat for several (default: the whole fleet)')
+        parser.add_argument('--horizon', type=int, default=12, help='Months to forecast, starting next month')
+        parser.add_argument('--lookback', type=int, default=12, help='Months of history the projection is based on')
+        parser.add_argument('--half-life', type=float, default=3.0, help='Months over which a month\'s weight in the projection halves')
+
+    def handle(self, *args, **options):
+        if options['horizon'] < 1 or options['lookback'] < 1 or options['half_life'] <= 0:
+            raise CommandError('--horizon and --lookback must be at least 1 and --half-life positive')
+
+        started = time.perf_counter()
+        aircraft, rows = generate_forecasts(
+            options['aircraft_ids'], horizon=options['horizon'], lookback=options['lookback'], half_life=options['half_life'],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Wrote {rows} forecasts for {aircraft} aircraft in {time.perf_counter() - started:.1f}s'
+        ))
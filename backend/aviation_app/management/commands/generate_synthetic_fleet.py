@@ -0,0 +1,62 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils.dateparse import parse_date
+from aviation_app.caching import invalidate_namespace, AIRCRAFT_NAMESPACE, LEADING_PARTICULARS_NAMESPACE, PERSONNEL_NAMESPACE
+from aviation_app.rollups import rebuild_rollups
+from aviation_app.synthetic import generate_fleet
+
+
+class Command(BaseCommand):
+    help = (
+        'Create a deterministic synthetic fleet with years of flying, maintenance, defect, limitation and '
+        'BFS -> pilot acceptance -> post-flying history, for load testing at production scale'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--aircraft', type=int, default=1000, help='Number of aircraft; twice as many users are created')
+        parser.add_argument('--days', type=int, default=3 * 365, help='Days of flying, maintenance and defect history')
+        parser.add_argument('--workflow-days', type=int, default=90,
+                            help='Days at the end of the history that also get BFS -> acceptance -> post-flying chains')
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--prefix', default='SYN', help='Prefix of generated aircraft numbers, pnos and defect numbers')
+        parser.add_argument('--today', help='Date the history ends, YYYY-MM-DD (default: today); fix it to reproduce a dataset exactly')
+        parser.add_argument('--batch-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        today = None
+        if options['today']:
+            try:
+                today = parse_date(options['today'])
+            except ValueError:
+                today = None
+            if today is None:
+                raise CommandError('--today must be a date as YYYY-MM-DD')
+        if options['aircraft'] < 1 or options['days'] < 1 or not 0 <= options['workflow_days'] <= options['days']:
+            raise CommandError('--aircraft and --days must be at least 1, and --workflow-days between 0 and --days')
+
+        started = time.perf_counter()
+        try:
+            with transaction.atomic():
+                counts = generate_fleet(
+                    options['aircraft'], days=options['days'], seed=options['seed'], prefix=options['prefix'],
+                    batch_size=options['batch_size'], today=today, workflow_days=options['workflow_days'],
+                )
+        except ValueError as exc:
+            raise CommandError(str(exc))
+        generated = time.perf_counter() - started
+
+        # The bulk inserts sent no signals
+        self.stdout.write('Rebuilding utilization rollups...')
+        rebuild_rollups()
+        for namespace in (AIRCRAFT_NAMESPACE, LEADING_PARTICULARS_NAMESPACE, PERSONNEL_NAMESPACE):
+            invalidate_namespace(namespace)
+
+        for name, count in counts.items():
+            self.stdout.write(f'  {name:<24}{count:>12,}')
+        total = sum(counts.values())
+        self.stdout.write(self.style.SUCCESS(
+            f'Generated {total:,} rows in {generated:.1f}s ({total / generated:,.0f} rows/s); '
+            f'finished in {time.perf_counter() - started:.1f}s'
+        ))
@@ -0,0 +1,65 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from aviation_app.importer import IMPORT_MODELS, ImportFileError, LogbookImporter
+
+
+class Command(BaseCommand):
+    help = (
+        'Import legacy logbooks from CSV or NDJSON files (the export format, aircraft by number and users by pno). '
+        'Files are imported in dependency order: aircraft, users, then history'
+    )
+
+    def add_arguments(self, parser):
+        for kind in IMPORT_MODELS:
+            parser.add_argument(f'--{kind}', action='append', default=[], metavar='FILE', dest=kind,
+                                help=f'{kind.replace("-", " ").capitalize()} file to import; repeat for several')
+        parser.add_argument('--format', choices=['csv', 'ndjson'], dest='file_format',
+                            help='File format (default: csv for .csv files, otherwise ndjson)')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Records written per transaction')
+        parser.add_argument('--workers', type=int, help='Processes hashing user passwords (default: one per CPU)')
+        parser.add_argument('--resume', action='store_true', help='Continue files whose import was interrupted')
+        parser.add_argument('--restart', action='store_true', help='Import files again from the start, even if imported before')
+        parser.add_argument('--allow-duplicates', action='store_true',
+                            help='With --restart, also restart flying operation and maintenance files whose earlier '
+                                 'rows have no unique key; delete those rows first')
+
+    def handle(self, *args, **options):
+        files = [(kind, path) for kind in IMPORT_MODELS for path in options[kind]]
+        if not files:
+            raise CommandError(f"Nothing to import; pass at least one of {', '.join('--' + kind for kind in IMPORT_MODELS)}")
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be at least 1')
+        if options['resume'] and options['restart']:
+            raise CommandError('--resume and --restart cannot be combined')
+        if options['allow_duplicates'] and not options['restart']:
+            raise CommandError('--allow-duplicates only applies with --restart')
+
+        importer = LogbookImporter(options['batch_size'], options['workers'], progress=self.report)
+        started = time.perf_counter()
+        try:
+            for kind, path in files:
+                checkpoint = importer.import_file(
+                    kind, path, options['file_format'], options['resume'], options['restart'], options['allow_duplicates']
+                )
+                self.stdout.write(self.style.SUCCESS(
+                    f'{kind}: {path} done, {checkpoint.imported} imported, {checkpoint.rejected} rejected'
+                    + (f' (see {checkpoint.source}.rejects.ndjson)' if checkpoint.rejected else '')
+                ))
+        except (ImportFileError, OSError) as exc:
+            raise CommandError(str(exc))
+        finally:
+            self.stdout.write('Refreshing caches, dashboards and utilization rollups...')
+            importer.finish()
+
+        elapsed = time.perf_counter() - started
+        total = importer.records_read
+        self.stdout.write(self.style.SUCCESS(
+            f'Processed {total} records in {elapsed:.1f}s ({total / elapsed if elapsed else 0:.0f} records/s)'
+        ))
+
+    def report(self, checkpoint, rate):
+        self.stdout.write(
+            f'  {checkpoint.kind}: {checkpoint.records} records, {checkpoint.imported} imported, '
+            f'{checkpoint.rejected} rejected, {rate:.0f} records/s'
+        )
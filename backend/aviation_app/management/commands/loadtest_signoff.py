@@ -0,0 +1,81 @@
+import os
+import threading
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from rest_framework.test import APIClient
+from aviation_app.models import User, Aircraft, BeforeFlyingService, PilotAcceptance, PostFlying
+
+
+class Command(BaseCommand):
+    help = 'Fire concurrent post-flight engineer sign-offs at one aircraft and verify its flying hours stay exact'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sorties', type=int, default=40, help='Completed sorties to sign off')
+        parser.add_argument('--threads', type=int, default=8, help='Concurrent signing threads')
+        parser.add_argument('--duplicates', type=int, default=2, help='Concurrent sign-off attempts per sortie')
+
+    def handle(self, *args, **options):
+        sorties = options['sorties']
+        # Named per process, so runs side by side do not collide
+        suffix = os.getpid()
+        engineer = aircraft = None
+        try:
+            engineer = User.objects.create_user(f'LOADTEST-ENG-{suffix}', None, full_name='Load Test Engineer')
+            aircraft = Aircraft.objects.create(
+                aircraft_number=f'LOADTEST-{suffix}', aircraft_type='FIGHTER', model='Load Test', fuel_capacity=1000,
+                total_flying_hours=Decimal('100.00')
+            )
+            record_ids = []
+            expected = aircraft.total_flying_hours
+            for index in range(sorties):
+                bfs = BeforeFlyingService.objects.create(aircraft=aircraft)
+                acceptance = PilotAcceptance.objects.create(bfs_record=bfs, aircraft=aircraft, status='ACCEPTED')
+                hours = Decimal('1.25') + Decimal(index % 4) / 4
+                record_ids.append(PostFlying.objects.create(
+                    pilot_acceptance=acceptance, aircraft=aircraft, flight_status='COMPLETED', flight_hours=hours
+                ).id)
+                expected += hours
+
+            # Every sortie is signed several times at once; only one attempt per sortie may count
+            work = [record_id for record_id in record_ids for _ in range(options['duplicates'])]
+            results = {'signed': 0, 'rejected': 0, 'failed': 0}
+            lock = threading.Lock()
+
+            def sign_off(worker):
+                client = APIClient()
+                client.force_authenticate(engineer)
+                try:
+                    for record_id in work[worker::options['threads']]:
+                        response = client.post(f'/api/post-flying/{record_id}/sign_engineer/', {'pin': '0000'}, format='json')
+                        outcome = {200: 'signed', 400: 'rejected'}.get(response.status_code, 'failed')
+                        with lock:
+                            results[outcome] += 1
+                finally:
+                    connection.close()
+
+            started = time.perf_counter()
+            threads = [threading.Thread(target=sign_off, args=(worker,)) for worker in range(options['threads'])]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            elapsed = time.perf_counter() - started
+
+            aircraft.refresh_from_db()
+            self.stdout.write(
+                f'{len(work)} sign-off attempts on {connection.vendor} in {elapsed:.2f}s '
+                f'({len(work) / elapsed:.0f}/s): {results}'
+            )
+            self.stdout.write(f'Expected hours: {expected}  Actual hours: {aircraft.total_flying_hours}')
+
+            if results['signed'] != sorties or aircraft.total_flying_hours != expected:
+                raise CommandError('Lost or duplicated update detected')
+            self.stdout.write(self.style.SUCCESS('✓ Flying hours are exact'))
+        finally:
+            if aircraft is not None:
+                aircraft.delete()
+            if engineer is not None:
+                engineer.delete()
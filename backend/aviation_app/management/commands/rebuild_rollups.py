@@ -0,0 +1,23 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from aviation_app.rollups import ROLLUPS, rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = 'Recompute the utilization rollup tables from the full flying and post-flying history'
+
+    def add_arguments(self, parser):
+        parser.add_argument('rollups', nargs='*', help=f"Rollups to rebuild: {', '.join(ROLLUPS)} (default: all)")
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows per INSERT')
+
+    def handle(self, *args, **options):
+        unknown = set(options['rollups']) - set(ROLLUPS)
+        if unknown:
+            raise CommandError(f"Unknown rollups: {', '.join(sorted(unknown))}")
+
+        started = time.perf_counter()
+        counts = rebuild_rollups(options['rollups'], batch_size=options['batch_size'])
+        for name, count in counts.items():
+            self.stdout.write(f'{name}: {count} rows')
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {len(counts)} rollups in {time.perf_counter() - started:.1f}s'))
@@ -0,0 +1,299 @@
+"""
+Per-request instrumentation: for every request RequestMetricsMiddleware records the view name,
+SQL query count and time, repeated queries (see querylog.py), serializer time and wall time. Each view keeps the last
+METRICS_WINDOW samples, so memory stays bounded however long the process runs, and the
+quantiles over that window are served in Prometheus text format at /api/metrics/ (staff only).
+Figures are per process: with several workers, each reports its own requests.
+
+Staff can add `?profile=1` to a request to get a cProfile summary of it instead of the
+response (synchronous serving only; under ASGI the view runs on other threads).
+"""
+import cProfile
+import contextvars
+import io
+import pstats
+import threading
+import time
+from collections import deque
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from django.http import HttpResponse
+from rest_framework import serializers
+from rest_framework.exceptions import AuthenticationFailed
+
+from .querylog import QueryLog, log_slow_query, report_queries
+from .tokens import jwt_authentication
+
+QUANTILES = (0.5, 0.9, 0.99)
+
+# (metric name, help text, RequestStats attribute)
+SAMPLE_METRICS = [
+    ('aviation_request_duration_seconds', 'Wall time spent in the view and middleware', 'duration'),
+    ('aviation_request_sql_queries', 'SQL queries run by a request', 'queries'),
+    ('aviation_request_duplicate_sql_queries', 'Queries repeating the normalized SQL of an earlier query', 'duplicates'),
+    ('aviation_request_sql_duration_seconds', 'Time spent executing SQL; summed when run on several threads', 'sql_time'),
+    ('aviation_request_serializer_duration_seconds', 'Time spent in serializer .data, including its queries; summed when run on several threads', 'serializer_time'),
+]
+
+PROFILE_SORT_KEYS = ('cumulative', 'tottime', 'calls')
+PROFILE_LINES = 60
+
+
+class RequestStats:
+    """Totals for one request; shared with the threads its async parts run on"""
+
+    def __init__(self, request):
+        self.request = request
+        self.started = time.perf_counter()
+        self.duration = 0.0
+        self.queries = 0
+        self.sql_time = 0.0
+        self.serializer_time = 0.0
+        self.query_log = QueryLog()
+        # Reentrant: a query run while one is being recorded is recorded on the same thread
+        self._lock = threading.RLock()
+
+    @property
+    def duplicates(self):
+        return self.query_log.duplicates
+
+    def add_query(self, sql, elapsed):
+        with self._lock:
+            self.queries += 1
+            self.sql_time += elapsed
+            self.query_log.add(sql)
+
+    def add_serializer_time(self, elapsed):
+        with self._lock:
+            self.serializer_time += elapsed
+
+    def finish(self):
+        self.duration = time.perf_counter() - self.started
+
+
+# The stats of the request being served; sync_to_async copies it to the threads a request uses
+current_request = contextvars.ContextVar('current_request', default=None)
+_serializing = contextvars.ContextVar('serializing', default=False)
+
+
+def record_query(execute, sql, params, many, context):
+    """Database execute wrapper adding each query to the current request's stats"""
+    stats = current_request.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        elapsed = time.perf_counter() - started
+        stats.add_query(sql, elapsed)
+        log_slow_query(view_name(stats.request), sql, elapsed)
+
+
+@receiver(connection_created)
+def instrument_connection(sender, connection, **kwargs):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+def install_serializer_timing():
+    """
+    Time BaseSerializer.data, which Serializer.data and ListSerializer.data both go through.
+    Serializers rendered inside another serializer's .data count once, as part of the outer one.
+    """
+    data = serializers.BaseSerializer.data
+    if getattr(data.fget, 'timed', False):
+        return
+
+    def timed_data(self):
+        stats = current_request.get()
+        if stats is None or _serializing.get():
+            return data.fget(self)
+        token = _serializing.set(True)
+        started = time.perf_counter()
+        try:
+            return data.fget(self)
+        finally:
+            stats.add_serializer_time(time.perf_counter() - started)
+            _serializing.reset(token)
+
+    timed_data.timed = True
+    serializers.BaseSerializer.data = property(timed_data)
+
+
+class ViewMetrics:
+    """Rolling window of one view's recent samples, plus counters since the process started"""
+
+    def __init__(self, window):
+        self.samples = deque(maxlen=window)
+        self.count = 0
+        self.totals = dict.fromkeys((attribute for name, help_text, attribute in SAMPLE_METRICS), 0.0)
+        self.statuses = {}
+
+    def add(self, stats, status_code):
+        self.samples.append(tuple(getattr(stats, attribute) for name, help_text, attribute in SAMPLE_METRICS))
+        self.count += 1
+        for name, help_text, attribute in SAMPLE_METRICS:
+            self.totals[attribute] += getattr(stats, attribute)
+        self.statuses[status_code] = self.statuses.get(status_code, 0) + 1
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._views = {}
+        self._lock = threading.Lock()
+
+    def record(self, view_name, stats, status_code):
+        window = getattr(settings, 'METRICS_WINDOW', 1024)
+        with self._lock:
+            if view_name not in self._views:
+                self._views[view_name] = ViewMetrics(window)
+            self._views[view_name].add(stats, status_code)
+
+    def clear(self):
+        with self._lock:
+            self._views.clear()
+
+    def render(self):
+        """Prometheus text exposition format: a summary per metric and a response counter per view and status"""
+        with self._lock:
+            views = {name: (list(view.samples), view.count, dict(view.totals), dict(view.statuses))
+                     for name, view in sorted(self._views.items())}
+
+        lines = []
+        for index, (name, help_text, attribute) in enumerate(SAMPLE_METRICS):
+            lines.append(f'# HELP {name} {help_text}, over each view\'s last requests')
+            lines.append(f'# TYPE {name} summary')
+            for view_name, (samples, count, totals, statuses) in views.items():
+                label = f'view="{escape_label(view_name)}"'
+                values = sorted(sample[index] for sample in samples)
+                for quantile in QUANTILES:
+                    value = values[min(len(values) - 1, int(len(values) * quantile))]
+                    lines.append(f'{name}{{{label},quantile="{quantile}"}} {value:g}')
+                lines.append(f'{name}_sum{{{label}}} {totals[attribute]:g}')
+                lines.append(f'{name}_count{{{label}}} {count}')
+
+        lines.append('# HELP aviation_responses_total Responses sent, by view and status code')
+        lines.append('# TYPE aviation_responses_total counter')
+        for view_name, (samples, count, totals, statuses) in views.items():
+            for status_code, responses in sorted(statuses.items()):
+                lines.append(f'aviation_responses_total{{view="{escape_label(view_name)}",status="{status_code}"}} {responses}')
+        return '\n'.join(lines) + '\n'
+
+
+def escape_label(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+registry = MetricsRegistry()
+
+
+def view_name(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unmatched'
+    return match.view_name or match.route
+
+
+def is_staff_request(request):
+    """Whether the request carries a staff user's access token; the middleware runs before the view authenticates"""
+    try:
+        result = jwt_authentication().authenticate(request)
+    except AuthenticationFailed:
+        return False
+    return result is not None and result[0].is_staff
+
+
+def profile_response(request, response, stats, profiler):
+    sort_key = request.GET.get('profile_sort', 'cumulative')
+    if sort_key not in PROFILE_SORT_KEYS:
+        sort_key = 'cumulative'
+    output = io.StringIO()
+    output.write(
+        f'{request.method} {request.get_full_path()}\n'
+        f'view: {view_name(request)}  status: {response.status_code}\n'
+        f'wall: {stats.duration * 1000:.2f} ms  sql: {stats.queries} queries, {stats.sql_time * 1000:.2f} ms  '
+        f'serializers: {stats.serializer_time * 1000:.2f} ms\n'
+    )
+    for key, count, source in stats.query_log.repeated(2):
+        output.write(f'{count}x from {source or "the view"}: {key}\n')
+    output.write('\n')
+    pstats.Stats(profiler, stream=output).sort_stats(sort_key).print_stats(PROFILE_LINES)
+    return HttpResponse(output.getvalue(), content_type='text/plain; charset=utf-8')
+
+
+class RequestMetricsMiddleware:
+    """Records every request in the metrics registry; place it first so its wall time covers the other middleware"""
+    sync_capable = True
+    async_capable = True
+    # cProfile cannot profile two requests at once
+    profile_lock = threading.Lock()
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'METRICS_ENABLED', True):
+            raise MiddlewareNotUsed
+        install_serializer_timing()
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if self.wants_profile(request):
+            return self.profile(request)
+        stats = RequestStats(request)
+        token = current_request.set(stats)
+        try:
+            response = self.get_response(request)
+        finally:
+            current_request.reset(token)
+            stats.finish()
+        self.record(request, response, stats)
+        return response
+
+    async def __acall__(self, request):
+        stats = RequestStats(request)
+        token = current_request.set(stats)
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_request.reset(token)
+            stats.finish()
+        self.record(request, response, stats)
+        return response
+
+    def record(self, request, response, stats):
+        name = view_name(request)
+        registry.record(name, stats, response.status_code)
+        if request.resolver_match is not None:
+            report_queries(name, request.method, stats.queries, stats.query_log)
+
+    def wants_profile(self, request):
+        return (
+            request.GET.get('profile') == '1'
+            and getattr(settings, 'REQUEST_PROFILING', True)
+            and is_staff_request(request)
+        )
+
+    def profile(self, request):
+        """Serve the request under cProfile and return the profile; left out of the metrics"""
+        stats = RequestStats(request)
+        profiler = cProfile.Profile()
+        with self.profile_lock:
+            token = current_request.set(stats)
+            profiler.enable()
+            try:
+                response = self.get_response(request)
+                if response.streaming and response.get('Content-Type') != 'text/event-stream':
+                    # Exhausted so the summary covers producing the content; event streams never end
+                    b''.join(response.streaming_content)
+            finally:
+                profiler.disable()
+                current_request.reset(token)
+                stats.finish()
+        return profile_response(request, response, stats, profiler)
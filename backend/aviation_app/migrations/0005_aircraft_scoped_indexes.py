@@ -0,0 +1,45 @@
+# Generated by Django 4.2.7 on 2026-10-18 15:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('aviation_app', '0004_dashboardsnapshot'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='beforeflyingservice',
+            index=models.Index(fields=['aircraft', '-service_date'], name='bfs_aircraft_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='deferreddefect',
+            index=models.Index(fields=['aircraft', '-reported_date'], name='defect_aircraft_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='deferreddefect',
+            index=models.Index(condition=models.Q(('status__in', ['OPEN', 'IN_PROGRESS', 'DEFERRED'])), fields=['aircraft', '-reported_date'], name='defect_aircraft_open_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='flyingoperation',
+            index=models.Index(fields=['aircraft', '-flight_date', '-takeoff_time'], name='flyingop_aircraft_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='limitation',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['aircraft', '-imposed_date'], name='limitation_aircraft_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='maintenanceschedule',
+            index=models.Index(fields=['aircraft', 'status', 'scheduled_date'], name='maint_aircraft_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='pilotacceptance',
+            index=models.Index(fields=['aircraft', '-acceptance_date'], name='acceptance_aircraft_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='postflying',
+            index=models.Index(fields=['aircraft', '-post_flight_date'], name='postflying_aircraft_date_idx'),
+        ),
+    ]
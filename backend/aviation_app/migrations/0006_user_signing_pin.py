@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-18 15:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('aviation_app', '0005_aircraft_scoped_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='signing_pin',
+            field=models.CharField(blank=True, help_text='Hashed PIN used to sign BFS records', max_length=128, null=True),
+        ),
+    ]
@@ -0,0 +1,82 @@
+# Generated by Django 4.2.7 on 2026-10-18 15:53
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('aviation_app', '0006_user_signing_pin'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PilotUtilization',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField(help_text='First day of the month')),
+                ('flights', models.PositiveIntegerField(default=0)),
+                ('flight_hours', models.DecimalField(decimal_places=2, default=0, max_digits=10)),
+                ('co_pilot_flights', models.PositiveIntegerField(default=0)),
+                ('co_pilot_hours', models.DecimalField(decimal_places=2, default=0, max_digits=10)),
+                ('sorties', models.PositiveIntegerField(default=0, help_text='Completed post-flying records')),
+                ('sortie_hours', models.DecimalField(decimal_places=2, default=0, max_digits=10)),
+                ('pilot', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='utilization', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Pilot Utilization',
+                'verbose_name_plural': 'Pilot Utilization',
+                'ordering': ['-month'],
+            },
+        ),
+        migrations.CreateModel(
+            name='AircraftMissionUtilization',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField(help_text='First day of the month')),
+                ('mission_type', models.CharField(choices=[('TRAINING', 'Training'), ('COMBAT', 'Combat'), ('TRANSPORT', 'Transport'), ('RECONNAISSANCE', 'Reconnaissance'), ('PATROL', 'Patrol'), ('OTHER', 'Other')], max_length=50)),
+                ('flights', models.PositiveIntegerField(default=0)),
+                ('flight_hours', models.DecimalField(decimal_places=2, default=0, max_digits=10)),
+                ('fuel_consumed', models.DecimalField(decimal_places=2, default=0, help_text='In Liters', max_digits=12)),
+                ('aircraft', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='mission_utilization', to='aviation_app.aircraft')),
+            ],
+            options={
+                'verbose_name': 'Aircraft Mission Utilization',
+                'verbose_name_plural': 'Aircraft Mission Utilization',
+                'ordering': ['-month', 'mission_type'],
+            },
+        ),
+        migrations.CreateModel(
+            name='AircraftDailyUtilization',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('flights', models.PositiveIntegerField(default=0)),
+                ('flight_hours', models.DecimalField(decimal_places=2, default=0, max_digits=10)),
+                ('fuel_consumed', models.DecimalField(decimal_places=2, default=0, help_text='In Liters', max_digits=12)),
+                ('sorties', models.PositiveIntegerField(default=0, help_text='Completed post-flying records')),
+                ('sortie_hours', models.DecimalField(decimal_places=2, default=0, max_digits=10)),
+                ('landings', models.PositiveIntegerField(default=0)),
+                ('aircraft', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_utilization', to='aviation_app.aircraft')),
+            ],
+            options={
+                'verbose_name': 'Aircraft Daily Utilization',
+                'verbose_name_plural': 'Aircraft Daily Utilization',
+                'ordering': ['-date'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='pilotutilization',
+            constraint=models.UniqueConstraint(fields=('pilot', 'month'), name='pilot_utilization_unique'),
+        ),
+        migrations.AddConstraint(
+            model_name='aircraftmissionutilization',
+            constraint=models.UniqueConstraint(fields=('aircraft', 'month', 'mission_type'), name='mission_utilization_unique'),
+        ),
+        migrations.AddConstraint(
+            model_name='aircraftdailyutilization',
+            constraint=models.UniqueConstraint(fields=('aircraft', 'date'), name='daily_utilization_unique'),
+        ),
+    ]
@@ -0,0 +1,26 @@
+from django.db import migrations
+
+# Signing used to copy the typed PIN, or the account password of users without one, into these
+SIGNATURE_PIN_FIELDS = {
+    'BeforeFlyingService': [
+        'fsi_initial_pin', 'ae_pin', 'al_pin', 'ao_pin', 'ar_pin', 'se_pin', 'supervisor_pin', 'fsi_pin',
+    ],
+    'PilotAcceptance': ['pilot_pin'],
+    'PostFlying': ['pilot_pin', 'engineer_pin'],
+}
+
+
+def clear_signature_pins(apps, schema_editor):
+    for model_name, fields in SIGNATURE_PIN_FIELDS.items():
+        apps.get_model('aviation_app', model_name).objects.update(**dict.fromkeys(fields))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('aviation_app', '0009_user_tokens_revoked_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(clear_signature_pins, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-18 16:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('aviation_app', '0010_clear_signature_pins'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dashboardsnapshot',
+            name='version',
+            field=models.PositiveIntegerField(default=0, help_text='Incremented whenever the snapshot is marked stale'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 4.2.7 on 2026-10-18 17:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('aviation_app', '0011_dashboardsnapshot_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='maintenanceschedule',
+            name='inspection_type',
+            field=models.CharField(blank=True, max_length=50, null=True),
+        ),
+        migrations.AddField(
+            model_name='maintenanceschedule',
+            name='section',
+            field=models.CharField(blank=True, choices=[('AE', 'Airframe and Engine'), ('AL', 'Electrical'), ('AR', 'Radio'), ('AO', 'Armament')], max_length=2, null=True),
+        ),
+        migrations.AddField(
+            model_name='maintenanceschedule',
+            name='sign_off',
+            field=models.JSONField(blank=True, null=True),
+        ),
+    ]
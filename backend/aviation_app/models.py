@@ -1,4 +1,5 @@
 from django.db import models
+from django.core.serializers.json import DjangoJSONEncoder
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager, PermissionsMixin
 from django.utils import timezone
 
@@ -31,6 +32,8 @@ class User(AbstractBaseUser, PermissionsMixin):
     is_active = models.BooleanField(default=True)
     is_staff = models.BooleanField(default=False)
     date_joined = models.DateTimeField(default=timezone.now)
+    signing_pin = models.CharField(max_length=128, blank=True, null=True, help_text='Hashed PIN used to sign BFS records')
+    tokens_revoked_at = models.DateTimeField(blank=True, null=True, help_text='Tokens issued before this time are rejected')
 
     objects = UserManager()
 
@@ -44,6 +47,11 @@ class User(AbstractBaseUser, PermissionsMixin):
     def __str__(self):
         return f"{self.pno} - {self.full_name}"
 
+    def set_signing_pin(self, raw_pin):
+        from .pins import make_signing_pin, pin_cache
+        self.signing_pin = make_signing_pin(raw_pin)
+        pin_cache.invalidate_user(self.pk)
+
 
 class Aircraft(models.Model):
     AIRCRAFT_TYPE_CHOICES = [
@@ -142,6 +150,9 @@ class FlyingOperation(models.Model):
 
     class Meta:
         ordering = ['-flight_date', '-takeoff_time']
+        indexes = [
+            models.Index(fields=['aircraft', '-flight_date', '-takeoff_time'], name='flyingop_aircraft_date_idx'),
+        ]
         verbose_name = 'Flying Operation'
         verbose_name_plural = 'Flying Operations'
 
@@ -164,6 +175,13 @@ class MaintenanceSchedule(models.Model):
         ('CANCELLED', 'Cancelled'),
     ]
 
+    SECTION_CHOICES = [
+        ('AE', 'Airframe and Engine'),
+        ('AL', 'Electrical'),
+        ('AR', 'Radio'),
+        ('AO', 'Armament'),
+    ]
+
     aircraft = models.ForeignKey(Aircraft, on_delete=models.CASCADE, related_name='maintenance_schedules')
     maintenance_type = models.CharField(max_length=50, choices=MAINTENANCE_TYPE_CHOICES)
     scheduled_date = models.DateField()
@@ -180,11 +198,21 @@ class MaintenanceSchedule(models.Model):
     cost = models.DecimalField(max_digits=10, decimal_places=2, blank=True, null=True)
     remarks = models.TextField(blank=True, null=True)
 
+    # Job card sign-off: the card's inspection ('100 Hourly', '3 Monthly', ...), the trade
+    # section of the job, and who signed it ({'tradesmen': [{'pno', 'name'}], 'supervisors': [...],
+    # 'ato_signature': ...})
+    inspection_type = models.CharField(max_length=50, blank=True, null=True)
+    section = models.CharField(max_length=2, choices=SECTION_CHOICES, blank=True, null=True)
+    sign_off = models.JSONField(blank=True, null=True)
+
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ['-scheduled_date']
+        indexes = [
+            models.Index(fields=['aircraft', 'status', 'scheduled_date'], name='maint_aircraft_status_idx'),
+        ]
         verbose_name = 'Maintenance Schedule'
         verbose_name_plural = 'Maintenance Schedules'
 
@@ -225,6 +253,13 @@ class DeferredDefect(models.Model):
 
     class Meta:
         ordering = ['-reported_date']
+        indexes = [
+            models.Index(fields=['aircraft', '-reported_date'], name='defect_aircraft_date_idx'),
+            models.Index(
+                fields=['aircraft', '-reported_date'], name='defect_aircraft_open_idx',
+                condition=models.Q(status__in=['OPEN', 'IN_PROGRESS', 'DEFERRED']),
+            ),
+        ]
         verbose_name = 'Deferred Defect'
         verbose_name_plural = 'Deferred Defects'
 
@@ -247,6 +282,12 @@ class Limitation(models.Model):
 
     class Meta:
         ordering = ['-imposed_date']
+        indexes = [
+            models.Index(
+                fields=['aircraft', '-imposed_date'], name='limitation_aircraft_active_idx',
+                condition=models.Q(is_active=True),
+            ),
+        ]
         verbose_name = 'Limitation'
         verbose_name_plural = 'Limitations'
 
@@ -345,6 +386,9 @@ class BeforeFlyingService(models.Model):
 
     class Meta:
         ordering = ['-service_date']
+        indexes = [
+            models.Index(fields=['aircraft', '-service_date'], name='bfs_aircraft_date_idx'),
+        ]
         verbose_name = 'Before Flying Service'
         verbose_name_plural = 'Before Flying Services'
 
@@ -389,6 +433,9 @@ class PilotAcceptance(models.Model):
 
     class Meta:
         ordering = ['-acceptance_date']
+        indexes = [
+            models.Index(fields=['aircraft', '-acceptance_date'], name='acceptance_aircraft_date_idx'),
+        ]
         verbose_name = 'Pilot Acceptance'
         verbose_name_plural = 'Pilot Acceptances'
 
@@ -449,8 +496,121 @@ class PostFlying(models.Model):
 
     class Meta:
         ordering = ['-post_flight_date']
+        indexes = [
+            models.Index(fields=['aircraft', '-post_flight_date'], name='postflying_aircraft_date_idx'),
+        ]
         verbose_name = 'Post Flying'
         verbose_name_plural = 'Post Flying Records'
 
     def __str__(self):
         return f"Post Flying - {self.aircraft.aircraft_number} - {self.post_flight_date.strftime('%Y-%m-%d %H:%M')}"
+
+
+class DashboardSnapshot(models.Model):
+    """Precomputed dashboard document for one aircraft, rebuilt when its source rows change"""
+    aircraft = models.OneToOneField(Aircraft, on_delete=models.CASCADE, related_name='dashboard_snapshot')
+    payload = models.JSONField(encoder=DjangoJSONEncoder)
+    etag = models.CharField(max_length=64)
+    built_on = models.DateField(help_text='Date the date-relative sections were computed for')
+    is_stale = models.BooleanField(default=False)
+    version = models.PositiveIntegerField(default=0, help_text='Incremented whenever the snapshot is marked stale')
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'Dashboard Snapshot'
+        verbose_name_plural = 'Dashboard Snapshots'
+
+    def __str__(self):
+        return f"Dashboard Snapshot - {self.aircraft_id}"
+
+
+class AircraftDailyUtilization(models.Model):
+    """Per-aircraft, per-day totals of logged flights and completed post-flying sorties; see rollups.py"""
+    aircraft = models.ForeignKey(Aircraft, on_delete=models.CASCADE, related_name='daily_utilization')
+    date = models.DateField()
+    flights = models.PositiveIntegerField(default=0)
+    flight_hours = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    fuel_consumed = models.DecimalField(max_digits=12, decimal_places=2, default=0, help_text='In Liters')
+    sorties = models.PositiveIntegerField(default=0, help_text='Completed post-flying records')
+    sortie_hours = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    landings = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ['-date']
+        constraints = [
+            models.UniqueConstraint(fields=['aircraft', 'date'], name='daily_utilization_unique'),
+        ]
+        verbose_name = 'Aircraft Daily Utilization'
+        verbose_name_plural = 'Aircraft Daily Utilization'
+
+    def __str__(self):
+        return f"{self.aircraft_id} - {self.date}"
+
+
+class AircraftMissionUtilization(models.Model):
+    """Per-aircraft, per-month logged flights by mission type; see rollups.py"""
+    aircraft = models.ForeignKey(Aircraft, on_delete=models.CASCADE, related_name='mission_utilization')
+    month = models.DateField(help_text='First day of the month')
+    mission_type = models.CharField(max_length=50, choices=FlyingOperation.MISSION_TYPE_CHOICES)
+    flights = models.PositiveIntegerField(default=0)
+    flight_hours = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    fuel_consumed = models.DecimalField(max_digits=12, decimal_places=2, default=0, help_text='In Liters')
+
+    class Meta:
+        ordering = ['-month', 'mission_type']
+        constraints = [
+            models.UniqueConstraint(fields=['aircraft', 'month', 'mission_type'], name='mission_utilization_unique'),
+        ]
+        verbose_name = 'Aircraft Mission Utilization'
+        verbose_name_plural = 'Aircraft Mission Utilization'
+
+    def __str__(self):
+        return f"{self.aircraft_id} - {self.month:%Y-%m} - {self.mission_type}"
+
+
+class PilotUtilization(models.Model):
+    """Per-pilot, per-month flights as pilot and co-pilot, and completed sorties; see rollups.py"""
+    pilot = models.ForeignKey(User, on_delete=models.CASCADE, related_name='utilization')
+    month = models.DateField(help_text='First day of the month')
+    flights = models.PositiveIntegerField(default=0)
+    flight_hours = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    co_pilot_flights = models.PositiveIntegerField(default=0)
+    co_pilot_hours = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    sorties = models.PositiveIntegerField(default=0, help_text='Completed post-flying records')
+    sortie_hours = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+
+    class Meta:
+        ordering = ['-month']
+        constraints = [
+            models.UniqueConstraint(fields=['pilot', 'month'], name='pilot_utilization_unique'),
+        ]
+        verbose_name = 'Pilot Utilization'
+        verbose_name_plural = 'Pilot Utilization'
+
+    def __str__(self):
+        return f"{self.pilot_id} - {self.month:%Y-%m}"
+
+
+class ImportCheckpoint(models.Model):
+    """How far a bulk import of one file got; saved with each committed batch so it can be resumed"""
+    kind = models.CharField(max_length=50)
+    source = models.CharField(max_length=500, help_text='Absolute path of the imported file')
+    source_size = models.BigIntegerField(help_text='File size in bytes when the import started')
+    records = models.PositiveBigIntegerField(default=0, help_text='Records read and committed, imported or rejected')
+    imported = models.PositiveBigIntegerField(default=0)
+    rejected = models.PositiveBigIntegerField(default=0)
+    completed = models.BooleanField(default=False)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['kind', 'source'], name='import_checkpoint_unique'),
+        ]
+        verbose_name = 'Import Checkpoint'
+        verbose_name_plural = 'Import Checkpoints'
+
+    def __str__(self):
+        return f"{self.kind} - {self.source}"
@@ -0,0 +1,131 @@
+"""
+Password hashing for logins. PASSWORD_HASHER picks scrypt (the default) or Argon2 with the
+parameters below instead of Django's PBKDF2, whose 600,000 iterations cost several times more
+CPU per login for less resistance to GPU cracking. Hashes made with another hasher or older
+parameters still verify, and are replaced on the user's next successful login.
+
+Verifying and rehashing run on a bounded pool of PASSWORD_HASH_WORKERS threads per process
+(default: the CPUs the container may use), so a burst of logins at the start of a shift cannot
+hash more passwords at once than there are cores to run them, nor hold more hashes' memory
+(scrypt and Argon2 release the GIL, so the process keeps serving other requests on its other
+threads meanwhile). Set it to 1 when several worker processes share a small CPU or memory
+limit. A login waiting longer than PASSWORD_HASH_TIMEOUT seconds for the pool is turned away
+with PasswordCheckBusy.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.hashers import Argon2PasswordHasher, ScryptPasswordHasher, check_password, make_password
+
+from .models import User
+from .utils import available_cpus
+
+
+class TunedScryptPasswordHasher(ScryptPasswordHasher):
+    """
+    Scrypt with settings-driven parameters. The default work factor 2**15 (32 MiB per hash)
+    doubles Django's, at under half of PBKDF2's CPU time.
+    """
+    # A limit, not an allocation: OpenSSL's default of 32 MiB refuses work factors above 2**14
+    maxmem = 1024 * 1024 * 1024
+
+    @property
+    def work_factor(self):
+        return getattr(settings, 'PASSWORD_SCRYPT_WORK_FACTOR', 2 ** 15)
+
+    @property
+    def block_size(self):
+        return getattr(settings, 'PASSWORD_SCRYPT_BLOCK_SIZE', 8)
+
+    @property
+    def parallelism(self):
+        return getattr(settings, 'PASSWORD_SCRYPT_PARALLELISM', 1)
+
+
+class TunedArgon2PasswordHasher(Argon2PasswordHasher):
+    """
+    Argon2id with settings-driven parameters; needs argon2-cffi. The defaults (19 MiB, two
+    passes, one lane) follow the OWASP minimum: one lane per hash suits the thread pool, which
+    already runs a hash per core, better than Django's eight.
+    """
+
+    @property
+    def time_cost(self):
+        return getattr(settings, 'PASSWORD_ARGON2_TIME_COST', 2)
+
+    @property
+    def memory_cost(self):
+        return getattr(settings, 'PASSWORD_ARGON2_MEMORY_COST', 19456)
+
+    @property
+    def parallelism(self):
+        return getattr(settings, 'PASSWORD_ARGON2_PARALLELISM', 1)
+
+
+class PasswordCheckBusy(Exception):
+    """Raised when a password check waited longer than PASSWORD_HASH_TIMEOUT for the hashing pool"""
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def hashing_pool():
+    # Started on first use, so each forked worker gets its own threads
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'PASSWORD_HASH_WORKERS', None) or available_cpus(),
+                thread_name_prefix='password-hash',
+            )
+        return _pool
+
+
+def run_hashing(function, *args):
+    future = hashing_pool().submit(function, *args)
+    try:
+        return future.result(timeout=getattr(settings, 'PASSWORD_HASH_TIMEOUT', 10))
+    except TimeoutError:
+        future.cancel()
+        raise PasswordCheckBusy()
+
+
+def _verify(password, encoded):
+    """(whether the password matches, its new hash if the stored one is outdated)"""
+    upgraded = []
+    valid = check_password(password, encoded, setter=lambda raw: upgraded.append(make_password(raw)))
+    return valid, upgraded[0] if upgraded else None
+
+
+def check_user_password(user, password):
+    """
+    User.check_password on the hashing pool. An outdated hash is replaced by assigning the new
+    one, not through set_password, so the upgrade does not revoke the user's tokens.
+    """
+    valid, upgraded = run_hashing(_verify, password, user.password)
+    if upgraded:
+        user.password = upgraded
+        user.save(update_fields=['password'])
+    return valid
+
+
+class PooledModelBackend(ModelBackend):
+    """ModelBackend checking passwords on the hashing pool; database queries stay on the request thread"""
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        if username is None:
+            username = kwargs.get(User.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+        try:
+            user = User._default_manager.get_by_natural_key(username)
+        except User.DoesNotExist:
+            # Hash anyway, so unknown usernames take as long as wrong passwords
+            run_hashing(make_password, password)
+            return None
+        if check_user_password(user, password) and self.user_can_authenticate(user):
+            return user
+        return None
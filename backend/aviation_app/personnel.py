@@ -0,0 +1,259 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import models
+from rest_framework import serializers
+from rest_framework.fields import SkipField
+
+
+class PersonnelDirectory:
+    """
+    Display details (name, PNO, rank) of users keyed by id, held in a bounded process-local
+    LRU in front of the shared Django cache. Lookups are batched: one call resolves a whole
+    page of user ids with at most one cache round trip and one database query.
+
+    Entries are dropped from both layers by the User post_save/post_delete signals. Other
+    workers' local copies expire after PERSONNEL_DIRECTORY_LOCAL_TTL seconds, so documents
+    stored beyond that (dashboard snapshots) are built with `fresh=True`.
+    """
+
+    def __init__(self, max_size, local_ttl, shared_ttl):
+        self.max_size = max_size
+        self.local_ttl = local_ttl
+        self.shared_ttl = shared_ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _shared_key(user_id):
+        return f'personnel:{user_id}'
+
+    def get_many(self, user_ids, fresh=False):
+        """Entries by user id; `fresh` reads them all from the database and refreshes both layers"""
+        found = {}
+        missing = set()
+        now = time.monotonic()
+        with self._lock:
+            for user_id in user_ids:
+                cached = None if fresh else self._entries.get(user_id)
+                if cached is not None and cached[0] > now:
+                    self._entries.move_to_end(user_id)
+                    found[user_id] = cached[1]
+                else:
+                    missing.add(user_id)
+        if not missing:
+            return found
+
+        shared = {} if fresh else cache.get_many([self._shared_key(user_id) for user_id in missing])
+        loaded = {}
+        for user_id in missing:
+            entry = shared.get(self._shared_key(user_id))
+            if entry is not None:
+                loaded[user_id] = entry
+
+        unresolved = missing - set(loaded)
+        if unresolved:
+            from .models import User
+            from_db = {
+                row['id']: {'name': row['full_name'], 'pno': row['pno'], 'rank': row['rank']}
+                for row in User.objects.filter(id__in=unresolved).values('id', 'full_name', 'pno', 'rank')
+            }
+            cache.set_many({self._shared_key(user_id): entry for user_id, entry in from_db.items()}, self.shared_ttl)
+            loaded.update(from_db)
+
+        with self._lock:
+            for user_id, entry in loaded.items():
+                self._entries[user_id] = (now + self.local_ttl, entry)
+                self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        found.update(loaded)
+        return found
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._entries.pop(user_id, None)
+        cache.delete(self._shared_key(user_id))
+
+    def clear_local(self):
+        with self._lock:
+            self._entries.clear()
+
+
+personnel_directory = PersonnelDirectory(
+    max_size=getattr(settings, 'PERSONNEL_DIRECTORY_SIZE', 5000),
+    local_ttl=getattr(settings, 'PERSONNEL_DIRECTORY_LOCAL_TTL', 60),
+    shared_ttl=getattr(settings, 'PERSONNEL_DIRECTORY_SHARED_TTL', 3600),
+)
+
+
+def related_user_id(instance, path):
+    """Follow a dotted path such as 'pilot_acceptance.bfs_record.assigned_ae' to the user FK id"""
+    *relations, field = path.split('.')
+    for relation in relations:
+        instance = getattr(instance, relation, None)
+        if instance is None:
+            return None
+    return getattr(instance, f'{field}_id')
+
+
+class PersonnelField(serializers.Field):
+    """Read-only field rendering one attribute ('name', 'pno' or 'rank') of a related user from the directory"""
+
+    def __init__(self, relation, attribute='name', **kwargs):
+        self.relation = relation
+        self.attribute = attribute
+        kwargs['source'] = '*'
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+
+    def get_attribute(self, instance):
+        user_id = related_user_id(instance, self.relation)
+        if user_id is None:
+            # Same as a dotted source through a null relation: the key is left out
+            raise SkipField()
+        return user_id
+
+    def to_representation(self, user_id):
+        entry = self.parent.personnel_entry(user_id)
+        return entry[self.attribute] if entry else None
+
+
+class PersonnelListSerializer(serializers.ListSerializer):
+    """Loads the directory entries for every row of the page before serializing any of them"""
+
+    def to_representation(self, data):
+        items = list(data.all() if isinstance(data, models.Manager) else data)
+        self.child.load_personnel(items)
+        return super().to_representation(items)
+
+
+class PersonnelDirectoryMixin:
+    """
+    Serializer mixin for user display fields. Users behind PersonnelField fields, plus the
+    extra relations method fields read, listed in `personnel_fields` by field name (dotted
+    paths allowed), are resolved through the personnel directory instead of joined or fetched
+    per row. Relations of fields left out by a `fields` projection are not followed. Pair
+    with `Meta.list_serializer_class = PersonnelListSerializer` for page-level batching.
+    """
+    personnel_fields = {}
+
+    def personnel_paths(self):
+        paths = {field.relation for field in self.fields.values() if isinstance(field, PersonnelField)}
+        for field_name, relations in self.personnel_fields.items():
+            if field_name in self.fields:
+                paths.update(relations)
+        return paths
+
+    def load_personnel(self, instances):
+        if not hasattr(self, '_personnel'):
+            self._personnel = {}
+        if not hasattr(self, '_personnel_paths'):
+            self._personnel_paths = self.personnel_paths()
+        paths = self._personnel_paths
+        user_ids = {
+            related_user_id(instance, path)
+            for instance in instances for path in paths
+        } - {None} - set(self._personnel)
+        if user_ids:
+            self._personnel.update(personnel_directory.get_many(user_ids))
+
+    def personnel_entry(self, user_id):
+        return self._personnel.get(user_id) if user_id is not None else None
+
+    def to_representation(self, instance):
+        # Already loaded for the whole page when serializing a list; a no-op then
+        self.load_personnel([instance])
+        return super().to_representation(instance)
+
+
+def load_personnel_together(list_serializers, fresh=False):
+    """
+    Resolve the users of several list serializers with one directory lookup, for documents
+    made of several lists such as the dashboard. Evaluates their instances; read `.data` after.
+    """
+    personnel = {}
+    user_ids = set()
+    for serializer in list_serializers:
+        child = serializer.child
+        if not isinstance(child, PersonnelDirectoryMixin):
+            continue
+        serializer.instance = list(serializer.instance)
+        # Shared, so each list finds every user already loaded
+        child._personnel = personnel
+        child._personnel_paths = child.personnel_paths()
+        user_ids.update(
+            related_user_id(instance, path)
+            for instance in serializer.instance for path in child._personnel_paths
+        )
+    user_ids.discard(None)
+    if user_ids:
+        personnel.update(personnel_directory.get_many(user_ids, fresh=fresh))
+
+
+class CompactPersonnelMixin(PersonnelDirectoryMixin):
+    """
+    Serializer mixin for compact representations: user foreign keys render as plain ids, and
+    the users' details are collected for one `personnel` map per response (personnel_map()).
+    """
+
+    def personnel_paths(self):
+        paths = super().personnel_paths()
+        user_model = get_user_model()
+        paths.update(
+            field.source for field in self.fields.values()
+            if isinstance(field, serializers.PrimaryKeyRelatedField)
+            and getattr(field.queryset, 'model', None) is user_model
+        )
+        return paths
+
+
+def personnel_map(serializer):
+    """The `personnel` map for a compact response: user id -> {name, pno, rank}"""
+    serializer = getattr(serializer, 'child', serializer)
+    return {str(user_id): entry for user_id, entry in sorted(getattr(serializer, '_personnel', {}).items())}
+
+
+class CompactPersonnelViewSetMixin:
+    """
+    Viewset mixin adding `?compact=1` to list and retrieve. Records are rendered by
+    `compact_serializer_class`, which refers to users by id, and the response gains a
+    top-level `personnel` map holding each referenced user's details once.
+    """
+    compact_serializer_class = None
+
+    def is_compact(self):
+        return (
+            self.compact_serializer_class is not None
+            and self.request is not None
+            and getattr(self, 'action', None) in ('list', 'retrieve')
+            and self.request.query_params.get('compact') in ('1', 'true')
+        )
+
+    def get_serializer_class(self):
+        if self.is_compact():
+            return self.compact_serializer_class
+        return super().get_serializer_class()
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        self.rendered_serializer = serializer
+        return serializer
+
+    def list(self, request, *args, **kwargs):
+        response = super().list(request, *args, **kwargs)
+        if self.is_compact():
+            if isinstance(response.data, list):
+                response.data = {'results': response.data}
+            response.data['personnel'] = personnel_map(self.rendered_serializer)
+        return response
+
+    def retrieve(self, request, *args, **kwargs):
+        response = super().retrieve(request, *args, **kwargs)
+        if self.is_compact():
+            response.data['personnel'] = personnel_map(self.rendered_serializer)
+        return response
@@ -0,0 +1,132 @@
+from django.core.exceptions import FieldDoesNotExist, ValidationError as DjangoValidationError
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+
+from .personnel import PersonnelField
+
+
+class PrefetchPlanMixin:
+    """
+    Serializer mixin declaring the relations a serializer reads, so list views can
+    load them with the base queryset instead of one query per row.
+
+    Also accepts a `fields` argument restricting the output to a subset of fields.
+    """
+    select_related_fields = ()
+    prefetch_related_fields = ()
+
+    def __init__(self, *args, **kwargs):
+        fields = kwargs.pop('fields', None)
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for field_name in set(self.fields) - set(fields):
+                self.fields.pop(field_name)
+
+    @classmethod
+    def setup_eager_loading(cls, queryset, fields=None):
+        if fields is not None:
+            paths = cls.projection_paths(queryset.model, fields)
+            if paths is not None:
+                # Load only the projected columns, joining just the relations they reach through
+                ordering = [name.lstrip('-') for name in queryset.model._meta.ordering]
+                relations = sorted({'__'.join(path.split('__')[:depth])
+                                    for path in paths for depth in range(1, path.count('__') + 1)})
+                if relations:
+                    queryset = queryset.select_related(*relations)
+                return queryset.only(*paths, *ordering)
+
+        if cls.select_related_fields:
+            queryset = queryset.select_related(*cls.select_related_fields)
+        if cls.prefetch_related_fields:
+            queryset = queryset.prefetch_related(*cls.prefetch_related_fields)
+        return queryset
+
+    @classmethod
+    def projection_paths(cls, model, fields):
+        """
+        Translate serializer field names into ORM paths for `.only()`. Returns None when a
+        field is computed in Python (method fields, nested serializers), in which case the
+        full prefetch plan is used instead.
+        """
+        declared = cls().fields
+        paths = set()
+        for field_name in fields:
+            field = declared[field_name]
+            if isinstance(field, PersonnelField):
+                # Only the foreign key column is needed; the directory supplies the rest
+                paths.add(field.relation.replace('.', '__'))
+                continue
+            if isinstance(field, (serializers.SerializerMethodField, serializers.BaseSerializer)) or field.source == '*':
+                return None
+
+            # A dotted source such as 'pilot.full_name' also needs the 'pilot' foreign key column
+            current_model = model
+            parts = field.source.split('.')
+            for depth, part in enumerate(parts):
+                try:
+                    model_field = current_model._meta.get_field(part)
+                except FieldDoesNotExist:
+                    return None
+                path = '__'.join(parts[:depth + 1])
+                if model_field.is_relation and (model_field.many_to_many or model_field.one_to_many):
+                    return None
+                if model_field.is_relation and depth + 1 < len(parts):
+                    if model_field.auto_created:
+                        # Reverse one-to-one: there is no local column to load
+                        return None
+                    paths.add(path)
+                    current_model = model_field.related_model
+                else:
+                    paths.add(path)
+        return paths
+
+
+class PrefetchPlanViewSetMixin:
+    """
+    Viewset mixin applying the serializer's prefetch plan to every queryset it builds.
+    A `?fields=a,b` query parameter on GET requests narrows both the response and the SQL.
+    """
+
+    def get_projection(self):
+        if self.request is None or self.request.method != 'GET':
+            return None
+        fields = self.request.query_params.get('fields')
+        if not fields:
+            return None
+
+        projection = [field.strip() for field in fields.split(',') if field.strip()]
+        serializer_class = self.get_serializer_class()
+        if issubclass(serializer_class, PrefetchPlanMixin):
+            unknown = set(projection) - set(serializer_class().fields)
+            if unknown:
+                raise ValidationError({'fields': f"Unknown fields: {', '.join(sorted(unknown))}"})
+        return projection
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        serializer_class = self.get_serializer_class()
+        if issubclass(serializer_class, PrefetchPlanMixin):
+            queryset = serializer_class.setup_eager_loading(queryset, fields=self.get_projection())
+        return queryset
+
+    def get_serializer(self, *args, **kwargs):
+        projection = self.get_projection()
+        if projection is not None and issubclass(self.get_serializer_class(), PrefetchPlanMixin):
+            kwargs.setdefault('fields', projection)
+        return super().get_serializer(*args, **kwargs)
+
+
+class PrefetchedPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """Looks related rows up in the batch's prefetched rows (context['prefetched']) instead of one query each"""
+
+    def to_internal_value(self, data):
+        prefetched = self.context.get('prefetched', {}).get(self.get_queryset().model)
+        if prefetched is None:
+            return super().to_internal_value(data)
+        try:
+            instance = prefetched.get(self.get_queryset().model._meta.pk.to_python(data))
+        except (DjangoValidationError, TypeError):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        if instance is None:
+            self.fail('does_not_exist', pk_value=data)
+        return instance
@@ -0,0 +1,108 @@
+"""
+Slow and duplicate query detection for API requests. Every query a request runs is
+fingerprinted (its SQL with literals, placeholders and IN lists normalized), so the lazy
+foreign key lookups of a serializer show up as one fingerprint repeated once per row.
+
+Queries slower than SLOW_QUERY_MS are logged as they finish, and at the end of a request each
+fingerprint run DUPLICATE_QUERY_THRESHOLD times or more is logged, both naming the view and the
+serializer field that ran the query. Requests running more queries than their endpoint's
+budget are logged too; `check_query_counts` fails on the same budgets.
+"""
+import logging
+import re
+import sys
+
+from django.conf import settings
+from rest_framework import serializers
+
+logger = logging.getLogger(__name__)
+
+# Most queries one GET request to each URL name may run, authentication included; endpoints not
+# listed get DEFAULT_QUERY_BUDGET. Worst cases: a dashboard rebuild, not its cached snapshot
+# (measured over a synthetic fleet with `check_query_counts --fleet`).
+DEFAULT_QUERY_BUDGET = 3
+QUERY_BUDGETS = {
+    'dashboard': 12,
+    'fleet-summary': 6,
+    'before-flying-service-available-personnel': 2,
+}
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'(?<![\w."])-?\d+(?:\.\d+)?\b')
+_PLACEHOLDER = re.compile(r'%s|\?')
+_LIST = re.compile(r'\((?:\?, )*\?\)(?:, \((?:\?, )*\?\))*')
+_SPACE = re.compile(r'\s+')
+# Transaction control, repeated by every atomic block rather than by a serializer
+_TRANSACTION = re.compile(r'\s*(BEGIN|COMMIT|ROLLBACK|SAVEPOINT|RELEASE)\b', re.IGNORECASE)
+
+
+def fingerprint(sql):
+    """The SQL with every value replaced by ?, and value lists (IN, VALUES) shortened to (...)"""
+    sql = _SPACE.sub(' ', sql.strip())
+    sql = _STRING.sub('?', sql)
+    sql = _NUMBER.sub('?', sql)
+    sql = _PLACEHOLDER.sub('?', sql)
+    return _LIST.sub('(...)', sql)
+
+
+def calling_field():
+    """`Serializer.field` whose value was being read when the current query ran, if any"""
+    frame = sys._getframe(1)
+    while frame is not None:
+        field = frame.f_locals.get('self')
+        # type(), not isinstance(): isinstance() evaluates lazy objects such as TokenUser, which
+        # would run a query from inside the query wrapper
+        if issubclass(type(field), serializers.Field) and field.field_name and field.parent is not None:
+            return f'{type(field.parent).__name__}.{field.field_name}'
+        frame = frame.f_back
+    return None
+
+
+def query_budget(view_name):
+    return QUERY_BUDGETS.get(view_name, DEFAULT_QUERY_BUDGET)
+
+
+class QueryLog:
+    """Fingerprints of the queries one request ran, with where each first repeated from"""
+
+    def __init__(self):
+        self.counts = {}
+        self.sources = {}
+        self.duplicates = 0
+
+    def add(self, sql):
+        if _TRANSACTION.match(sql):
+            return
+        key = fingerprint(sql)
+        count = self.counts.get(key, 0) + 1
+        self.counts[key] = count
+        if count > 1:
+            self.duplicates += 1
+            if count == 2:
+                self.sources[key] = calling_field()
+
+    def repeated(self, threshold):
+        """(fingerprint, times run, serializer field) for each fingerprint run at least `threshold` times"""
+        return [
+            (key, count, self.sources.get(key))
+            for key, count in sorted(self.counts.items(), key=lambda item: -item[1])
+            if count >= threshold
+        ]
+
+
+def log_slow_query(view_name, sql, elapsed):
+    if elapsed * 1000 >= getattr(settings, 'SLOW_QUERY_MS', 100):
+        logger.warning(
+            'Slow query (%.1f ms) in %s from %s: %s',
+            elapsed * 1000, view_name, calling_field() or 'the view', fingerprint(sql)[:1000]
+        )
+
+
+def report_queries(view_name, method, queries, query_log):
+    """Log a request's repeated queries and, for GET, a query count over its endpoint's budget"""
+    for key, count, source in query_log.repeated(getattr(settings, 'DUPLICATE_QUERY_THRESHOLD', 3)):
+        logger.warning('%s ran the same query %d times, first repeated from %s: %s',
+                       view_name, count, source or 'the view', key[:1000])
+    budget = query_budget(view_name)
+    if method == 'GET' and queries > budget:
+        logger.warning('%s ran %d queries, over its budget of %d', view_name, queries, budget)
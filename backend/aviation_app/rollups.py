@@ -0,0 +1,206 @@
+"""
+Utilization rollups: per-aircraft daily totals, per-aircraft monthly totals by mission type
+and per-pilot monthly totals, kept in their own tables so reports never scan the flight history.
+
+Each rollup lists its sources as grouped aggregate queries. A rebuild runs them over all rows;
+after a FlyingOperation or completed PostFlying save or delete, signals recompute only the
+buckets (aircraft and day, pilot and month, ...) that the row moved out of or into.
+"""
+from collections import defaultdict
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, DateField, F, Q, Sum
+from django.db.models.functions import TruncDate, TruncMonth
+from django.utils import timezone
+
+from .models import (
+    FlyingOperation, PostFlying,
+    AircraftDailyUtilization, AircraftMissionUtilization, PilotUtilization
+)
+
+
+def completed_post_flying():
+    """Post-flying records whose hours count, the same rule sign_engineer uses for the aircraft total"""
+    return PostFlying.objects.filter(status='COMPLETED', flight_hours__isnull=False)
+
+
+class Source:
+    """One grouped query feeding a rollup: bucket key expressions and the aggregates per bucket"""
+
+    def __init__(self, queryset, keys, aggregates):
+        self.queryset = queryset
+        self.keys = keys
+        self.aggregates = aggregates
+
+    def rows(self, buckets=None):
+        aliases = {f'bucket_{name}': expression for name, expression in self.keys.items()}
+        queryset = self.queryset().annotate(**aliases)
+        if buckets is not None:
+            queryset = queryset.filter(any_of(
+                {f'bucket_{name}': value for name, value in bucket.items()} for bucket in buckets
+            ))
+        for row in queryset.order_by().values(*aliases).annotate(**self.aggregates):
+            key = tuple(row.pop(alias) for alias in aliases)
+            if None not in key:
+                yield key, row
+
+
+def any_of(lookups):
+    condition = Q()
+    for lookup in lookups:
+        condition |= Q(**lookup)
+    return condition
+
+
+class Rollup:
+    # Buckets recomputed per round of queries; keeps the OR-ed filters a reasonable size
+    refresh_chunk_size = 100
+
+    def __init__(self, model, keys, sources):
+        self.model = model
+        self.keys = keys
+        self.sources = sources
+        self.value_fields = [
+            field.name for field in model._meta.concrete_fields
+            if not field.primary_key and field.attname not in keys
+        ]
+
+    def totals(self, buckets=None):
+        """{key tuple: field values} for every bucket, or just `buckets` (dicts of key values)"""
+        totals = defaultdict(lambda: dict.fromkeys(self.value_fields, 0))
+        for source in self.sources:
+            for key, row in source.rows(buckets):
+                totals[key].update({name: value for name, value in row.items() if value is not None})
+        return totals
+
+    def refresh(self, keys):
+        """Recompute the given buckets from their source rows; emptied buckets are deleted"""
+        keys = sorted(set(keys))
+        for start in range(0, len(keys), self.refresh_chunk_size):
+            self._refresh_chunk(keys[start:start + self.refresh_chunk_size])
+
+    def _refresh_chunk(self, keys):
+        buckets = [dict(zip(self.keys, key)) for key in keys]
+        totals = self.totals(buckets)
+        existing = {
+            tuple(getattr(row, name) for name in self.keys): row
+            for row in self.model.objects.filter(any_of(buckets))
+        }
+        stale, changed, created = [], [], []
+        for key in keys:
+            row = existing.get(key)
+            if key not in totals:
+                if row is not None:
+                    stale.append(row.pk)
+            elif row is None:
+                created.append(self.model(**dict(zip(self.keys, key)), **totals[key]))
+            else:
+                for name, value in totals[key].items():
+                    setattr(row, name, value)
+                changed.append(row)
+
+        with transaction.atomic():
+            if stale:
+                self.model.objects.filter(pk__in=stale).delete()
+            if changed:
+                self.model.objects.bulk_update(changed, self.value_fields)
+        if created:
+            try:
+                with transaction.atomic():
+                    self.model.objects.bulk_create(created)
+            except IntegrityError:
+                # A concurrent refresh created some of these rows first; both computed them from
+                # committed rows, so write each one over whatever is there
+                for row in created:
+                    key_values = {name: getattr(row, name) for name in self.keys}
+                    values = {name: getattr(row, name) for name in self.value_fields}
+                    self.model.objects.update_or_create(**key_values, defaults=values)
+
+    def rebuild(self, batch_size=1000):
+        """Replace every row of the rollup; returns the number of rows written"""
+        rows = [self.model(**dict(zip(self.keys, key)), **values) for key, values in self.totals().items()]
+        self.model.objects.all().delete()
+        self.model.objects.bulk_create(rows, batch_size=batch_size)
+        return len(rows)
+
+
+FLIGHT_TOTALS = {'flights': Count('id'), 'flight_hours': Sum('flight_hours')}
+CO_PILOT_TOTALS = {'co_pilot_flights': Count('id'), 'co_pilot_hours': Sum('flight_hours')}
+SORTIE_TOTALS = {'sorties': Count('id'), 'sortie_hours': Sum('flight_hours')}
+
+DAILY = 'daily'
+MISSION = 'mission'
+PILOT = 'pilot'
+
+ROLLUPS = {
+    DAILY: Rollup(AircraftDailyUtilization, ('aircraft_id', 'date'), [
+        Source(FlyingOperation.objects.all, {'aircraft_id': F('aircraft_id'), 'date': F('flight_date')},
+               {**FLIGHT_TOTALS, 'fuel_consumed': Sum('fuel_consumed')}),
+        Source(completed_post_flying, {'aircraft_id': F('aircraft_id'), 'date': TruncDate('post_flight_date')},
+               {**SORTIE_TOTALS, 'landings': Sum('number_of_landings')}),
+    ]),
+    MISSION: Rollup(AircraftMissionUtilization, ('aircraft_id', 'month', 'mission_type'), [
+        Source(FlyingOperation.objects.all,
+               {'aircraft_id': F('aircraft_id'), 'month': TruncMonth('flight_date'), 'mission_type': F('mission_type')},
+               {**FLIGHT_TOTALS, 'fuel_consumed': Sum('fuel_consumed')}),
+    ]),
+    PILOT: Rollup(PilotUtilization, ('pilot_id', 'month'), [
+        Source(FlyingOperation.objects.all, {'pilot_id': F('pilot_id'), 'month': TruncMonth('flight_date')},
+               FLIGHT_TOTALS),
+        Source(FlyingOperation.objects.all, {'pilot_id': F('co_pilot_id'), 'month': TruncMonth('flight_date')},
+               CO_PILOT_TOTALS),
+        Source(completed_post_flying,
+               {'pilot_id': F('pilot_id'), 'month': TruncMonth('post_flight_date', output_field=DateField())},
+               SORTIE_TOTALS),
+    ]),
+}
+
+
+def _as_date(model, field_name, value):
+    return model._meta.get_field(field_name).to_python(value)
+
+
+def rollup_buckets(instance):
+    """
+    The buckets a FlyingOperation or PostFlying row currently counts towards, as
+    (rollup name, key) pairs. Rows loaded with the needed columns deferred report none,
+    so list views using `.only()` never pay a query per row for this.
+    """
+    if isinstance(instance, FlyingOperation):
+        needed = ('aircraft_id', 'flight_date', 'mission_type', 'pilot_id', 'co_pilot_id')
+        if any(name not in instance.__dict__ for name in needed) or instance.flight_date is None:
+            return set()
+        day = _as_date(FlyingOperation, 'flight_date', instance.flight_date)
+        month = day.replace(day=1)
+        buckets = {
+            (DAILY, (instance.aircraft_id, day)),
+            (MISSION, (instance.aircraft_id, month, instance.mission_type)),
+            (PILOT, (instance.pilot_id, month)),
+            (PILOT, (instance.co_pilot_id, month)),
+        }
+    else:
+        needed = ('aircraft_id', 'post_flight_date', 'status', 'flight_hours', 'pilot_id')
+        if any(name not in instance.__dict__ for name in needed):
+            return set()
+        if instance.status != 'COMPLETED' or instance.flight_hours is None or instance.post_flight_date is None:
+            return set()
+        day = timezone.localdate(instance.post_flight_date)
+        buckets = {
+            (DAILY, (instance.aircraft_id, day)),
+            (PILOT, (instance.pilot_id, day.replace(day=1))),
+        }
+    return {(name, key) for name, key in buckets if None not in key}
+
+
+def refresh_buckets(buckets):
+    keys = defaultdict(list)
+    for name, key in buckets:
+        keys[name].append(key)
+    for name, rollup_keys in keys.items():
+        ROLLUPS[name].refresh(rollup_keys)
+
+
+def rebuild_rollups(names=None, batch_size=1000):
+    """Backfill: recompute the named rollups (default all) from the full history; returns rows per rollup"""
+    with transaction.atomic():
+        return {name: ROLLUPS[name].rebuild(batch_size) for name in (names or ROLLUPS)}
@@ -2,8 +2,11 @@ from rest_framework import serializers
 from .models import (
     User, Aircraft, LeadingParticulars, FlyingOperation,
     MaintenanceSchedule, DeferredDefect, Limitation, MaintenanceForecast,
-    BeforeFlyingService, PilotAcceptance, PostFlying
+    BeforeFlyingService, PilotAcceptance, PostFlying,
+    AircraftDailyUtilization, AircraftMissionUtilization, PilotUtilization
 )
+from .personnel import CompactPersonnelMixin, PersonnelDirectoryMixin, PersonnelField, PersonnelListSerializer
+from .prefetch import PrefetchPlanMixin, PrefetchedPrimaryKeyRelatedField
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -25,13 +28,15 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
         return user
 
 
-class LeadingParticularsSerializer(serializers.ModelSerializer):
+class LeadingParticularsSerializer(PrefetchPlanMixin, serializers.ModelSerializer):
     class Meta:
         model = LeadingParticulars
         fields = '__all__'
 
 
-class AircraftSerializer(serializers.ModelSerializer):
+class AircraftSerializer(PrefetchPlanMixin, serializers.ModelSerializer):
+    select_related_fields = ('leading_particulars',)
+
     leading_particulars = LeadingParticularsSerializer(read_only=True)
 
     class Meta:
@@ -45,44 +50,62 @@ class AircraftListSerializer(serializers.ModelSerializer):
         fields = ['id', 'aircraft_number', 'aircraft_type', 'model', 'status']
 
 
-class FlyingOperationSerializer(serializers.ModelSerializer):
-    pilot_name = serializers.CharField(source='pilot.full_name', read_only=True)
-    co_pilot_name = serializers.CharField(source='co_pilot.full_name', read_only=True)
+class FlyingOperationSerializer(PersonnelDirectoryMixin, PrefetchPlanMixin, serializers.ModelSerializer):
+    select_related_fields = ('aircraft',)
+    # Bulk writes look aircraft and users up in rows prefetched for the whole batch
+    serializer_related_field = PrefetchedPrimaryKeyRelatedField
+
+    pilot_name = PersonnelField('pilot')
+    co_pilot_name = PersonnelField('co_pilot')
     aircraft_number = serializers.CharField(source='aircraft.aircraft_number', read_only=True)
 
     class Meta:
         model = FlyingOperation
         fields = '__all__'
+        list_serializer_class = PersonnelListSerializer
+
 
+class MaintenanceScheduleSerializer(PersonnelDirectoryMixin, PrefetchPlanMixin, serializers.ModelSerializer):
+    select_related_fields = ('aircraft',)
+    # Bulk writes look aircraft and users up in rows prefetched for the whole batch
+    serializer_related_field = PrefetchedPrimaryKeyRelatedField
 
-class MaintenanceScheduleSerializer(serializers.ModelSerializer):
-    technician_name = serializers.CharField(source='technician.full_name', read_only=True)
+    technician_name = PersonnelField('technician')
     aircraft_number = serializers.CharField(source='aircraft.aircraft_number', read_only=True)
 
     class Meta:
         model = MaintenanceSchedule
         fields = '__all__'
+        list_serializer_class = PersonnelListSerializer
 
 
-class DeferredDefectSerializer(serializers.ModelSerializer):
-    reported_by_name = serializers.CharField(source='reported_by.full_name', read_only=True)
+class DeferredDefectSerializer(PersonnelDirectoryMixin, PrefetchPlanMixin, serializers.ModelSerializer):
+    select_related_fields = ('aircraft',)
+
+    reported_by_name = PersonnelField('reported_by')
     aircraft_number = serializers.CharField(source='aircraft.aircraft_number', read_only=True)
 
     class Meta:
         model = DeferredDefect
         fields = '__all__'
+        list_serializer_class = PersonnelListSerializer
+
 
+class LimitationSerializer(PersonnelDirectoryMixin, PrefetchPlanMixin, serializers.ModelSerializer):
+    select_related_fields = ('aircraft',)
 
-class LimitationSerializer(serializers.ModelSerializer):
-    imposed_by_name = serializers.CharField(source='imposed_by.full_name', read_only=True)
+    imposed_by_name = PersonnelField('imposed_by')
     aircraft_number = serializers.CharField(source='aircraft.aircraft_number', read_only=True)
 
     class Meta:
         model = Limitation
         fields = '__all__'
+        list_serializer_class = PersonnelListSerializer
+
 
+class MaintenanceForecastSerializer(PrefetchPlanMixin, serializers.ModelSerializer):
+    select_related_fields = ('aircraft',)
 
-class MaintenanceForecastSerializer(serializers.ModelSerializer):
     aircraft_number = serializers.CharField(source='aircraft.aircraft_number', read_only=True)
 
     class Meta:
@@ -99,66 +122,86 @@ class DashboardSerializer(serializers.Serializer):
     maintenance_forecasts = MaintenanceForecastSerializer(many=True)
 
 
-class BeforeFlyingServiceSerializer(serializers.ModelSerializer):
+# Legacy columns for the PINs typed when signing; signatures no longer store them and no
+# representation includes them
+BFS_PIN_FIELDS = [field.name for field in BeforeFlyingService._meta.fields if field.name.endswith('_pin')]
+PILOT_ACCEPTANCE_PIN_FIELDS = [field.name for field in PilotAcceptance._meta.fields if field.name.endswith('_pin')]
+POST_FLYING_PIN_FIELDS = [field.name for field in PostFlying._meta.fields if field.name.endswith('_pin')]
+
+
+class BeforeFlyingServiceSerializer(PersonnelDirectoryMixin, PrefetchPlanMixin, serializers.ModelSerializer):
+    select_related_fields = ('aircraft',)
+
     aircraft_number = serializers.CharField(source='aircraft.aircraft_number', read_only=True)
 
     # FSI Initial
-    fsi_initial_name = serializers.CharField(source='fsi_initial_signature.full_name', read_only=True)
+    fsi_initial_name = PersonnelField('fsi_initial_signature')
 
     # Assigned Personnel
-    assigned_ae_name = serializers.CharField(source='assigned_ae.full_name', read_only=True)
-    assigned_ae_pno = serializers.CharField(source='assigned_ae.pno', read_only=True)
-    assigned_ae_rank = serializers.CharField(source='assigned_ae.rank', read_only=True)
+    assigned_ae_name = PersonnelField('assigned_ae')
+    assigned_ae_pno = PersonnelField('assigned_ae', 'pno')
+    assigned_ae_rank = PersonnelField('assigned_ae', 'rank')
 
-    assigned_al_name = serializers.CharField(source='assigned_al.full_name', read_only=True)
-    assigned_al_pno = serializers.CharField(source='assigned_al.pno', read_only=True)
-    assigned_al_rank = serializers.CharField(source='assigned_al.rank', read_only=True)
+    assigned_al_name = PersonnelField('assigned_al')
+    assigned_al_pno = PersonnelField('assigned_al', 'pno')
+    assigned_al_rank = PersonnelField('assigned_al', 'rank')
 
-    assigned_ao_name = serializers.CharField(source='assigned_ao.full_name', read_only=True)
-    assigned_ao_pno = serializers.CharField(source='assigned_ao.pno', read_only=True)
-    assigned_ao_rank = serializers.CharField(source='assigned_ao.rank', read_only=True)
+    assigned_ao_name = PersonnelField('assigned_ao')
+    assigned_ao_pno = PersonnelField('assigned_ao', 'pno')
+    assigned_ao_rank = PersonnelField('assigned_ao', 'rank')
 
-    assigned_ar_name = serializers.CharField(source='assigned_ar.full_name', read_only=True)
-    assigned_ar_pno = serializers.CharField(source='assigned_ar.pno', read_only=True)
-    assigned_ar_rank = serializers.CharField(source='assigned_ar.rank', read_only=True)
+    assigned_ar_name = PersonnelField('assigned_ar')
+    assigned_ar_pno = PersonnelField('assigned_ar', 'pno')
+    assigned_ar_rank = PersonnelField('assigned_ar', 'rank')
 
-    assigned_se_name = serializers.CharField(source='assigned_se.full_name', read_only=True)
-    assigned_se_pno = serializers.CharField(source='assigned_se.pno', read_only=True)
-    assigned_se_rank = serializers.CharField(source='assigned_se.rank', read_only=True)
+    assigned_se_name = PersonnelField('assigned_se')
+    assigned_se_pno = PersonnelField('assigned_se', 'pno')
+    assigned_se_rank = PersonnelField('assigned_se', 'rank')
 
-    assigned_supervisor_name = serializers.CharField(source='assigned_supervisor.full_name', read_only=True)
-    assigned_supervisor_pno = serializers.CharField(source='assigned_supervisor.pno', read_only=True)
-    assigned_supervisor_rank = serializers.CharField(source='assigned_supervisor.rank', read_only=True)
+    assigned_supervisor_name = PersonnelField('assigned_supervisor')
+    assigned_supervisor_pno = PersonnelField('assigned_supervisor', 'pno')
+    assigned_supervisor_rank = PersonnelField('assigned_supervisor', 'rank')
 
     # Signature Names
-    ae_name = serializers.CharField(source='ae_signature.full_name', read_only=True)
-    al_name = serializers.CharField(source='al_signature.full_name', read_only=True)
-    ao_name = serializers.CharField(source='ao_signature.full_name', read_only=True)
-    ar_name = serializers.CharField(source='ar_signature.full_name', read_only=True)
-    se_name = serializers.CharField(source='se_signature.full_name', read_only=True)
-    supervisor_name = serializers.CharField(source='supervisor_signature.full_name', read_only=True)
-    fsi_name = serializers.CharField(source='fsi_signature.full_name', read_only=True)
+    ae_name = PersonnelField('ae_signature')
+    al_name = PersonnelField('al_signature')
+    ao_name = PersonnelField('ao_signature')
+    ar_name = PersonnelField('ar_signature')
+    se_name = PersonnelField('se_signature')
+    supervisor_name = PersonnelField('supervisor_signature')
+    fsi_name = PersonnelField('fsi_signature')
 
     class Meta:
         model = BeforeFlyingService
-        fields = '__all__'
+        exclude = BFS_PIN_FIELDS
+        list_serializer_class = PersonnelListSerializer
+
 
+class PilotAcceptanceSerializer(PersonnelDirectoryMixin, PrefetchPlanMixin, serializers.ModelSerializer):
+    select_related_fields = ('aircraft',)
 
-class PilotAcceptanceSerializer(serializers.ModelSerializer):
     aircraft_number = serializers.CharField(source='aircraft.aircraft_number', read_only=True)
-    pilot_name = serializers.CharField(source='pilot.full_name', read_only=True)
-    bfs_id = serializers.IntegerField(source='bfs_record.id', read_only=True)
+    pilot_name = PersonnelField('pilot')
+    bfs_id = serializers.IntegerField(source='bfs_record_id', read_only=True)
 
     class Meta:
         model = PilotAcceptance
-        fields = '__all__'
+        exclude = PILOT_ACCEPTANCE_PIN_FIELDS
+        list_serializer_class = PersonnelListSerializer
 
 
-class PostFlyingSerializer(serializers.ModelSerializer):
+class PostFlyingSerializer(PersonnelDirectoryMixin, PrefetchPlanMixin, serializers.ModelSerializer):
+    select_related_fields = ('aircraft', 'pilot_acceptance__bfs_record')
+    personnel_fields = {
+        'bfs_data': tuple(
+            f'pilot_acceptance.bfs_record.assigned_{role}' for role in ('ae', 'al', 'ao', 'ar', 'se', 'supervisor')
+        ),
+    }
+
     aircraft_number = serializers.CharField(source='aircraft.aircraft_number', read_only=True)
-    pilot_name = serializers.CharField(source='pilot.full_name', read_only=True)
-    engineer_name = serializers.CharField(source='engineer.full_name', read_only=True)
-    pilot_acceptance_id = serializers.IntegerField(source='pilot_acceptance.id', read_only=True)
+    pilot_name = PersonnelField('pilot')
+    engineer_name = PersonnelField('engineer')
+    pilot_acceptance_id = serializers.IntegerField(read_only=True)
 
     # BFS data for pilot view
     bfs_data = serializers.SerializerMethodField()
@@ -167,45 +210,85 @@ class PostFlyingSerializer(serializers.ModelSerializer):
         """Get related BFS data for pilot to view"""
         if obj.pilot_acceptance and obj.pilot_acceptance.bfs_record:
             bfs = obj.pilot_acceptance.bfs_record
+
+            def person(role):
+                return self.bfs_person(getattr(bfs, f'assigned_{role}_id'))
+
             return {
                 'fuel_level_before': str(bfs.fuel_level_before) if bfs.fuel_level_before else None,
                 'tire_pressure_main_before': str(bfs.tire_pressure_main_before) if bfs.tire_pressure_main_before else None,
                 'tire_pressure_nose_before': str(bfs.tire_pressure_nose_before) if bfs.tire_pressure_nose_before else None,
                 'assigned_personnel': {
-                    'ae': {
-                        'name': bfs.assigned_ae.full_name if bfs.assigned_ae else None,
-                        'pno': bfs.assigned_ae.pno if bfs.assigned_ae else None,
-                        'rank': bfs.assigned_ae.rank if bfs.assigned_ae else None,
-                    },
-                    'al': {
-                        'name': bfs.assigned_al.full_name if bfs.assigned_al else None,
-                        'pno': bfs.assigned_al.pno if bfs.assigned_al else None,
-                        'rank': bfs.assigned_al.rank if bfs.assigned_al else None,
-                    },
-                    'ao': {
-                        'name': bfs.assigned_ao.full_name if bfs.assigned_ao else None,
-                        'pno': bfs.assigned_ao.pno if bfs.assigned_ao else None,
-                        'rank': bfs.assigned_ao.rank if bfs.assigned_ao else None,
-                    },
-                    'ar': {
-                        'name': bfs.assigned_ar.full_name if bfs.assigned_ar else None,
-                        'pno': bfs.assigned_ar.pno if bfs.assigned_ar else None,
-                        'rank': bfs.assigned_ar.rank if bfs.assigned_ar else None,
-                    },
-                    'se': {
-                        'name': bfs.assigned_se.full_name if bfs.assigned_se else None,
-                        'pno': bfs.assigned_se.pno if bfs.assigned_se else None,
-                        'rank': bfs.assigned_se.rank if bfs.assigned_se else None,
-                    },
-                    'supervisor': {
-                        'name': bfs.assigned_supervisor.full_name if bfs.assigned_supervisor else None,
-                        'pno': bfs.assigned_supervisor.pno if bfs.assigned_supervisor else None,
-                        'rank': bfs.assigned_supervisor.rank if bfs.assigned_supervisor else None,
-                    } if bfs.assigned_supervisor else None
+                    'ae': person('ae'),
+                    'al': person('al'),
+                    'ao': person('ao'),
+                    'ar': person('ar'),
+                    'se': person('se'),
+                    'supervisor': person('supervisor') if bfs.assigned_supervisor_id else None
                 }
             }
         return None
 
+    def bfs_person(self, user_id):
+        entry = self.personnel_entry(user_id) or {}
+        return {'name': entry.get('name'), 'pno': entry.get('pno'), 'rank': entry.get('rank')}
+
     class Meta:
         model = PostFlying
-        fields = '__all__'
+        exclude = POST_FLYING_PIN_FIELDS
+        list_serializer_class = PersonnelListSerializer
+
+
+class CompactBeforeFlyingServiceSerializer(CompactPersonnelMixin, PrefetchPlanMixin, serializers.ModelSerializer):
+    """BFS record referring to users by id; their details are in the response's `personnel` map"""
+    select_related_fields = ('aircraft',)
+
+    aircraft_number = serializers.CharField(source='aircraft.aircraft_number', read_only=True)
+
+    class Meta:
+        model = BeforeFlyingService
+        exclude = BFS_PIN_FIELDS
+        list_serializer_class = PersonnelListSerializer
+
+
+class CompactPostFlyingSerializer(CompactPersonnelMixin, PostFlyingSerializer):
+    """Post-flying record whose `bfs_data` personnel are user ids; details are in the `personnel` map"""
+    pilot_name = None
+    engineer_name = None
+
+    def bfs_person(self, user_id):
+        return user_id
+
+    class Meta:
+        model = PostFlying
+        exclude = POST_FLYING_PIN_FIELDS
+        list_serializer_class = PersonnelListSerializer
+
+
+class AircraftDailyUtilizationSerializer(PrefetchPlanMixin, serializers.ModelSerializer):
+    select_related_fields = ('aircraft',)
+
+    aircraft_number = serializers.CharField(source='aircraft.aircraft_number', read_only=True)
+
+    class Meta:
+        model = AircraftDailyUtilization
+        exclude = ['id']
+
+
+class AircraftMissionUtilizationSerializer(PrefetchPlanMixin, serializers.ModelSerializer):
+    select_related_fields = ('aircraft',)
+
+    aircraft_number = serializers.CharField(source='aircraft.aircraft_number', read_only=True)
+
+    class Meta:
+        model = AircraftMissionUtilization
+        exclude = ['id']
+
+
+class PilotUtilizationSerializer(PersonnelDirectoryMixin, PrefetchPlanMixin, serializers.ModelSerializer):
+    pilot_name = PersonnelField('pilot')
+
+    class Meta:
+        model = PilotUtilization
+        exclude = ['id']
+        list_serializer_class = PersonnelListSerializer
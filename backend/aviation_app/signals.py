@@ -0,0 +1,175 @@
+from django.db import transaction
+from django.db.models.signals import post_init, post_save, post_delete
+from django.dispatch import receiver
+
+from .models import (
+    User, Aircraft, LeadingParticulars, FlyingOperation,
+    MaintenanceSchedule, DeferredDefect, Limitation, MaintenanceForecast,
+    BeforeFlyingService, PilotAcceptance, PostFlying
+)
+from .caching import invalidate_namespace, AIRCRAFT_NAMESPACE, LEADING_PARTICULARS_NAMESPACE, PERSONNEL_NAMESPACE
+from .events import WORKFLOW_MODELS, workflow_state, publish_workflow_change
+from .personnel import personnel_directory
+from .rollups import rollup_buckets, refresh_buckets
+from .snapshots import mark_dashboard_stale, mark_all_dashboards_stale, mark_dashboards_stale
+from .tokens import SECURITY_FIELDS, revoke_user_tokens
+
+# Models whose rows appear in an aircraft's dashboard snapshot
+DASHBOARD_SOURCE_MODELS = (
+    LeadingParticulars, FlyingOperation, MaintenanceSchedule,
+    DeferredDefect, Limitation, MaintenanceForecast,
+)
+
+# User fields that never appear on the dashboard; saving only these must not invalidate it
+USER_NON_DISPLAY_FIELDS = frozenset(['last_login', 'password', 'signing_pin'])
+
+
+@receiver(post_save, sender=Aircraft)
+@receiver(post_delete, sender=Aircraft)
+def aircraft_changed(sender, instance, **kwargs):
+    invalidate_namespace(AIRCRAFT_NAMESPACE)
+    mark_dashboard_stale(instance.pk)
+
+
+@receiver(post_save, sender=LeadingParticulars)
+@receiver(post_delete, sender=LeadingParticulars)
+def leading_particulars_changed(sender, instance, **kwargs):
+    invalidate_namespace(LEADING_PARTICULARS_NAMESPACE)
+
+
+def remember_aircraft(sender, instance, **kwargs):
+    # Deferred aircraft_id is left out rather than loaded
+    instance._loaded_aircraft_id = instance.__dict__.get('aircraft_id')
+
+
+def dashboard_source_changed(sender, instance, **kwargs):
+    mark_dashboard_stale(instance.aircraft_id)
+    previous = getattr(instance, '_loaded_aircraft_id', None)
+    if previous is not None and previous != instance.aircraft_id:
+        # Moved to another aircraft: it also leaves the previous aircraft's dashboard
+        mark_dashboard_stale(previous)
+    instance._loaded_aircraft_id = instance.aircraft_id
+
+
+for model in DASHBOARD_SOURCE_MODELS:
+    post_init.connect(remember_aircraft, sender=model, dispatch_uid=f'dashboard_init_{model.__name__}')
+    post_save.connect(dashboard_source_changed, sender=model, dispatch_uid=f'dashboard_save_{model.__name__}')
+    post_delete.connect(dashboard_source_changed, sender=model, dispatch_uid=f'dashboard_delete_{model.__name__}')
+
+
+@receiver(post_save, sender=User)
+def user_changed(sender, instance, created, update_fields=None, **kwargs):
+    if created:
+        invalidate_namespace(PERSONNEL_NAMESPACE)
+        return
+    if update_fields and set(update_fields) <= USER_NON_DISPLAY_FIELDS:
+        return
+    invalidate_namespace(PERSONNEL_NAMESPACE)
+    personnel_directory.invalidate(instance.pk)
+    mark_all_dashboards_stale()
+
+
+@receiver(post_delete, sender=User)
+def user_deleted(sender, instance, **kwargs):
+    invalidate_namespace(PERSONNEL_NAMESPACE)
+    personnel_directory.invalidate(instance.pk)
+    revoke_user_tokens(instance, deleted=True)
+
+
+def security_state(user):
+    # Deferred fields are left out rather than loaded
+    return {name: user.__dict__[name] for name in SECURITY_FIELDS if name in user.__dict__}
+
+
+@receiver(post_init, sender=User)
+def remember_security_state(sender, instance, **kwargs):
+    instance._security_state = security_state(instance)
+
+
+@receiver(post_save, sender=User)
+def user_security_changed(sender, instance, created, **kwargs):
+    previous = getattr(instance, '_security_state', {})
+    current = security_state(instance)
+    instance._security_state = current
+    if created:
+        return
+    # _password is set by set_password until save() finishes, but not by the hash upgrades
+    # check_password makes on login
+    password_changed = getattr(instance, '_password', None) is not None
+    if password_changed or any(name in previous and previous[name] != value for name, value in current.items()):
+        revoke_user_tokens(instance)
+
+
+def remember_workflow_state(sender, instance, **kwargs):
+    instance._workflow_state = workflow_state(instance)
+
+
+def workflow_record_saved(sender, instance, created, **kwargs):
+    previous = getattr(instance, '_workflow_state', {})
+    current = workflow_state(instance)
+    instance._workflow_state = current
+    changes = {
+        name: value for name, value in current.items()
+        if created or name not in previous or previous[name] != value
+    }
+    if not changes:
+        return
+
+    record_id, aircraft_id = instance.pk, instance.aircraft_id
+    bfs_id = instance.pk if sender is BeforeFlyingService else getattr(instance, 'bfs_record_id', None)
+    pilot_acceptance_id = getattr(instance, 'pilot_acceptance_id', None)
+
+    def publish():
+        record_bfs_id = bfs_id
+        if pilot_acceptance_id is not None:
+            # A post-flying record reaches its BFS record through the pilot acceptance
+            record_bfs_id = PilotAcceptance.objects.filter(pk=pilot_acceptance_id).values_list(
+                'bfs_record_id', flat=True
+            ).first()
+        publish_workflow_change(sender, record_id, aircraft_id, record_bfs_id, changes, created)
+
+    # Only committed state is announced; a rolled-back signature never reaches the streams
+    transaction.on_commit(publish)
+
+
+for model in WORKFLOW_MODELS:
+    post_init.connect(remember_workflow_state, sender=model, dispatch_uid=f'workflow_init_{model.__name__}')
+    post_save.connect(workflow_record_saved, sender=model, dispatch_uid=f'workflow_save_{model.__name__}')
+
+
+def remember_rollup_buckets(sender, instance, **kwargs):
+    instance._rollup_buckets = rollup_buckets(instance)
+
+
+def rollup_source_changed(sender, instance, **kwargs):
+    previous = getattr(instance, '_rollup_buckets', set())
+    current = set() if kwargs['signal'] is post_delete else rollup_buckets(instance)
+    instance._rollup_buckets = current
+    # Refresh the buckets the row left as well as those it joined, e.g. after a date change
+    buckets = previous | current
+    if buckets:
+        transaction.on_commit(lambda: refresh_buckets(buckets))
+
+
+for model in (FlyingOperation, PostFlying):
+    post_init.connect(remember_rollup_buckets, sender=model, dispatch_uid=f'rollup_init_{model.__name__}')
+    post_save.connect(rollup_source_changed, sender=model, dispatch_uid=f'rollup_save_{model.__name__}')
+    post_delete.connect(rollup_source_changed, sender=model, dispatch_uid=f'rollup_delete_{model.__name__}')
+
+
+def bulk_saved(model, instances, previous_aircraft_ids=()):
+    """
+    The post_save side effects for rows written with bulk_create or bulk_update, which send no
+    signals. `previous_aircraft_ids` are the aircraft updated rows belonged to before the write.
+    """
+    if model in DASHBOARD_SOURCE_MODELS:
+        aircraft_ids = {instance.aircraft_id for instance in instances} | set(previous_aircraft_ids)
+        mark_dashboards_stale(aircraft_ids - {None})
+    if model in (FlyingOperation, PostFlying):
+        buckets = set()
+        for instance in instances:
+            remember = rollup_buckets(instance)
+            buckets |= getattr(instance, '_rollup_buckets', set()) | remember
+            instance._rollup_buckets = remember
+        if buckets:
+            transaction.on_commit(lambda: refresh_buckets(buckets))
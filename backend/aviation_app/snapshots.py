@@ -0,0 +1,230 @@
+import asyncio
+import hashlib
+import json
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import IntegrityError, close_old_connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .personnel import load_personnel_together
+from .models import (
+    Aircraft, FlyingOperation, MaintenanceSchedule, DeferredDefect,
+    Limitation, MaintenanceForecast, DashboardSnapshot
+)
+from .serializers import (
+    AircraftSerializer, FlyingOperationSerializer, MaintenanceScheduleSerializer,
+    DeferredDefectSerializer, LimitationSerializer, MaintenanceForecastSerializer
+)
+
+
+def recent_flights(aircraft, today):
+    """Last 10 flights"""
+    flights = FlyingOperationSerializer.setup_eager_loading(FlyingOperation.objects).filter(
+        aircraft=aircraft
+    )[:10]
+    return FlyingOperationSerializer(flights, many=True)
+
+
+def upcoming_maintenance(aircraft, today):
+    """Maintenance due in the next 30 days"""
+    thirty_days_from_now = today + timedelta(days=30)
+    maintenance = MaintenanceScheduleSerializer.setup_eager_loading(MaintenanceSchedule.objects).filter(
+        aircraft=aircraft,
+        scheduled_date__lte=thirty_days_from_now,
+        status__in=['SCHEDULED', 'IN_PROGRESS']
+    )
+    return MaintenanceScheduleSerializer(maintenance, many=True)
+
+
+def active_defects(aircraft, today):
+    """Open, in-progress and deferred defects"""
+    defects = DeferredDefectSerializer.setup_eager_loading(DeferredDefect.objects).filter(
+        aircraft=aircraft,
+        status__in=['OPEN', 'IN_PROGRESS', 'DEFERRED']
+    )
+    return DeferredDefectSerializer(defects, many=True)
+
+
+def active_limitations(aircraft, today):
+    """Limitations currently in force"""
+    limitations = LimitationSerializer.setup_eager_loading(Limitation.objects).filter(
+        aircraft=aircraft, is_active=True
+    )
+    return LimitationSerializer(limitations, many=True)
+
+
+def maintenance_forecasts(aircraft, today):
+    """Forecasts for the next 12 months"""
+    forecasts = MaintenanceForecastSerializer.setup_eager_loading(MaintenanceForecast.objects).filter(
+        aircraft=aircraft,
+        forecast_month__gte=today
+    )[:12]
+    return MaintenanceForecastSerializer(forecasts, many=True)
+
+
+# The dashboard's sections, each returning an unrendered list serializer over an independent
+# query, so they can run concurrently
+DASHBOARD_SECTIONS = {
+    'recent_flights': recent_flights,
+    'upcoming_maintenance': upcoming_maintenance,
+    'active_defects': active_defects,
+    'active_limitations': active_limitations,
+    'maintenance_forecasts': maintenance_forecasts,
+}
+
+
+def build_dashboard_payload(aircraft):
+    """Run the dashboard queries for one aircraft and return the serialized document"""
+    today = timezone.now().date()
+    sections = {name: section(aircraft, today) for name, section in DASHBOARD_SECTIONS.items()}
+    # One user lookup for every section, not one each. Fresh from the database: the snapshot is
+    # kept until the data changes, and another worker's directory may still hold an old name
+    load_personnel_together(sections.values(), fresh=True)
+    payload = {'aircraft': AircraftSerializer(aircraft).data}
+    payload.update((name, serializer.data) for name, serializer in sections.items())
+    return payload
+
+
+def _run_section(section, aircraft, today):
+    try:
+        serializer = section(aircraft, today)
+        load_personnel_together([serializer], fresh=True)
+        return serializer.data
+    finally:
+        # Runs on a shared executor thread, outside any request: release the connection
+        # as a request would (kept under CONN_MAX_AGE, returned to the pool with DB_POOL)
+        close_old_connections()
+
+
+async def abuild_dashboard_payload(aircraft):
+    """Like build_dashboard_payload, with the section queries running concurrently on separate connections"""
+    today = timezone.now().date()
+    aircraft_data = await sync_to_async(lambda: AircraftSerializer(aircraft).data)()
+    sections = await asyncio.gather(*(
+        sync_to_async(_run_section, thread_sensitive=False)(section, aircraft, today)
+        for section in DASHBOARD_SECTIONS.values()
+    ))
+    return {'aircraft': aircraft_data, **dict(zip(DASHBOARD_SECTIONS, sections))}
+
+
+def compute_etag(payload):
+    encoded = json.dumps(payload, sort_keys=True, cls=DjangoJSONEncoder).encode('utf-8')
+    return hashlib.sha1(encoded).hexdigest()
+
+
+def _load_aircraft(aircraft_id):
+    try:
+        return AircraftSerializer.setup_eager_loading(Aircraft.objects).get(id=aircraft_id)
+    except Aircraft.DoesNotExist:
+        return None
+
+
+def _store_snapshot(aircraft, payload, version):
+    """
+    Store a payload built from the data as of snapshot `version` (None: there was no snapshot).
+    If the snapshot was marked stale again meanwhile, the payload may predate that change, so
+    it is returned to the caller but not stored.
+    """
+    # Round-trip through JSON so the stored and freshly built documents hash identically
+    payload = json.loads(json.dumps(payload, cls=DjangoJSONEncoder))
+    fields = {
+        'payload': payload,
+        'etag': compute_etag(payload),
+        'built_on': timezone.now().date(),
+        'is_stale': False,
+    }
+    if version is None:
+        try:
+            with transaction.atomic():
+                return DashboardSnapshot.objects.create(aircraft_id=aircraft.id, **fields)
+        except IntegrityError:
+            # Another worker created the row first; its content is at least as current
+            return DashboardSnapshot(aircraft_id=aircraft.id, **fields)
+    DashboardSnapshot.objects.filter(aircraft_id=aircraft.id, version=version).update(
+        updated_at=timezone.now(), **fields
+    )
+    return DashboardSnapshot(aircraft_id=aircraft.id, version=version, **fields)
+
+
+def _needs_rebuild(snapshot):
+    return snapshot is None or snapshot.is_stale or snapshot.built_on != timezone.now().date()
+
+
+def _current_snapshot(aircraft_id):
+    return DashboardSnapshot.objects.filter(aircraft_id=aircraft_id).only(
+        'aircraft_id', 'payload', 'etag', 'built_on', 'is_stale', 'version'
+    )
+
+
+def _version(snapshot):
+    return None if snapshot is None else snapshot.version
+
+
+def rebuild_dashboard_snapshot(aircraft_id, version):
+    """
+    Rebuild and store the snapshot for one aircraft, last read at `version`. Returns None if the
+    aircraft does not exist.
+    """
+    aircraft = _load_aircraft(aircraft_id)
+    if aircraft is None:
+        return None
+    return _store_snapshot(aircraft, build_dashboard_payload(aircraft), version)
+
+
+def get_dashboard_snapshot(aircraft_id):
+    """Return the current snapshot, rebuilding it only when missing, stale or from a previous day"""
+    snapshot = _current_snapshot(aircraft_id).first()
+    if _needs_rebuild(snapshot):
+        snapshot = rebuild_dashboard_snapshot(aircraft_id, _version(snapshot))
+    return snapshot
+
+
+async def arebuild_dashboard_snapshot(aircraft_id, version):
+    aircraft = await sync_to_async(_load_aircraft)(aircraft_id)
+    if aircraft is None:
+        return None
+    payload = await abuild_dashboard_payload(aircraft)
+    return await sync_to_async(_store_snapshot)(aircraft, payload, version)
+
+
+async def aget_dashboard_snapshot(aircraft_id):
+    """Async get_dashboard_snapshot; a rebuild runs the section queries concurrently"""
+    snapshot = await _current_snapshot(aircraft_id).afirst()
+    if _needs_rebuild(snapshot):
+        snapshot = await arebuild_dashboard_snapshot(aircraft_id, _version(snapshot))
+    return snapshot
+
+
+def _rebuild_if_stale(aircraft_id):
+    version = DashboardSnapshot.objects.filter(aircraft_id=aircraft_id, is_stale=True).values_list(
+        'version', flat=True
+    ).first()
+    if version is not None:
+        rebuild_dashboard_snapshot(aircraft_id, version)
+
+
+def mark_dashboard_stale(aircraft_id):
+    """
+    Flag the aircraft's snapshot as stale and rebuild it once the current transaction commits.
+    The flag is written inside the transaction so a rollback leaves the snapshot untouched, and
+    repeated changes in one transaction collapse into a single rebuild.
+    """
+    snapshots = DashboardSnapshot.objects.filter(aircraft_id=aircraft_id)
+    if snapshots.filter(is_stale=False).update(is_stale=True, version=F('version') + 1):
+        transaction.on_commit(lambda: _rebuild_if_stale(aircraft_id))
+    else:
+        # Already stale: a rebuild in progress must still find out it is out of date
+        snapshots.update(version=F('version') + 1)
+
+
+def mark_all_dashboards_stale():
+    """Used when shared data such as user names changes; snapshots rebuild lazily on next read"""
+    DashboardSnapshot.objects.update(is_stale=True, version=F('version') + 1)
+
+
+def mark_dashboards_stale(aircraft_ids):
+    """For bulk writes that send no signals; the snapshots rebuild lazily on next read"""
+    DashboardSnapshot.objects.filter(aircraft_id__in=aircraft_ids).update(is_stale=True, version=F('version') + 1)
@@ -0,0 +1,279 @@
+import random
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.db.models import Sum
+from django.utils import timezone
+
+from .models import (
+    User, Aircraft, LeadingParticulars, FlyingOperation, MaintenanceSchedule,
+    DeferredDefect, Limitation, MaintenanceForecast,
+    BeforeFlyingService, PilotAcceptance, PostFlying
+)
+
+AIRCRAFT_MODELS = {
+    'FIGHTER': ('F-16 Fighting Falcon', 7000),
+    'TRANSPORT': ('C-130 Hercules', 25000),
+    'HELICOPTER': ('UH-60 Black Hawk', 1360),
+    'TRAINER': ('PC-21', 1100),
+    'RECONNAISSANCE': ('RQ-4 Global Hawk', 15000),
+}
+MISSION_TYPES = [choice for choice, _ in FlyingOperation.MISSION_TYPE_CHOICES]
+# BFS tradesman roles, each assigned and signing with its own user
+BFS_TRADES = ['ae', 'al', 'ao', 'ar', 'se']
+RANKS = ['Sergeant', 'Corporal', 'Warrant Officer', 'Flying Officer', 'Flight Lieutenant', 'Squadron Leader']
+
+
+def generate_fleet(aircraft_count, days=365, seed=42, prefix='SYN', batch_size=2000, today=None, workflow_days=0):
+    """
+    Create a deterministic synthetic fleet with `days` of history per aircraft using bulk inserts.
+    The last `workflow_days` of it also get BFS -> pilot acceptance -> post-flying chains.
+    The same arguments always produce the same rows. Returns a dict of row counts per model.
+
+    Rows are written with bulk_create, so model signals (dashboard snapshots etc.) do not fire.
+    """
+    rng = random.Random(seed)
+    today = today or date.today()
+    start = today - timedelta(days=days)
+
+    if Aircraft.objects.filter(aircraft_number__startswith=f'{prefix}-').exists():
+        raise ValueError(f"Synthetic data with prefix '{prefix}' already exists")
+
+    # Every synthetic user gets the same unusable password; hashing once keeps generation fast
+    password = make_password(None)
+    user_count = max(10, aircraft_count * 2)
+    users = User.objects.bulk_create([
+        User(
+            pno=f'{prefix}-U{index:06d}', full_name=f'Synthetic Crew {index}', password=password,
+            rank=rng.choice(RANKS), designation='Pilot' if index % 2 == 0 else 'Technician',
+        )
+        for index in range(user_count)
+    ], batch_size=batch_size)
+    user_ids = list(User.objects.filter(pno__startswith=f'{prefix}-U').order_by('pno').values_list('id', flat=True))
+    pilot_ids = user_ids[0::2]
+    technician_ids = user_ids[1::2]
+
+    aircraft_types = list(AIRCRAFT_MODELS)
+    aircraft_rows = []
+    for index in range(aircraft_count):
+        aircraft_type = aircraft_types[index % len(aircraft_types)]
+        model, fuel_capacity = AIRCRAFT_MODELS[aircraft_type]
+        aircraft_rows.append(Aircraft(
+            aircraft_number=f'{prefix}-{index:05d}', aircraft_type=aircraft_type, model=model,
+            status=rng.choices(['OPERATIONAL', 'MAINTENANCE', 'GROUNDED'], weights=[85, 12, 3])[0],
+            fuel_capacity=fuel_capacity, current_fuel_level=fuel_capacity // 2,
+            date_of_induction=start, next_maintenance_due=today + timedelta(days=rng.randint(1, 180)),
+        ))
+    Aircraft.objects.bulk_create(aircraft_rows, batch_size=batch_size)
+    aircraft_ids = list(
+        Aircraft.objects.filter(aircraft_number__startswith=f'{prefix}-').order_by('aircraft_number').values_list('id', flat=True)
+    )
+
+    counts = {'users': len(users), 'aircraft': len(aircraft_ids)}
+    counts['flying_operations'] = _bulk_insert(FlyingOperation, _flights(rng, aircraft_ids, pilot_ids, start, days), batch_size)
+    counts['maintenance_schedules'] = _bulk_insert(
+        MaintenanceSchedule, _maintenance(rng, aircraft_ids, technician_ids, start, days, today), batch_size
+    )
+    counts['deferred_defects'] = _bulk_insert(DeferredDefect, _defects(rng, aircraft_ids, technician_ids, start, days, prefix), batch_size)
+    counts['limitations'] = _bulk_insert(Limitation, _limitations(rng, aircraft_ids, technician_ids, start, days), batch_size)
+    counts['maintenance_forecasts'] = _bulk_insert(MaintenanceForecast, _forecasts(rng, aircraft_ids, today), batch_size)
+    counts['leading_particulars'] = _bulk_insert(LeadingParticulars, _leading_particulars(rng, aircraft_ids, prefix), batch_size)
+    if workflow_days:
+        # Own random stream, so the rows above do not depend on whether chains are generated
+        workflow_rng = random.Random(f'{seed}-workflows')
+        chains = _workflow_chains(workflow_rng, aircraft_ids, pilot_ids, technician_ids, today, workflow_days)
+        counts.update(_insert_chains(chains, batch_size))
+
+    total_hours = dict(
+        FlyingOperation.objects.filter(aircraft_id__in=aircraft_ids)
+        .values('aircraft_id').annotate(hours=Sum('flight_hours')).values_list('aircraft_id', 'hours')
+    )
+    Aircraft.objects.bulk_update(
+        [Aircraft(id=aircraft_id, total_flying_hours=total_hours.get(aircraft_id, 0)) for aircraft_id in aircraft_ids],
+        ['total_flying_hours'], batch_size=batch_size
+    )
+    return counts
+
+
+def _bulk_insert(model, rows, batch_size):
+    """Insert rows from a generator in batches so memory stays flat for large fleets"""
+    created = 0
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            model.objects.bulk_create(batch)
+            created += len(batch)
+            batch = []
+    if batch:
+        model.objects.bulk_create(batch)
+        created += len(batch)
+    return created
+
+
+def _insert_chains(chains, batch_size):
+    """
+    Insert (BFS, acceptance, post-flying) chains, the later two possibly None, a batch at a
+    time: each step needs the ids bulk_create returned for the step before.
+    """
+    counts = {'bfs_records': 0, 'pilot_acceptances': 0, 'post_flying': 0}
+    batch = []
+    for chain in chains:
+        batch.append(chain)
+        if len(batch) >= batch_size:
+            _insert_chain_batch(batch, counts)
+            batch = []
+    if batch:
+        _insert_chain_batch(batch, counts)
+    return counts
+
+
+def _insert_chain_batch(batch, counts):
+    BeforeFlyingService.objects.bulk_create([bfs for bfs, acceptance, post_flying in batch])
+    acceptances, post_flying_rows = [], []
+    for bfs, acceptance, post_flying in batch:
+        if acceptance is not None:
+            acceptance.bfs_record_id = bfs.pk
+            acceptances.append(acceptance)
+    PilotAcceptance.objects.bulk_create(acceptances)
+    for bfs, acceptance, post_flying in batch:
+        if post_flying is not None:
+            post_flying.pilot_acceptance_id = acceptance.pk
+            post_flying_rows.append(post_flying)
+    PostFlying.objects.bulk_create(post_flying_rows)
+    counts['bfs_records'] += len(batch)
+    counts['pilot_acceptances'] += len(acceptances)
+    counts['post_flying'] += len(post_flying_rows)
+
+
+def _leading_particulars(rng, aircraft_ids, prefix):
+    for aircraft_id in aircraft_ids:
+        airframe_hours = Decimal(rng.randint(500, 9000))
+        yield LeadingParticulars(
+            aircraft_id=aircraft_id, engine_type=rng.choice(['Turbofan', 'Turboprop', 'Turboshaft']),
+            engine_serial_number=f'{prefix}-E{aircraft_id:08d}', airframe_hours=airframe_hours,
+            engine_hours=airframe_hours - rng.randint(0, 400), maximum_takeoff_weight=Decimal(rng.randint(5000, 70000)),
+            maximum_landing_weight=Decimal(rng.randint(4000, 60000)), fuel_tank_capacity=Decimal(rng.randint(1000, 25000)),
+        )
+
+
+def _workflow_chains(rng, aircraft_ids, pilot_ids, technician_ids, today, days):
+    """
+    Roughly one sortie every other day per aircraft: a signed-off BFS, an accepted pilot
+    acceptance and a completed (now and then terminated) post-flying record. Sorties from
+    the last two days are still under way, stopping at an earlier step of the workflow.
+    """
+    for aircraft_id in aircraft_ids:
+        for day in range(days, 0, -1):
+            if rng.random() >= 0.5:
+                continue
+            service_date = timezone.make_aware(datetime.combine(today - timedelta(days=day), time(rng.randint(5, 9), 0)))
+            crew = {trade: rng.choice(technician_ids) for trade in BFS_TRADES}
+            fsi_id, pilot_id = rng.choice(technician_ids), rng.choice(pilot_ids)
+            signed_at = service_date + timedelta(minutes=45)
+            under_way = day <= 2
+
+            bfs = BeforeFlyingService(
+                aircraft_id=aircraft_id, service_date=service_date, personnel_added=True,
+                status='IN_PROGRESS' if under_way else 'FSI_APPROVED',
+                fsi_initial_signature_id=fsi_id, fsi_initial_signed_at=service_date,
+                **{f'assigned_{trade}_id': user_id for trade, user_id in crew.items()},
+            )
+            if under_way:
+                yield bfs, None, None
+                continue
+            for trade, user_id in crew.items():
+                setattr(bfs, f'{trade}_signature_id', user_id)
+                setattr(bfs, f'{trade}_signed_at', signed_at)
+            bfs.fsi_signature_id, bfs.fsi_signed_at = fsi_id, signed_at + timedelta(minutes=5)
+
+            accepted_at = signed_at + timedelta(minutes=20)
+            acceptance = PilotAcceptance(
+                aircraft_id=aircraft_id, acceptance_date=accepted_at, status='ACCEPTED',
+                pilot_id=pilot_id, pilot_signed_at=accepted_at, fuel_level_check=True, tire_pressure_check=True,
+                engine_check=True, controls_check=True, instruments_check=True, communication_check=True,
+            )
+            duration = rng.choice([1, 1, 2, 2, 3])
+            landed_at = accepted_at + timedelta(hours=duration, minutes=30)
+            terminated = rng.random() < 0.02
+            post_flying = PostFlying(
+                aircraft_id=aircraft_id, post_flight_date=landed_at,
+                status='TERMINATED' if terminated else 'COMPLETED', flight_status='TERMINATED' if terminated else 'COMPLETED',
+                termination_reason='Generated termination' if terminated else None,
+                flight_hours=Decimal(duration) + Decimal(rng.randint(0, 3) * 25) / 100,
+                number_of_landings=rng.randint(1, 4), fuel_consumed=Decimal(rng.randint(300, 3000)),
+                engine_condition='Normal', pilot_id=pilot_id, pilot_signed_at=landed_at,
+                engineer_id=crew['ae'], engineer_signed_at=landed_at + timedelta(minutes=30),
+            )
+            yield bfs, acceptance, post_flying
+
+
+def _flights(rng, aircraft_ids, pilot_ids, start, days):
+    for aircraft_id in aircraft_ids:
+        for day in range(days):
+            # Roughly one sortie every other day per aircraft
+            if rng.random() >= 0.5:
+                continue
+            takeoff_hour = rng.randint(6, 16)
+            duration = rng.choice([1, 1, 2, 2, 3])
+            yield FlyingOperation(
+                aircraft_id=aircraft_id, pilot_id=rng.choice(pilot_ids), co_pilot_id=rng.choice(pilot_ids + [None]),
+                mission_type=rng.choice(MISSION_TYPES), flight_date=start + timedelta(days=day),
+                takeoff_time=time(takeoff_hour, rng.choice([0, 15, 30, 45])), landing_time=time(takeoff_hour + duration, 0),
+                flight_hours=Decimal(duration) + Decimal(rng.randint(0, 3) * 25) / 100,
+                departure_location='Home Base', arrival_location=rng.choice(['Home Base', 'Forward Base', 'Range']),
+                fuel_consumed=Decimal(rng.randint(300, 3000)),
+            )
+
+
+def _maintenance(rng, aircraft_ids, technician_ids, start, days, today):
+    for aircraft_id in aircraft_ids:
+        # Monthly inspections through the history plus the next quarter
+        for day in range(rng.randint(0, 29), days + 90, 30):
+            scheduled_date = start + timedelta(days=day)
+            past = scheduled_date < today
+            yield MaintenanceSchedule(
+                aircraft_id=aircraft_id, maintenance_type=rng.choices(['ROUTINE', 'SCHEDULED', 'MAJOR'], weights=[70, 25, 5])[0],
+                scheduled_date=scheduled_date, completion_date=scheduled_date if past else None,
+                status='COMPLETED' if past else 'SCHEDULED', description='Periodic inspection',
+                technician_id=rng.choice(technician_ids), estimated_hours=Decimal(rng.randint(2, 24)),
+            )
+
+
+def _defects(rng, aircraft_ids, technician_ids, start, days, prefix):
+    number = 0
+    for aircraft_id in aircraft_ids:
+        for day in range(rng.randint(0, 19), days, 20):
+            number += 1
+            recent = day > days - 60
+            yield DeferredDefect(
+                aircraft_id=aircraft_id, defect_number=f'{prefix}-D{number:08d}', title='Synthetic defect',
+                description='Generated for load testing', severity=rng.choices(['CRITICAL', 'MAJOR', 'MINOR'], weights=[5, 25, 70])[0],
+                status=rng.choice(['OPEN', 'IN_PROGRESS', 'DEFERRED']) if recent else 'RESOLVED',
+                reported_by_id=rng.choice(technician_ids), reported_date=start + timedelta(days=day),
+            )
+
+
+def _limitations(rng, aircraft_ids, technician_ids, start, days):
+    for aircraft_id in aircraft_ids:
+        for day in range(rng.randint(0, 89), days, 90):
+            is_active = day > days - 90
+            yield Limitation(
+                aircraft_id=aircraft_id, limitation_type=rng.choice(['Speed', 'Altitude', 'G-Load', 'Payload']),
+                description='Generated for load testing', imposed_date=start + timedelta(days=day),
+                lifted_date=None if is_active else start + timedelta(days=day + 30), is_active=is_active,
+                imposed_by_id=rng.choice(technician_ids),
+            )
+
+
+def _forecasts(rng, aircraft_ids, today):
+    first_month = today.replace(day=1)
+    for aircraft_id in aircraft_ids:
+        for month in range(12):
+            year, month_index = divmod(first_month.month - 1 + month, 12)
+            yield MaintenanceForecast(
+                aircraft_id=aircraft_id, forecast_month=date(first_month.year + year, month_index + 1, 1),
+                estimated_flying_hours=Decimal(rng.randint(10, 40)), estimated_maintenance_hours=Decimal(rng.randint(4, 20)),
+                major_maintenance_due=rng.random() < 0.1,
+            )
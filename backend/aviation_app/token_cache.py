@@ -0,0 +1,43 @@
+"""
+Cache backends for the 'tokens' store of revoked refresh tokens under the locmem and file
+CACHE_BACKENDs. Django's backends make room by culling live entries at MAX_ENTRIES, which
+would accept those revoked tokens again; these drop only expired entries and, when the store
+is still full, refuse the new entry with RevocationStoreFull.
+"""
+import time
+
+from django.core.cache.backends.filebased import FileBasedCache
+from django.core.cache.backends.locmem import LocMemCache
+
+
+class RevocationStoreFull(Exception):
+    """Raised when a revoked refresh token cannot be stored without dropping an unexpired one"""
+
+
+class RevocationLocMemCache(LocMemCache):
+
+    def _cull(self):
+        # Called with the cache's lock held, before adding an entry to a full cache
+        now = time.time()
+        for key in [key for key, expiry in self._expire_info.items() if expiry is not None and expiry <= now]:
+            self._delete(key)
+        if len(self._cache) >= self._max_entries:
+            raise RevocationStoreFull(f'{len(self._cache)} unexpired revoked tokens')
+
+
+class RevocationFileCache(FileBasedCache):
+
+    def _cull(self):
+        filelist = self._list_cache_files()
+        if len(filelist) < self._max_entries:
+            return
+        remaining = 0
+        for path in filelist:
+            try:
+                with open(path, 'rb') as entry:
+                    if not self._is_expired(entry):
+                        remaining += 1
+            except FileNotFoundError:
+                pass
+        if remaining >= self._max_entries:
+            raise RevocationStoreFull(f'{remaining} unexpired revoked tokens')
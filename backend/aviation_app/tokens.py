@@ -0,0 +1,206 @@
+"""
+Access tokens carrying the user's display claims (CLAIM_FIELDS), so authenticating a request
+needs no database query: request.user is a TokenUser answering the id and those claims from
+the token, and loading the User row only when a view needs more, e.g. to assign it to a
+foreign key when signing a record.
+
+A user's tokens are revoked when their password, is_active, is_staff or is_superuser change,
+or when the user is deleted (see signals.py). The check reads the revocation time through the
+shared cache and asks the database only on a miss; with the per-process locmem cache, other
+workers see a revocation within TOKEN_REVOCATION_CACHE_TTL seconds.
+
+Refresh tokens are also refused one by one, once rotated or signed out: their jti is kept in
+the 'tokens' cache until the moment the token would have expired anyway, so the store holds
+only tokens still within REFRESH_TOKEN_LIFETIME, needs no cleanup job, and a check is one
+cache read. Rotation claims the old jti with cache.add, so of two refreshes racing with the
+same token only one succeeds (atomically so on Redis and locmem). Share the cache between
+workers ('file' or 'redis' CACHE_BACKEND) so a token used on one is refused on all.
+
+Dropping a revocation early would accept its token again, so the store never evicts (see
+settings.py) and a revocation that cannot be stored fails the refresh or logout with a 503.
+"""
+import logging
+import time
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.utils import timezone
+from django.utils.functional import SimpleLazyObject
+from rest_framework.exceptions import APIException
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .models import User
+
+logger = logging.getLogger(__name__)
+
+# User fields copied into every token
+CLAIM_FIELDS = ('pno', 'full_name', 'rank', 'designation', 'is_staff')
+# User flags whose change revokes the user's tokens, besides the password
+SECURITY_FIELDS = ('is_active', 'is_staff', 'is_superuser')
+
+# Revocation state of users that were deleted or deactivated: every token is refused
+REVOKED = 'revoked'
+
+
+class ClaimsRefreshToken(RefreshToken):
+    """Refresh token with CLAIM_FIELDS, which its access tokens copy"""
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        token.set_user_claims(user)
+        return token
+
+    def set_user_claims(self, user):
+        for name in CLAIM_FIELDS:
+            self[name] = getattr(user, name)
+
+
+def _revocation_key(user_id):
+    return f'token-revocation:{user_id}'
+
+
+def token_revocation(user_id):
+    """Unix time before which the user's tokens are refused (0: none are), or REVOKED"""
+    key = _revocation_key(user_id)
+    state = cache.get(key)
+    if state is None:
+        row = User.objects.filter(pk=user_id).values_list('is_active', 'tokens_revoked_at').first()
+        if row is None or not row[0]:
+            state = REVOKED
+        else:
+            state = int(row[1].timestamp()) if row[1] else 0
+        cache.set(key, state, getattr(settings, 'TOKEN_REVOCATION_CACHE_TTL', 300))
+    return state
+
+
+def is_revoked(token):
+    state = token_revocation(token[api_settings.USER_ID_CLAIM])
+    # iat is in whole seconds: tokens issued within the second of a revocation are kept
+    return state == REVOKED or token.get('iat', 0) < state
+
+
+def revoke_user_tokens(user, deleted=False):
+    """Refuse every token issued to the user so far; deleted and inactive users are refused altogether"""
+    if deleted or not user.is_active:
+        state = REVOKED
+    else:
+        now = timezone.now()
+        User.objects.filter(pk=user.pk).update(tokens_revoked_at=now)
+        user.tokens_revoked_at = now
+        state = int(now.timestamp())
+    cache.set(_revocation_key(user.pk), state, getattr(settings, 'TOKEN_REVOCATION_CACHE_TTL', 300))
+
+
+class RevocationUnavailable(APIException):
+    status_code = 503
+    default_detail = 'Tokens cannot be refreshed or revoked right now, please try again later.'
+    default_code = 'revocation_unavailable'
+
+
+def _refresh_key(jti):
+    return f'refresh-revoked:{jti}'
+
+
+def revoke_refresh_token(token):
+    """
+    Refuse the refresh token from now on, until it expires. False if it was already refused,
+    e.g. by a concurrent rotation.
+    """
+    remaining = token['exp'] - int(time.time())
+    if remaining <= 0:
+        return True
+    try:
+        return caches['tokens'].add(_refresh_key(token[api_settings.JTI_CLAIM]), 1, remaining)
+    except Exception:
+        # Fail closed: a store that is full (RevocationStoreFull, or Redis out of memory under
+        # noeviction) or down must not let a rotation hand out a new token beside the old one
+        logger.exception('Could not store a revoked refresh token')
+        raise RevocationUnavailable()
+
+
+def is_refresh_token_revoked(token):
+    return caches['tokens'].get(_refresh_key(token[api_settings.JTI_CLAIM])) is not None
+
+
+def _claim(name):
+    return property(lambda self: self.__dict__['_token'][name])
+
+
+class TokenUser(SimpleLazyObject):
+    """
+    request.user for a claims token. The id and CLAIM_FIELDS come from the token; reading any
+    other attribute, calling a model method or assigning it to a foreign key loads the User row.
+    """
+    is_authenticated = True
+    is_anonymous = False
+    is_active = True
+
+    def __init__(self, token):
+        user_id = token[api_settings.USER_ID_CLAIM]
+        super().__init__(lambda: User.objects.get(pk=user_id))
+        self.__dict__['_token'] = token
+
+    def __bool__(self):
+        return True
+
+    id = pk = _claim(api_settings.USER_ID_CLAIM)
+    pno = _claim('pno')
+    full_name = _claim('full_name')
+    rank = _claim('rank')
+    designation = _claim('designation')
+    is_staff = _claim('is_staff')
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """JWTAuthentication returning a TokenUser, after a cached revocation check instead of a User query"""
+
+    def get_user(self, validated_token):
+        if api_settings.USER_ID_CLAIM not in validated_token:
+            raise InvalidToken('Token contained no recognizable user identification')
+        if is_revoked(validated_token):
+            raise AuthenticationFailed('Token has been revoked', code='token_revoked')
+        if any(name not in validated_token for name in CLAIM_FIELDS):
+            # Issued before tokens carried claims
+            return super().get_user(validated_token)
+        return TokenUser(validated_token)
+
+
+def jwt_authentication():
+    """The JWT authentication API views use, for code authenticating requests itself"""
+    if getattr(settings, 'JWT_TOKEN_USER', True):
+        return ClaimsJWTAuthentication()
+    return JWTAuthentication()
+
+
+class ClaimsTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    Refreshes read the user again, so a new access token carries current claims and a revoked
+    refresh token is refused. With BLACKLIST_AFTER_ROTATION, a rotated token cannot be used again.
+    """
+    token_class = ClaimsRefreshToken
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs['refresh'])
+        if is_refresh_token_revoked(refresh):
+            raise AuthenticationFailed('Token has been revoked', code='token_revoked')
+        user = User.objects.filter(pk=refresh.get(api_settings.USER_ID_CLAIM)).first()
+        if user is None or not user.is_active or (
+            user.tokens_revoked_at and refresh.get('iat', 0) < int(user.tokens_revoked_at.timestamp())
+        ):
+            raise AuthenticationFailed('Token has been revoked', code='token_revoked')
+
+        refresh.set_user_claims(user)
+        data = {'access': str(refresh.access_token)}
+        if api_settings.ROTATE_REFRESH_TOKENS:
+            if api_settings.BLACKLIST_AFTER_ROTATION and not revoke_refresh_token(refresh):
+                raise AuthenticationFailed('Token has been revoked', code='token_revoked')
+            refresh.set_jti()
+            refresh.set_exp()
+            refresh.set_iat()
+            data['refresh'] = str(refresh)
+        return data
@@ -1,9 +1,10 @@
+from django.conf import settings
 from django.urls import path, include
-from rest_framework.routers import DefaultRouter
 from rest_framework_simplejwt.views import TokenRefreshView
 from . import views
+from .bulk import BulkRouter
 
-router = DefaultRouter()
+router = BulkRouter()
 router.register(r'aircraft', views.AircraftViewSet, basename='aircraft')
 router.register(r'leading-particulars', views.LeadingParticularsViewSet, basename='leading-particulars')
 router.register(r'flying-operations', views.FlyingOperationViewSet, basename='flying-operations')
@@ -14,12 +15,28 @@ router.register(r'maintenance-forecasts', views.MaintenanceForecastViewSet, base
 router.register(r'before-flying-service', views.BeforeFlyingServiceViewSet, basename='before-flying-service')
 router.register(r'pilot-acceptance', views.PilotAcceptanceViewSet, basename='pilot-acceptance')
 router.register(r'post-flying', views.PostFlyingViewSet, basename='post-flying')
+router.register(r'utilization/daily', views.AircraftDailyUtilizationViewSet, basename='utilization-daily')
+router.register(r'utilization/missions', views.AircraftMissionUtilizationViewSet, basename='utilization-missions')
+router.register(r'utilization/pilots', views.PilotUtilizationViewSet, basename='utilization-pilots')
+
+# Under ASGI the dashboard and profile are served by their async views
+if settings.ASYNC_VIEWS:
+    dashboard_view, user_profile = views.dashboard_view_async, views.user_profile_async
+    workflow_events = views.workflow_events_async
+else:
+    dashboard_view, user_profile = views.dashboard_view, views.user_profile
+    workflow_events = views.workflow_events
 
 urlpatterns = [
     path('', include(router.urls)),
     path('auth/login/', views.login_view, name='login'),
+    path('auth/logout/', views.logout_view, name='logout'),
     path('auth/register/', views.register_view, name='register'),
     path('auth/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
-    path('auth/profile/', views.user_profile, name='user-profile'),
-    path('dashboard/', views.dashboard_view, name='dashboard'),
+    path('auth/profile/', user_profile, name='user-profile'),
+    path('auth/signing-pin/', views.set_signing_pin, name='signing-pin'),
+    path('dashboard/', dashboard_view, name='dashboard'),
+    path('dashboard/fleet/', views.fleet_summary_view, name='fleet-summary'),
+    path('events/', workflow_events, name='workflow-events'),
+    path('metrics/', views.metrics_view, name='metrics'),
 ]
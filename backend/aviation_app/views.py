@@ -1,22 +1,49 @@
+import time
+
 from rest_framework import viewsets, status, generics
 from rest_framework.decorators import api_view, permission_classes, action
 from rest_framework.response import Response
-from rest_framework.permissions import AllowAny, IsAuthenticated
-from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework.permissions import AllowAny, IsAdminUser, IsAuthenticated
+from rest_framework.exceptions import AuthenticationFailed, ValidationError
+from rest_framework_simplejwt.exceptions import TokenError
+from asgiref.sync import sync_to_async
+from django.conf import settings
 from django.contrib.auth import authenticate
+from django.db import transaction
+from django.db.models import DecimalField, F, PositiveIntegerField, Sum
+from django.db.models.functions import TruncMonth
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
 from django.utils import timezone
-from datetime import timedelta
+from django.utils.dateparse import parse_date
 from .models import (
     User, Aircraft, LeadingParticulars, FlyingOperation,
     MaintenanceSchedule, DeferredDefect, Limitation, MaintenanceForecast,
-    BeforeFlyingService, PilotAcceptance, PostFlying
+    BeforeFlyingService, PilotAcceptance, PostFlying,
+    AircraftDailyUtilization, AircraftMissionUtilization, PilotUtilization
 )
 from .serializers import (
     UserSerializer, UserRegistrationSerializer, AircraftSerializer, AircraftListSerializer,
     LeadingParticularsSerializer, FlyingOperationSerializer, MaintenanceScheduleSerializer,
     DeferredDefectSerializer, LimitationSerializer, MaintenanceForecastSerializer, DashboardSerializer,
-    BeforeFlyingServiceSerializer, PilotAcceptanceSerializer, PostFlyingSerializer
+    BeforeFlyingServiceSerializer, PilotAcceptanceSerializer, PostFlyingSerializer,
+    CompactBeforeFlyingServiceSerializer, CompactPostFlyingSerializer,
+    AircraftDailyUtilizationSerializer, AircraftMissionUtilizationSerializer, PilotUtilizationSerializer
 )
+from .async_views import async_api_view, AsyncDispatchMixin
+from .bulk import BulkWriteViewSetMixin
+from .fleet import fleet_summary
+from .exports import ExportViewSetMixin
+from .metrics import registry as metrics_registry
+from .events import get_broker, aircraft_channel, bfs_channel, format_event
+from .caching import read_through, AIRCRAFT_NAMESPACE, LEADING_PARTICULARS_NAMESPACE, PERSONNEL_NAMESPACE
+from .personnel import CompactPersonnelViewSetMixin
+from .passwords import PasswordCheckBusy
+from .pins import verify_signing_pin, SigningPinLocked
+from .prefetch import PrefetchPlanViewSetMixin
+from .snapshots import get_dashboard_snapshot, aget_dashboard_snapshot, mark_dashboard_stale
+from .tokens import ClaimsRefreshToken, jwt_authentication, revoke_refresh_token
+
+BFS_PERSONNEL_ROLES = ['ae', 'al', 'ao', 'ar', 'se', 'supervisor']
 
 
 @api_view(['POST'])
@@ -28,10 +55,16 @@ def login_view(request):
     if not pno or not password:
         return Response({'error': 'Please provide both PNO and password'}, status=status.HTTP_400_BAD_REQUEST)
 
-    user = authenticate(username=pno, password=password)
+    try:
+        user = authenticate(username=pno, password=password)
+    except PasswordCheckBusy:
+        return Response(
+            {'error': 'Too many logins at once, please try again'},
+            status=status.HTTP_503_SERVICE_UNAVAILABLE, headers={'Retry-After': '5'}
+        )
 
     if user is not None:
-        refresh = RefreshToken.for_user(user)
+        refresh = ClaimsRefreshToken.for_user(user)
         user_data = UserSerializer(user).data
 
         return Response({
@@ -43,13 +76,26 @@ def login_view(request):
         return Response({'error': 'Invalid credentials'}, status=status.HTTP_401_UNAUTHORIZED)
 
 
+@api_view(['POST'])
+@permission_classes([AllowAny])
+def logout_view(request):
+    """Revoke a refresh token; its access tokens stay valid until they expire"""
+    try:
+        refresh = ClaimsRefreshToken(str(request.data.get('refresh') or ''))
+    except TokenError:
+        return Response({'error': 'Invalid refresh token'}, status=status.HTTP_400_BAD_REQUEST)
+
+    revoke_refresh_token(refresh)
+    return Response({'message': 'Logged out'})
+
+
 @api_view(['POST'])
 @permission_classes([AllowAny])
 def register_view(request):
     serializer = UserRegistrationSerializer(data=request.data)
     if serializer.is_valid():
         user = serializer.save()
-        refresh = RefreshToken.for_user(user)
+        refresh = ClaimsRefreshToken.for_user(user)
         user_data = UserSerializer(user).data
 
         return Response({
@@ -67,6 +113,37 @@ def user_profile(request):
     return Response(serializer.data)
 
 
+@async_api_view(['GET'])
+@permission_classes([IsAuthenticated])
+async def user_profile_async(request):
+    """
+    ASGI counterpart of user_profile. Serialized on a thread: a TokenUser loads the rest of
+    the user's row from the database on first use
+    """
+    data = await sync_to_async(lambda: UserSerializer(request.user).data)()
+    return Response(data)
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def set_signing_pin(request):
+    password = request.data.get('password')
+    pin = str(request.data.get('pin') or '')
+
+    if not password or not pin:
+        return Response({'error': 'Please provide both password and PIN'}, status=status.HTTP_400_BAD_REQUEST)
+
+    if not pin.isdigit() or not 4 <= len(pin) <= 8:
+        return Response({'error': 'PIN must be 4 to 8 digits'}, status=status.HTTP_400_BAD_REQUEST)
+
+    if not request.user.check_password(password):
+        return Response({'error': 'Invalid password'}, status=status.HTTP_403_FORBIDDEN)
+
+    request.user.set_signing_pin(pin)
+    request.user.save(update_fields=['signing_pin'])
+    return Response({'message': 'Signing PIN updated'})
+
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def dashboard_view(request):
@@ -75,61 +152,171 @@ def dashboard_view(request):
     if not aircraft_id:
         return Response({'error': 'Aircraft ID is required'}, status=status.HTTP_400_BAD_REQUEST)
 
-    try:
-        aircraft = Aircraft.objects.get(id=aircraft_id)
-    except Aircraft.DoesNotExist:
+    return dashboard_response(request, get_dashboard_snapshot(aircraft_id))
+
+
+@async_api_view(['GET'])
+@permission_classes([IsAuthenticated])
+async def dashboard_view_async(request):
+    """ASGI counterpart of dashboard_view; a snapshot rebuild runs its section queries concurrently"""
+    aircraft_id = request.query_params.get('aircraft_id')
+
+    if not aircraft_id:
+        return Response({'error': 'Aircraft ID is required'}, status=status.HTTP_400_BAD_REQUEST)
+
+    return dashboard_response(request, await aget_dashboard_snapshot(aircraft_id))
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def fleet_summary_view(request):
+    """Dashboard totals for every aircraft, optionally narrowed by aircraft_type and status"""
+    aircraft_type = request.query_params.get('aircraft_type')
+    aircraft_status = request.query_params.get('status')
+
+    if aircraft_type and aircraft_type not in dict(Aircraft.AIRCRAFT_TYPE_CHOICES):
+        return Response({'error': f'Unknown aircraft type: {aircraft_type}'}, status=status.HTTP_400_BAD_REQUEST)
+    if aircraft_status and aircraft_status not in dict(Aircraft.STATUS_CHOICES):
+        return Response({'error': f'Unknown status: {aircraft_status}'}, status=status.HTTP_400_BAD_REQUEST)
+
+    return Response(fleet_summary(aircraft_type, aircraft_status))
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def metrics_view(request):
+    """Request metrics of this worker process in Prometheus text format"""
+    return HttpResponse(metrics_registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+def dashboard_response(request, snapshot):
+    if snapshot is None:
         return Response({'error': 'Aircraft not found'}, status=status.HTTP_404_NOT_FOUND)
 
-    # Get recent flights (last 10)
-    recent_flights = FlyingOperation.objects.filter(aircraft=aircraft)[:10]
-
-    # Get upcoming maintenance (next 30 days)
-    thirty_days_from_now = timezone.now().date() + timedelta(days=30)
-    upcoming_maintenance = MaintenanceSchedule.objects.filter(
-        aircraft=aircraft,
-        scheduled_date__lte=thirty_days_from_now,
-        status__in=['SCHEDULED', 'IN_PROGRESS']
-    )
-
-    # Get active defects
-    active_defects = DeferredDefect.objects.filter(
-        aircraft=aircraft,
-        status__in=['OPEN', 'IN_PROGRESS', 'DEFERRED']
-    )
-
-    # Get active limitations
-    active_limitations = Limitation.objects.filter(aircraft=aircraft, is_active=True)
-
-    # Get maintenance forecasts for next 12 months
-    maintenance_forecasts = MaintenanceForecast.objects.filter(
-        aircraft=aircraft,
-        forecast_month__gte=timezone.now().date()
-    )[:12]
-
-    dashboard_data = {
-        'aircraft': AircraftSerializer(aircraft).data,
-        'recent_flights': FlyingOperationSerializer(recent_flights, many=True).data,
-        'upcoming_maintenance': MaintenanceScheduleSerializer(upcoming_maintenance, many=True).data,
-        'active_defects': DeferredDefectSerializer(active_defects, many=True).data,
-        'active_limitations': LimitationSerializer(active_limitations, many=True).data,
-        'maintenance_forecasts': MaintenanceForecastSerializer(maintenance_forecasts, many=True).data,
-    }
-
-    return Response(dashboard_data)
-
-
-class AircraftViewSet(viewsets.ModelViewSet):
+    etag = f'"{snapshot.etag}"'
+    if etag in [tag.strip() for tag in request.META.get('HTTP_IF_NONE_MATCH', '').split(',')]:
+        response = Response(status=status.HTTP_304_NOT_MODIFIED)
+    else:
+        response = Response(snapshot.payload)
+    response['ETag'] = etag
+    response['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+def stream_channels(request):
+    """Authenticate an event stream request and resolve its channels; returns (channels, error response)"""
+    authenticator = jwt_authentication()
+    try:
+        result = authenticator.authenticate(request)
+        if result is None and request.GET.get('token'):
+            # EventSource cannot send headers, so browsers pass the access token in the query string
+            token = authenticator.get_validated_token(request.GET['token'])
+            result = (authenticator.get_user(token), token)
+    except AuthenticationFailed as exc:
+        return None, JsonResponse({'error': str(exc.detail)}, status=status.HTTP_401_UNAUTHORIZED)
+    if result is None:
+        return None, JsonResponse({'error': 'Authentication credentials were not provided'}, status=status.HTTP_401_UNAUTHORIZED)
+
+    bfs_id = request.GET.get('bfs_id')
+    aircraft_id = request.GET.get('aircraft_id')
+    if bfs_id:
+        if not bfs_id.isdigit() or not BeforeFlyingService.objects.filter(pk=bfs_id).exists():
+            return None, JsonResponse({'error': 'BFS record not found'}, status=status.HTTP_404_NOT_FOUND)
+        return [bfs_channel(int(bfs_id))], None
+    if aircraft_id:
+        if not aircraft_id.isdigit() or not Aircraft.objects.filter(pk=aircraft_id).exists():
+            return None, JsonResponse({'error': 'Aircraft not found'}, status=status.HTTP_404_NOT_FOUND)
+        return [aircraft_channel(int(aircraft_id))], None
+    return None, JsonResponse({'error': 'aircraft_id or bfs_id is required'}, status=status.HTTP_400_BAD_REQUEST)
+
+
+def event_stream_response(stream):
+    response = StreamingHttpResponse(stream, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Stop nginx from buffering the stream
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+# Sent when a client fell too far behind to apply the diffs it missed; it should re-fetch instead
+RESYNC_EVENT = 'event: resync\ndata: {}\n\n'
+KEEP_ALIVE = ': keep-alive\n\n'
+
+
+def workflow_events(request):
+    """
+    Server-sent events with compact diffs of BFS, pilot acceptance and post-flying workflow
+    state for one aircraft (?aircraft_id=) or one BFS record (?bfs_id=). The stream closes after
+    EVENT_STREAM_MAX_SECONDS and the browser reconnects; clients re-fetch records on (re)connect.
+    Refused unless EVENT_STREAMS_OVER_WSGI, since every open stream pins a worker.
+    """
+    if not getattr(settings, 'EVENT_STREAMS_OVER_WSGI', False):
+        return JsonResponse(
+            {'error': 'Event streams are served in ASGI mode (ASYNC_VIEWS=True)'},
+            status=status.HTTP_501_NOT_IMPLEMENTED
+        )
+    channels, error = stream_channels(request)
+    if error is not None:
+        return error
+
+    def stream():
+        subscription = get_broker().subscribe(channels)
+        try:
+            yield 'retry: 3000\n\n'
+            deadline = time.monotonic() + settings.EVENT_STREAM_MAX_SECONDS
+            while time.monotonic() < deadline:
+                messages, overflowed = subscription.get(settings.EVENT_STREAM_HEARTBEAT)
+                if overflowed:
+                    yield RESYNC_EVENT
+                for message in messages:
+                    yield format_event(message)
+                if not messages:
+                    yield KEEP_ALIVE
+        finally:
+            subscription.close()
+
+    return event_stream_response(stream())
+
+
+async def workflow_events_async(request):
+    """ASGI counterpart of workflow_events; open streams wait on the event loop instead of a worker"""
+    channels, error = await sync_to_async(stream_channels)(request)
+    if error is not None:
+        return error
+
+    async def stream():
+        subscription = get_broker().subscribe(channels)
+        try:
+            yield 'retry: 3000\n\n'
+            deadline = time.monotonic() + settings.EVENT_STREAM_MAX_SECONDS
+            while time.monotonic() < deadline:
+                messages, overflowed = await subscription.aget(settings.EVENT_STREAM_HEARTBEAT)
+                if overflowed:
+                    yield RESYNC_EVENT
+                for message in messages:
+                    yield format_event(message)
+                if not messages:
+                    yield KEEP_ALIVE
+        finally:
+            subscription.close()
+
+    return event_stream_response(stream())
+
+
+class AircraftViewSet(AsyncDispatchMixin, PrefetchPlanViewSetMixin, viewsets.ModelViewSet):
     queryset = Aircraft.objects.all()
     serializer_class = AircraftSerializer
     permission_classes = [IsAuthenticated]
 
     @action(detail=False, methods=['get'])
+    @read_through(AIRCRAFT_NAMESPACE)
     def types(self, request):
         """Get distinct aircraft types"""
         types = Aircraft.objects.values_list('aircraft_type', flat=True).distinct()
         return Response(types)
 
     @action(detail=False, methods=['get'])
+    @read_through(AIRCRAFT_NAMESPACE)
     def by_type(self, request):
         """Get aircraft by type"""
         aircraft_type = request.query_params.get('type')
@@ -140,90 +327,133 @@ class AircraftViewSet(viewsets.ModelViewSet):
         return Response({'error': 'Type parameter is required'}, status=status.HTTP_400_BAD_REQUEST)
 
 
-class LeadingParticularsViewSet(viewsets.ModelViewSet):
+class LeadingParticularsViewSet(AsyncDispatchMixin, PrefetchPlanViewSetMixin, viewsets.ModelViewSet):
     queryset = LeadingParticulars.objects.all()
     serializer_class = LeadingParticularsSerializer
     permission_classes = [IsAuthenticated]
 
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        aircraft_id = self.request.query_params.get('aircraft_id')
+        if aircraft_id:
+            queryset = queryset.filter(aircraft_id=aircraft_id)
+        return queryset
+
+    @read_through(LEADING_PARTICULARS_NAMESPACE)
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @read_through(LEADING_PARTICULARS_NAMESPACE)
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
 
-class FlyingOperationViewSet(viewsets.ModelViewSet):
+
+class FlyingOperationViewSet(AsyncDispatchMixin, BulkWriteViewSetMixin, ExportViewSetMixin, PrefetchPlanViewSetMixin, viewsets.ModelViewSet):
     queryset = FlyingOperation.objects.all()
     serializer_class = FlyingOperationSerializer
     permission_classes = [IsAuthenticated]
+    export_name = 'flying-operations'
 
     def get_queryset(self):
-        queryset = FlyingOperation.objects.all()
+        queryset = super().get_queryset()
         aircraft_id = self.request.query_params.get('aircraft_id')
         if aircraft_id:
             queryset = queryset.filter(aircraft_id=aircraft_id)
         return queryset
 
 
-class MaintenanceScheduleViewSet(viewsets.ModelViewSet):
+class MaintenanceScheduleViewSet(AsyncDispatchMixin, BulkWriteViewSetMixin, ExportViewSetMixin, PrefetchPlanViewSetMixin, viewsets.ModelViewSet):
     queryset = MaintenanceSchedule.objects.all()
     serializer_class = MaintenanceScheduleSerializer
     permission_classes = [IsAuthenticated]
+    export_name = 'maintenance-schedules'
 
     def get_queryset(self):
-        queryset = MaintenanceSchedule.objects.all()
+        queryset = super().get_queryset()
         aircraft_id = self.request.query_params.get('aircraft_id')
         if aircraft_id:
             queryset = queryset.filter(aircraft_id=aircraft_id)
         return queryset
 
 
-class DeferredDefectViewSet(viewsets.ModelViewSet):
+class DeferredDefectViewSet(AsyncDispatchMixin, ExportViewSetMixin, PrefetchPlanViewSetMixin, viewsets.ModelViewSet):
     queryset = DeferredDefect.objects.all()
     serializer_class = DeferredDefectSerializer
     permission_classes = [IsAuthenticated]
+    export_name = 'deferred-defects'
 
     def get_queryset(self):
-        queryset = DeferredDefect.objects.all()
+        queryset = super().get_queryset()
         aircraft_id = self.request.query_params.get('aircraft_id')
         if aircraft_id:
             queryset = queryset.filter(aircraft_id=aircraft_id)
         return queryset
 
 
-class LimitationViewSet(viewsets.ModelViewSet):
+class LimitationViewSet(AsyncDispatchMixin, PrefetchPlanViewSetMixin, viewsets.ModelViewSet):
     queryset = Limitation.objects.all()
     serializer_class = LimitationSerializer
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
-        queryset = Limitation.objects.all()
+        queryset = super().get_queryset()
         aircraft_id = self.request.query_params.get('aircraft_id')
         if aircraft_id:
             queryset = queryset.filter(aircraft_id=aircraft_id)
         return queryset
 
 
-class MaintenanceForecastViewSet(viewsets.ModelViewSet):
+class MaintenanceForecastViewSet(AsyncDispatchMixin, PrefetchPlanViewSetMixin, viewsets.ModelViewSet):
     queryset = MaintenanceForecast.objects.all()
     serializer_class = MaintenanceForecastSerializer
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
-        queryset = MaintenanceForecast.objects.all()
+        queryset = super().get_queryset()
         aircraft_id = self.request.query_params.get('aircraft_id')
         if aircraft_id:
             queryset = queryset.filter(aircraft_id=aircraft_id)
         return queryset
 
-
-class BeforeFlyingServiceViewSet(viewsets.ModelViewSet):
+    @action(detail=False, methods=['post'])
+    def generate(self, request):
+        """Recompute forecasts from flying history, for `aircraft_ids` or the whole fleet"""
+        from .forecasting import generate_forecasts
+
+        aircraft_ids = request.data.get('aircraft_ids')
+        try:
+            horizon = int(request.data.get('horizon', 12))
+            lookback = int(request.data.get('lookback', 12))
+            if aircraft_ids is not None:
+                if not isinstance(aircraft_ids, list):
+                    raise TypeError(aircraft_ids)
+                aircraft_ids = [int(aircraft_id) for aircraft_id in aircraft_ids]
+        except (TypeError, ValueError):
+            return Response({'error': 'aircraft_ids must be a list of ids; horizon and lookback whole months'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if not 1 <= horizon <= 60 or not 1 <= lookback <= 120:
+            return Response({'error': 'horizon must be 1 to 60 months and lookback 1 to 120'},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        aircraft, rows = generate_forecasts(aircraft_ids, horizon=horizon, lookback=lookback)
+        return Response({'aircraft': aircraft, 'forecasts': rows})
+
+
+class BeforeFlyingServiceViewSet(AsyncDispatchMixin, CompactPersonnelViewSetMixin, PrefetchPlanViewSetMixin, viewsets.ModelViewSet):
     queryset = BeforeFlyingService.objects.all()
     serializer_class = BeforeFlyingServiceSerializer
+    compact_serializer_class = CompactBeforeFlyingServiceSerializer
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
-        queryset = BeforeFlyingService.objects.all()
+        queryset = super().get_queryset()
         aircraft_id = self.request.query_params.get('aircraft_id')
         if aircraft_id:
             queryset = queryset.filter(aircraft_id=aircraft_id)
         return queryset
 
     @action(detail=False, methods=['get'])
+    @read_through(PERSONNEL_NAMESPACE)
     def available_personnel(self, request):
         """Get list of available users for personnel selection"""
         users = User.objects.filter(is_active=True).values('id', 'pno', 'full_name', 'rank', 'designation')
@@ -242,7 +472,6 @@ class BeforeFlyingServiceViewSet(viewsets.ModelViewSet):
             return Response({'error': 'FSI has already authenticated'}, status=status.HTTP_400_BAD_REQUEST)
 
         bfs.fsi_initial_signature = request.user
-        bfs.fsi_initial_pin = pin
         bfs.fsi_initial_signed_at = timezone.now()
         bfs.status = 'PERSONNEL_SELECTION'
         bfs.save()
@@ -255,44 +484,119 @@ class BeforeFlyingServiceViewSet(viewsets.ModelViewSet):
         """FSI assigns personnel (tradesmen and supervisor) for BFS"""
         bfs = self.get_object()
 
-        if not bfs.fsi_initial_signed_at:
-            return Response({'error': 'FSI must authenticate first'}, status=status.HTTP_400_BAD_REQUEST)
-
-        # Get personnel IDs from request
-        assigned_ae_id = request.data.get('assigned_ae')
-        assigned_al_id = request.data.get('assigned_al')
-        assigned_ao_id = request.data.get('assigned_ao')
-        assigned_ar_id = request.data.get('assigned_ar')
-        assigned_se_id = request.data.get('assigned_se')
-        assigned_supervisor_id = request.data.get('assigned_supervisor')
-        supervisor_required = request.data.get('supervisor_required', False)
+        users, error = self._resolve_personnel([request.data])
+        if error:
+            return Response({'error': error}, status=status.HTTP_400_BAD_REQUEST)
 
-        # Validate at least AE is assigned
-        if not assigned_ae_id:
-            return Response({'error': 'At least AE (Air Engineer) must be assigned'}, status=status.HTTP_400_BAD_REQUEST)
-
-        # Assign personnel
-        if assigned_ae_id:
-            bfs.assigned_ae = User.objects.get(id=assigned_ae_id)
-        if assigned_al_id:
-            bfs.assigned_al = User.objects.get(id=assigned_al_id)
-        if assigned_ao_id:
-            bfs.assigned_ao = User.objects.get(id=assigned_ao_id)
-        if assigned_ar_id:
-            bfs.assigned_ar = User.objects.get(id=assigned_ar_id)
-        if assigned_se_id:
-            bfs.assigned_se = User.objects.get(id=assigned_se_id)
-        if assigned_supervisor_id:
-            bfs.assigned_supervisor = User.objects.get(id=assigned_supervisor_id)
-
-        bfs.supervisor_required = supervisor_required
-        bfs.personnel_added = True
-        bfs.status = 'IN_PROGRESS'
-        bfs.save()
+        update_fields, error = self._apply_personnel(bfs, request.data, users)
+        if error:
+            return Response({'error': error}, status=status.HTTP_400_BAD_REQUEST)
+        if update_fields:
+            bfs.save(update_fields=update_fields)
 
         serializer = self.get_serializer(bfs)
         return Response(serializer.data)
 
+    @action(detail=False, methods=['post'])
+    def bulk_assign_personnel(self, request):
+        """FSI assigns personnel to several BFS records at once; nothing is saved if any item is invalid"""
+        assignments = request.data.get('assignments')
+        if not isinstance(assignments, list) or not assignments:
+            return Response({'error': 'assignments must be a non-empty list'}, status=status.HTTP_400_BAD_REQUEST)
+
+        users, error = self._resolve_personnel(assignments)
+        if error:
+            return Response({'error': error}, status=status.HTTP_400_BAD_REQUEST)
+
+        bfs_ids = [self._parse_id(item.get('bfs_id')) for item in assignments]
+        records = self.get_queryset().in_bulk([bfs_id for bfs_id in bfs_ids if bfs_id is not None])
+
+        errors = []
+        updates = []
+        for index, (item, bfs_id) in enumerate(zip(assignments, bfs_ids)):
+            if bfs_id is None:
+                errors.append({'index': index, 'error': 'bfs_id must be an integer'})
+                continue
+            bfs = records.get(bfs_id)
+            if bfs is None:
+                errors.append({'index': index, 'error': 'BFS record not found'})
+                continue
+            update_fields, error = self._apply_personnel(bfs, item, users)
+            if error:
+                errors.append({'index': index, 'bfs_id': bfs.id, 'error': error})
+            elif update_fields:
+                updates.append((bfs, update_fields))
+
+        if errors:
+            return Response({'errors': errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        with transaction.atomic():
+            for bfs, update_fields in updates:
+                bfs.save(update_fields=update_fields)
+
+        serializer = self.get_serializer([records[bfs_id] for bfs_id in bfs_ids], many=True)
+        return Response(serializer.data)
+
+    @staticmethod
+    def _parse_id(value):
+        """An id given as an integer or a string of digits, else None"""
+        try:
+            # Through str() so that 5.5 and True are refused rather than truncated
+            return int(str(value))
+        except ValueError:
+            return None
+
+    def _resolve_personnel(self, assignments):
+        """Load every user referenced by the assignment payloads with a single query"""
+        user_ids = set()
+        for item in assignments:
+            if not isinstance(item, dict):
+                return None, 'Each assignment must be an object'
+            for role in BFS_PERSONNEL_ROLES:
+                user_id = item.get(f'assigned_{role}')
+                if user_id in (None, ''):
+                    continue
+                try:
+                    user_ids.add(int(user_id))
+                except (TypeError, ValueError):
+                    return None, f'Invalid user id {user_id!r} for {role.upper()}'
+        return User.objects.only('id').in_bulk(user_ids), None
+
+    def _apply_personnel(self, bfs, data, users):
+        """Set the assigned personnel on a BFS record in memory and return the changed columns"""
+        if not bfs.fsi_initial_signed_at:
+            return None, 'FSI must authenticate first'
+
+        # Validate at least AE is assigned
+        if not data.get('assigned_ae'):
+            return None, 'At least AE (Air Engineer) must be assigned'
+
+        update_fields = []
+        for role in BFS_PERSONNEL_ROLES:
+            user_id = data.get(f'assigned_{role}')
+            if user_id in (None, ''):
+                continue
+            user = users.get(int(user_id))
+            if user is None:
+                return None, f'User {user_id} not found for {role.upper()}'
+            if getattr(bfs, f'assigned_{role}_id') != user.id:
+                setattr(bfs, f'assigned_{role}', user)
+                update_fields.append(f'assigned_{role}')
+
+        changes = {
+            'supervisor_required': data.get('supervisor_required', False),
+            'personnel_added': True,
+            'status': 'IN_PROGRESS',
+        }
+        for field, value in changes.items():
+            if getattr(bfs, field) != value:
+                setattr(bfs, field, value)
+                update_fields.append(field)
+
+        if update_fields:
+            update_fields.append('updated_at')
+        return update_fields, None
+
     @action(detail=True, methods=['post'])
     def sign_tradesman(self, request, pk=None):
         """Sign BFS record as a tradesman (AE, AL, AO, AR, SE)"""
@@ -312,13 +616,16 @@ class BeforeFlyingServiceViewSet(viewsets.ModelViewSet):
         if not assigned_user:
             return Response({'error': f'No user assigned as {trade.upper()}'}, status=status.HTTP_403_FORBIDDEN)
 
-        # Verify the PIN matches the assigned user's password
-        if not assigned_user.check_password(pin):
+        # Verify the PIN matches the assigned user's signing PIN
+        try:
+            pin_valid = verify_signing_pin(assigned_user, pin)
+        except SigningPinLocked:
+            return Response({'error': 'Too many invalid PIN attempts, try again later'}, status=status.HTTP_429_TOO_MANY_REQUESTS)
+        if not pin_valid:
             return Response({'error': 'Invalid PIN'}, status=status.HTTP_403_FORBIDDEN)
 
         # Set the signature fields
         setattr(bfs, f'{trade_lower}_signature', assigned_user)
-        setattr(bfs, f'{trade_lower}_pin', pin)
         setattr(bfs, f'{trade_lower}_signed_at', timezone.now())
         bfs.save()
 
@@ -341,12 +648,15 @@ class BeforeFlyingServiceViewSet(viewsets.ModelViewSet):
         if not bfs.assigned_supervisor:
             return Response({'error': 'No supervisor assigned'}, status=status.HTTP_403_FORBIDDEN)
 
-        # Verify the PIN matches the assigned supervisor's password
-        if not bfs.assigned_supervisor.check_password(pin):
+        # Verify the PIN matches the assigned supervisor's signing PIN
+        try:
+            pin_valid = verify_signing_pin(bfs.assigned_supervisor, pin)
+        except SigningPinLocked:
+            return Response({'error': 'Too many invalid PIN attempts, try again later'}, status=status.HTTP_429_TOO_MANY_REQUESTS)
+        if not pin_valid:
             return Response({'error': 'Invalid PIN'}, status=status.HTTP_403_FORBIDDEN)
 
         bfs.supervisor_signature = bfs.assigned_supervisor
-        bfs.supervisor_pin = pin
         bfs.supervisor_signed_at = timezone.now()
         bfs.save()
 
@@ -366,7 +676,6 @@ class BeforeFlyingServiceViewSet(viewsets.ModelViewSet):
             return Response({'error': 'FSI must complete initial authentication first'}, status=status.HTTP_400_BAD_REQUEST)
 
         bfs.fsi_signature = request.user
-        bfs.fsi_pin = pin
         bfs.fsi_signed_at = timezone.now()
         bfs.status = 'FSI_APPROVED'
         bfs.save()
@@ -375,13 +684,13 @@ class BeforeFlyingServiceViewSet(viewsets.ModelViewSet):
         return Response(serializer.data)
 
 
-class PilotAcceptanceViewSet(viewsets.ModelViewSet):
+class PilotAcceptanceViewSet(AsyncDispatchMixin, PrefetchPlanViewSetMixin, viewsets.ModelViewSet):
     queryset = PilotAcceptance.objects.all()
     serializer_class = PilotAcceptanceSerializer
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
-        queryset = PilotAcceptance.objects.all()
+        queryset = super().get_queryset()
         aircraft_id = self.request.query_params.get('aircraft_id')
         if aircraft_id:
             queryset = queryset.filter(aircraft_id=aircraft_id)
@@ -397,7 +706,6 @@ class PilotAcceptanceViewSet(viewsets.ModelViewSet):
             return Response({'error': 'PIN is required'}, status=status.HTTP_400_BAD_REQUEST)
 
         acceptance.pilot = request.user
-        acceptance.pilot_pin = pin
         acceptance.pilot_signed_at = timezone.now()
         acceptance.status = 'ACCEPTED'
         acceptance.save()
@@ -406,13 +714,14 @@ class PilotAcceptanceViewSet(viewsets.ModelViewSet):
         return Response(serializer.data)
 
 
-class PostFlyingViewSet(viewsets.ModelViewSet):
+class PostFlyingViewSet(AsyncDispatchMixin, CompactPersonnelViewSetMixin, PrefetchPlanViewSetMixin, viewsets.ModelViewSet):
     queryset = PostFlying.objects.all()
     serializer_class = PostFlyingSerializer
+    compact_serializer_class = CompactPostFlyingSerializer
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
-        queryset = PostFlying.objects.all()
+        queryset = super().get_queryset()
         aircraft_id = self.request.query_params.get('aircraft_id')
         if aircraft_id:
             queryset = queryset.filter(aircraft_id=aircraft_id)
@@ -428,7 +737,6 @@ class PostFlyingViewSet(viewsets.ModelViewSet):
             return Response({'error': 'PIN is required'}, status=status.HTTP_400_BAD_REQUEST)
 
         post_flying.pilot = request.user
-        post_flying.pilot_pin = pin
         post_flying.pilot_signed_at = timezone.now()
         post_flying.save()
 
@@ -444,29 +752,113 @@ class PostFlyingViewSet(viewsets.ModelViewSet):
         if not pin:
             return Response({'error': 'PIN is required'}, status=status.HTTP_400_BAD_REQUEST)
 
-        post_flying.engineer = request.user
-        post_flying.engineer_pin = pin
-        post_flying.engineer_signed_at = timezone.now()
+        now = timezone.now()
+        with transaction.atomic():
+            # Claim the signature with a conditional UPDATE so concurrent sign-offs of the
+            # same record cannot both add its hours to the aircraft
+            claimed = PostFlying.objects.filter(pk=post_flying.pk, engineer_signed_at__isnull=True).update(
+                engineer_signed_at=now
+            )
+            if not claimed:
+                return Response({'error': 'Engineer has already signed'}, status=status.HTTP_400_BAD_REQUEST)
+
+            post_flying.engineer = request.user
+            post_flying.engineer_signed_at = now
+
+            # Set status based on flight status
+            if post_flying.flight_status == 'TERMINATED':
+                post_flying.status = 'TERMINATED'
+            else:
+                post_flying.status = 'COMPLETED'
+
+            post_flying.save(update_fields=['engineer', 'engineer_signed_at', 'status', 'updated_at'])
+
+            # Update aircraft data only if flight was completed (not terminated). The hours are
+            # added in the database so sign-offs for the same aircraft never overwrite each other.
+            if post_flying.flight_status == 'COMPLETED' and post_flying.flight_hours:
+                aircraft_updates = {
+                    'total_flying_hours': F('total_flying_hours') + post_flying.flight_hours,
+                    'updated_at': now,
+                }
+                if post_flying.fuel_level_after:
+                    aircraft_updates['current_fuel_level'] = post_flying.fuel_level_after
+                if post_flying.tire_pressure_main_after:
+                    aircraft_updates['tire_pressure_main'] = post_flying.tire_pressure_main_after
+                if post_flying.tire_pressure_nose_after:
+                    aircraft_updates['tire_pressure_nose'] = post_flying.tire_pressure_nose_after
+                Aircraft.objects.filter(pk=post_flying.aircraft_id).update(**aircraft_updates)
+                # QuerySet.update() sends no post_save, so refresh the dashboard explicitly
+                mark_dashboard_stale(post_flying.aircraft_id)
+
+        serializer = self.get_serializer(post_flying)
+        return Response(serializer.data)
 
-        # Set status based on flight status
-        if post_flying.flight_status == 'TERMINATED':
-            post_flying.status = 'TERMINATED'
-        else:
-            post_flying.status = 'COMPLETED'
 
-        post_flying.save()
+class UtilizationViewSet(AsyncDispatchMixin, PrefetchPlanViewSetMixin, viewsets.ReadOnlyModelViewSet):
+    """
+    Read-only access to a utilization rollup (see rollups.py), filtered by the query
+    parameters in `filter_params` and by `?start=` / `?end=` dates, inclusive.
+    """
+    permission_classes = [IsAuthenticated]
+    date_field = 'month'
+    filter_params = ('aircraft_id',)
+    # `?group_by=` choices for the summary action
+    summary_groups = {}
 
-        # Update aircraft data only if flight was completed (not terminated)
-        if post_flying.flight_status == 'COMPLETED' and post_flying.flight_hours:
-            aircraft = post_flying.aircraft
-            aircraft.total_flying_hours += post_flying.flight_hours
-            if post_flying.fuel_level_after:
-                aircraft.current_fuel_level = post_flying.fuel_level_after
-            if post_flying.tire_pressure_main_after:
-                aircraft.tire_pressure_main = post_flying.tire_pressure_main_after
-            if post_flying.tire_pressure_nose_after:
-                aircraft.tire_pressure_nose = post_flying.tire_pressure_nose_after
-            aircraft.save()
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        for param in self.filter_params:
+            value = self.request.query_params.get(param)
+            if value:
+                queryset = queryset.filter(**{param: value})
+        for param, lookup in (('start', 'gte'), ('end', 'lte')):
+            value = self.request.query_params.get(param)
+            if value:
+                parsed = parse_date(value) if len(value) == 10 else None
+                if parsed is None:
+                    raise ValidationError({param: 'Expected a date as YYYY-MM-DD'})
+                if self.date_field == 'month' and lookup == 'gte':
+                    # A month row covers the start date if the month contains it
+                    parsed = parsed.replace(day=1)
+                queryset = queryset.filter(**{f'{self.date_field}__{lookup}': parsed})
+        return queryset
 
-        serializer = self.get_serializer(post_flying)
-        return Response(serializer.data)
+    @action(detail=False, methods=['get'])
+    def summary(self, request):
+        """Totals over the filtered rows, optionally broken down with ?group_by="""
+        totals = {
+            field.name: Sum(field.name) for field in self.queryset.model._meta.concrete_fields
+            if isinstance(field, (PositiveIntegerField, DecimalField))
+        }
+        queryset = self.filter_queryset(self.get_queryset()).order_by()
+        group_by = request.query_params.get('group_by')
+        if not group_by:
+            return Response({name: value or 0 for name, value in queryset.aggregate(**totals).items()})
+        if group_by not in self.summary_groups:
+            return Response(
+                {'error': f"group_by must be one of: {', '.join(self.summary_groups)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        rows = queryset.annotate(group=self.summary_groups[group_by]).values('group').annotate(**totals).order_by('group')
+        return Response([{group_by: row.pop('group'), **row} for row in rows])
+
+
+class AircraftDailyUtilizationViewSet(UtilizationViewSet):
+    queryset = AircraftDailyUtilization.objects.all()
+    serializer_class = AircraftDailyUtilizationSerializer
+    date_field = 'date'
+    summary_groups = {'aircraft_id': F('aircraft_id'), 'month': TruncMonth('date')}
+
+
+class AircraftMissionUtilizationViewSet(UtilizationViewSet):
+    queryset = AircraftMissionUtilization.objects.all()
+    serializer_class = AircraftMissionUtilizationSerializer
+    filter_params = ('aircraft_id', 'mission_type')
+    summary_groups = {'aircraft_id': F('aircraft_id'), 'month': F('month'), 'mission_type': F('mission_type')}
+
+
+class PilotUtilizationViewSet(UtilizationViewSet):
+    queryset = PilotUtilization.objects.all()
+    serializer_class = PilotUtilizationSerializer
+    filter_params = ('pilot_id',)
+    summary_groups = {'pilot_id': F('pilot_id'), 'month': F('month')}
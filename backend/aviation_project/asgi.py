@@ -1,5 +1,8 @@
 """
 ASGI config for aviation_project project.
+
+Serve with an ASGI server, e.g.
+    gunicorn -k uvicorn.workers.UvicornWorker aviation_project.asgi:application
 """
 
 import os
@@ -8,4 +11,9 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'aviation_project.settings')
 
+# Sync code runs on a fresh thread for every ASGI request, so a connection kept open past the
+# request would never be reused. Close it (or return it to the pool, with DB_POOL=True) instead.
+os.environ.setdefault('DB_CONN_MAX_AGE', '0')
+os.environ.setdefault('ASYNC_VIEWS', 'True')
+
 application = get_asgi_application()
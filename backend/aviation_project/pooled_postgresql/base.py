@@ -0,0 +1,98 @@
+"""
+PostgreSQL backend that keeps connections in a per-process pool instead of opening one per
+request (or one per thread, with CONN_MAX_AGE). Enabled with DB_POOL=True; see settings.py.
+"""
+import os
+import threading
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.postgresql import base
+from psycopg2 import pool as psycopg2_pool
+
+
+class ConnectionPool(psycopg2_pool.ThreadedConnectionPool):
+    """
+    Thread-safe pool whose connections are opened by Django's own connection setup. Callers
+    wait up to `timeout` seconds for a free connection instead of failing straight away.
+    """
+
+    def __init__(self, min_size, max_size, timeout, connect):
+        self._new_connection = connect
+        self._available = threading.BoundedSemaphore(max_size)
+        self.timeout = timeout
+        super().__init__(min_size, max_size)
+
+    def _connect(self, key=None):
+        connection = self._new_connection()
+        if key is not None:
+            self._used[key] = connection
+            self._rused[id(connection)] = key
+        else:
+            self._pool.append(connection)
+        return connection
+
+    def checkout(self):
+        if not self._available.acquire(timeout=self.timeout):
+            raise psycopg2_pool.PoolError(f'No database connection available within {self.timeout}s')
+        try:
+            return self.getconn()
+        except Exception:
+            self._available.release()
+            raise
+
+    def checkin(self, connection, discard=False):
+        try:
+            # Open transactions are rolled back and broken connections dropped by putconn
+            self.putconn(connection, close=discard)
+        finally:
+            self._available.release()
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """
+    Connections are borrowed from the pool on connect and handed back on close, so
+    CONN_MAX_AGE=0 returns them after every request. Up to POOL_MIN_SIZE idle connections
+    stay open; at most POOL_MAX_SIZE are open at once, per process.
+    """
+
+    def _get_pool(self, conn_params):
+        # Keyed by pid as well: a pool must never be shared across a gunicorn fork
+        key = (self.alias, os.getpid())
+        with _pools_lock:
+            if key not in _pools:
+                min_size = int(self.settings_dict.get('POOL_MIN_SIZE', 2))
+                max_size = int(self.settings_dict.get('POOL_MAX_SIZE', 10))
+                if max_size < max(min_size, 1):
+                    raise ImproperlyConfigured('POOL_MAX_SIZE must be at least POOL_MIN_SIZE and 1')
+                # Opened through a plain wrapper so no thread's connection object is captured
+                opener = base.DatabaseWrapper(self.settings_dict, self.alias)
+                _pools[key] = ConnectionPool(
+                    min_size, max_size,
+                    timeout=float(self.settings_dict.get('POOL_TIMEOUT', 30)),
+                    connect=lambda: opener.get_new_connection(conn_params),
+                )
+            return _pools[key]
+
+    def get_new_connection(self, conn_params):
+        self.pool = self._get_pool(conn_params)
+        connection = self.pool.checkout()
+        if self.settings_dict['CONN_HEALTH_CHECKS']:
+            try:
+                with connection.cursor() as cursor:
+                    cursor.execute('SELECT 1')
+                connection.rollback()
+            except self.Database.Error:
+                # The server dropped it while it sat in the pool; replace it once
+                self.pool.checkin(connection, discard=True)
+                connection = self.pool.checkout()
+        return connection
+
+    def _close(self):
+        if self.connection is None:
+            return
+        with self.wrap_database_errors:
+            self.pool.checkin(self.connection, discard=self.errors_occurred)
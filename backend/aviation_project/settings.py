@@ -6,6 +6,7 @@ import os
 import time
 from pathlib import Path
 from datetime import timedelta
+from django.core.exceptions import ImproperlyConfigured
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -36,6 +37,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'aviation_app.metrics.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
@@ -77,9 +79,106 @@ DATABASES = {
         'PASSWORD': os.getenv('DB_PASSWORD', ''),
         'HOST': os.getenv('DB_HOST', ''),
         'PORT': os.getenv('DB_PORT', ''),
+        # Keep connections open between requests instead of reconnecting every time;
+        # 0 closes them after each request, None never does
+        'CONN_MAX_AGE': None if os.getenv('DB_CONN_MAX_AGE') == 'None' else int(os.getenv('DB_CONN_MAX_AGE', '60')),
+        'CONN_HEALTH_CHECKS': os.getenv('DB_CONN_HEALTH_CHECKS', 'True') == 'True',
     }
 }
 
+# Serve views as coroutines; turned on by asgi.py, off under WSGI where it would only add overhead
+ASYNC_VIEWS = os.getenv('ASYNC_VIEWS', 'False') == 'True'
+
+# Optional per-process connection pool for PostgreSQL. Connections go back to the pool at
+# the end of every request, so threaded or async workers share a few connections instead of
+# each thread holding its own.
+if os.getenv('DB_POOL', 'False') == 'True':
+    if DATABASES['default']['ENGINE'] != 'django.db.backends.postgresql':
+        raise ImproperlyConfigured('DB_POOL requires DB_ENGINE=django.db.backends.postgresql')
+    DATABASES['default'].update({
+        'ENGINE': 'aviation_project.pooled_postgresql',
+        'CONN_MAX_AGE': 0,
+        'POOL_MIN_SIZE': int(os.getenv('DB_POOL_MIN_SIZE', '2')),
+        'POOL_MAX_SIZE': int(os.getenv('DB_POOL_MAX_SIZE', '10')),
+        'POOL_TIMEOUT': int(os.getenv('DB_POOL_TIMEOUT', '30')),
+    })
+
+
+# Cache
+# CACHE_BACKEND selects where cached data lives: 'locmem' (per process, the default and the
+# stand-in used for tests and local development), 'file' (shared by workers on one host) or
+# 'redis' (shared by every worker and replica; any Redis-compatible server).
+CACHE_BACKEND = os.getenv('CACHE_BACKEND', 'locmem')
+CACHE_BACKENDS = {
+    'locmem': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'aviation',
+    },
+    'file': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.getenv('CACHE_LOCATION', str(BASE_DIR / 'cache')),
+    },
+    'redis': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.getenv('CACHE_LOCATION', 'redis://localhost:6379/1'),
+    },
+}
+CACHES = {
+    'default': {
+        **CACHE_BACKENDS[CACHE_BACKEND],
+        'KEY_PREFIX': 'aviation',
+        'TIMEOUT': int(os.getenv('CACHE_TIMEOUT', '300')),
+    },
+    # Revoked refresh tokens (aviation_app/tokens.py), each kept until it would have expired
+    'tokens': {
+        **CACHE_BACKENDS[CACHE_BACKEND],
+        'KEY_PREFIX': 'aviation-tokens',
+    },
+}
+# Dropping a revoked token before it expires accepts it again, so the store never evicts. Under
+# Redis it gets a server of its own (TOKEN_CACHE_LOCATION) run with maxmemory-policy noeviction
+# and append-only persistence, as k8s/redis-tokens-deployment.yaml and docker-compose.yml do.
+# Under locmem and file it is a store of its own, sized for the refreshes of one
+# REFRESH_TOKEN_LIFETIME, that drops only expired entries; once full, refreshes and logouts
+# answer 503 until entries expire (aviation_app/token_cache.py).
+if CACHE_BACKEND == 'redis':
+    CACHES['tokens']['LOCATION'] = os.getenv('TOKEN_CACHE_LOCATION', CACHES['tokens']['LOCATION'])
+else:
+    CACHES['tokens']['BACKEND'] = {
+        'locmem': 'aviation_app.token_cache.RevocationLocMemCache',
+        'file': 'aviation_app.token_cache.RevocationFileCache',
+    }[CACHE_BACKEND]
+    CACHES['tokens']['LOCATION'] += '-tokens'
+    CACHES['tokens']['OPTIONS'] = {'MAX_ENTRIES': int(os.getenv('TOKEN_CACHE_MAX_ENTRIES', '100000'))}
+
+
+# Password hashing (aviation_app/passwords.py). PASSWORD_HASHER picks the hasher for new and
+# upgraded hashes: 'scrypt' (the default), 'argon2' (needs argon2-cffi) or 'pbkdf2' (Django's
+# default). Hashes made by the others still verify and are rehashed on the user's next login.
+PASSWORD_HASHER = os.getenv('PASSWORD_HASHER', 'scrypt')
+PASSWORD_HASHER_CLASSES = {
+    'scrypt': 'aviation_app.passwords.TunedScryptPasswordHasher',
+    'argon2': 'aviation_app.passwords.TunedArgon2PasswordHasher',
+    'pbkdf2': 'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+}
+PASSWORD_HASHERS = [PASSWORD_HASHER_CLASSES[PASSWORD_HASHER]] + [
+    path for name, path in PASSWORD_HASHER_CLASSES.items() if name != PASSWORD_HASHER
+] + [
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+]
+PASSWORD_SCRYPT_WORK_FACTOR = int(os.getenv('PASSWORD_SCRYPT_WORK_FACTOR', str(2 ** 15)))
+PASSWORD_SCRYPT_BLOCK_SIZE = int(os.getenv('PASSWORD_SCRYPT_BLOCK_SIZE', '8'))
+PASSWORD_SCRYPT_PARALLELISM = int(os.getenv('PASSWORD_SCRYPT_PARALLELISM', '1'))
+PASSWORD_ARGON2_TIME_COST = int(os.getenv('PASSWORD_ARGON2_TIME_COST', '2'))
+PASSWORD_ARGON2_MEMORY_COST = int(os.getenv('PASSWORD_ARGON2_MEMORY_COST', '19456'))
+PASSWORD_ARGON2_PARALLELISM = int(os.getenv('PASSWORD_ARGON2_PARALLELISM', '1'))
+# Logins check passwords on PASSWORD_HASH_WORKERS threads per process (default: one per CPU the
+# container may use, see aviation_app/utils.py),
+# and get a 503 after waiting PASSWORD_HASH_TIMEOUT seconds for one
+PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', '0')) or None
+PASSWORD_HASH_TIMEOUT = float(os.getenv('PASSWORD_HASH_TIMEOUT', '10'))
+AUTHENTICATION_BACKENDS = ['aviation_app.passwords.PooledModelBackend']
 
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
@@ -125,16 +224,42 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # Custom User Model
 AUTH_USER_MODEL = 'aviation_app.User'
 
+# Authenticate API requests from the user claims in the access token (aviation_app/tokens.py)
+# instead of loading the user's row on every request. Revocations are checked through the
+# cache, whose entries are re-read from the database every TOKEN_REVOCATION_CACHE_TTL seconds.
+JWT_TOKEN_USER = os.getenv('JWT_TOKEN_USER', 'True') == 'True'
+TOKEN_REVOCATION_CACHE_TTL = int(os.getenv('TOKEN_REVOCATION_CACHE_TTL', '300'))
+
 # REST Framework
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'aviation_app.tokens.ClaimsJWTAuthentication' if JWT_TOKEN_USER
+        else 'rest_framework_simplejwt.authentication.JWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
     ),
+    'DEFAULT_PAGINATION_CLASS': 'aviation_app.pagination.ModelOrderingCursorPagination',
+    'PAGE_SIZE': int(os.getenv('API_PAGE_SIZE', '50')),
 }
 
+# Largest list accepted by the bulk create/update endpoints
+BULK_MAX_ITEMS = int(os.getenv('BULK_MAX_ITEMS', '1000'))
+
+# Rows fetched from the database and written per block by the streaming exports
+EXPORT_CHUNK_SIZE = int(os.getenv('EXPORT_CHUNK_SIZE', '2000'))
+
+# Request metrics: per-view SQL, serializer and wall time quantiles over each view's last
+# METRICS_WINDOW requests, served to staff at /api/metrics/. REQUEST_PROFILING lets staff add
+# ?profile=1 to a request to get its cProfile summary instead of the response.
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'True') == 'True'
+METRICS_WINDOW = int(os.getenv('METRICS_WINDOW', '1024'))
+REQUEST_PROFILING = os.getenv('REQUEST_PROFILING', 'True') == 'True'
+# Queries slower than SLOW_QUERY_MS, and queries a request repeats DUPLICATE_QUERY_THRESHOLD
+# times or more (a serializer resolving a foreign key per row), are logged with their view
+SLOW_QUERY_MS = float(os.getenv('SLOW_QUERY_MS', '100'))
+DUPLICATE_QUERY_THRESHOLD = int(os.getenv('DUPLICATE_QUERY_THRESHOLD', '3'))
+
 # JWT Settings
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=1),
@@ -142,8 +267,39 @@ SIMPLE_JWT = {
     'ROTATE_REFRESH_TOKENS': True,
     'BLACKLIST_AFTER_ROTATION': True,
     'AUTH_HEADER_TYPES': ('Bearer',),
+    'TOKEN_REFRESH_SERIALIZER': 'aviation_app.tokens.ClaimsTokenRefreshSerializer',
 }
 
+# Signing PINs (BFS tradesman and supervisor signatures)
+SIGNING_PIN_HASH_ITERATIONS = int(os.getenv('SIGNING_PIN_HASH_ITERATIONS', '20000'))
+SIGNING_PIN_CACHE_SIZE = int(os.getenv('SIGNING_PIN_CACHE_SIZE', '1024'))
+SIGNING_PIN_CACHE_TTL = int(os.getenv('SIGNING_PIN_CACHE_TTL', '900'))
+SIGNING_PIN_MAX_ATTEMPTS = int(os.getenv('SIGNING_PIN_MAX_ATTEMPTS', '5'))
+SIGNING_PIN_LOCKOUT_SECONDS = int(os.getenv('SIGNING_PIN_LOCKOUT_SECONDS', '300'))
+
+# Personnel directory cache (user display fields rendered by serializers)
+PERSONNEL_DIRECTORY_SIZE = int(os.getenv('PERSONNEL_DIRECTORY_SIZE', '5000'))
+PERSONNEL_DIRECTORY_LOCAL_TTL = int(os.getenv('PERSONNEL_DIRECTORY_LOCAL_TTL', '60'))
+PERSONNEL_DIRECTORY_SHARED_TTL = int(os.getenv('PERSONNEL_DIRECTORY_SHARED_TTL', '3600'))
+
+# Workflow event streams
+# EVENT_BROKER: 'inprocess' (streams only see events from their own worker), 'redis' (fan out
+# across all workers and replicas through EVENT_BROKER_URL) or a dotted path to a broker class
+EVENT_BROKER = os.getenv('EVENT_BROKER', 'inprocess')
+EVENT_BROKER_URL = os.getenv('EVENT_BROKER_URL', 'redis://localhost:6379/2')
+EVENT_STREAM_HEARTBEAT = int(os.getenv('EVENT_STREAM_HEARTBEAT', '15'))
+EVENT_STREAM_MAX_SECONDS = int(os.getenv('EVENT_STREAM_MAX_SECONDS', '300'))
+EVENT_STREAM_BUFFER = int(os.getenv('EVENT_STREAM_BUFFER', '100'))
+# Under WSGI each open stream holds a worker thread for up to EVENT_STREAM_MAX_SECONDS, so a few
+# browser tabs can take every worker; streams are refused with 501 there unless this is set
+# (e.g. for the threaded development server)
+EVENT_STREAMS_OVER_WSGI = os.getenv('EVENT_STREAMS_OVER_WSGI', 'False') == 'True'
+
+# Maintenance forecasting: an inspection is projected every MAINTENANCE_INTERVAL_HOURS flying
+# hours, each costing MAINTENANCE_INSPECTION_HOURS of maintenance work
+MAINTENANCE_INTERVAL_HOURS = float(os.getenv('MAINTENANCE_INTERVAL_HOURS', '100'))
+MAINTENANCE_INSPECTION_HOURS = float(os.getenv('MAINTENANCE_INSPECTION_HOURS', '8'))
+
 # CORS Settings
 CORS_ALLOWED_ORIGINS = os.getenv(
     'CORS_ALLOWED_ORIGINS',
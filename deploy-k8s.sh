@@ -47,10 +47,15 @@ kubectl apply -f k8s/configmap.yaml
 kubectl apply -f k8s/secret.yaml
 
 echo ""
-echo "Deploying PostgreSQL..."
+echo "Deploying PostgreSQL and Redis..."
 kubectl apply -f k8s/postgres-pvc.yaml
 kubectl apply -f k8s/postgres-deployment.yaml
 kubectl apply -f k8s/postgres-service.yaml
+kubectl apply -f k8s/redis-deployment.yaml
+kubectl apply -f k8s/redis-service.yaml
+kubectl apply -f k8s/redis-tokens-pvc.yaml
+kubectl apply -f k8s/redis-tokens-deployment.yaml
+kubectl apply -f k8s/redis-tokens-service.yaml
 
 echo ""
 echo "Waiting for PostgreSQL to be ready..."
@@ -27,7 +27,7 @@ echo -e "${GREEN}✓ Docker is running${NC}\n"
 
 # Step 2: Verify base images
 echo -e "${BLUE}[2/7] Verifying base images...${NC}"
-required_images=("python:3.11-slim" "node:18-alpine" "nginx:alpine" "postgres:15-alpine")
+required_images=("python:3.11-slim" "node:18-alpine" "nginx:alpine" "postgres:15-alpine" "redis:7-alpine")
 missing_images=()
 
 for image in "${required_images[@]}"; do
@@ -110,11 +110,16 @@ kubectl apply -f k8s/secret.yaml
 echo -e "${GREEN}✓ ConfigMap and Secrets created${NC}"
 
 # Deploy PostgreSQL
-echo "Deploying PostgreSQL..."
+echo "Deploying PostgreSQL and Redis..."
 kubectl apply -f k8s/postgres-pvc.yaml
 kubectl apply -f k8s/postgres-deployment.yaml
 kubectl apply -f k8s/postgres-service.yaml
-echo -e "${GREEN}✓ PostgreSQL resources created${NC}"
+kubectl apply -f k8s/redis-deployment.yaml
+kubectl apply -f k8s/redis-service.yaml
+kubectl apply -f k8s/redis-tokens-pvc.yaml
+kubectl apply -f k8s/redis-tokens-deployment.yaml
+kubectl apply -f k8s/redis-tokens-service.yaml
+echo -e "${GREEN}✓ PostgreSQL and Redis resources created${NC}"
 
 # Wait for PostgreSQL
 echo "Waiting for PostgreSQL to be ready (this may take 1-2 minutes)..."
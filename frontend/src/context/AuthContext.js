@@ -121,6 +121,11 @@ export const AuthProvider = ({ children }) => {
   };
 
   const logout = () => {
+    const refresh = localStorage.getItem('refresh_token');
+    if (refresh) {
+      // Revoke the refresh token server-side; signing out locally does not wait for it
+      axios.post('/api/auth/logout/', { refresh }).catch(() => {});
+    }
     setUser(null);
     setToken(null);
     setSelectedAircraft(null);
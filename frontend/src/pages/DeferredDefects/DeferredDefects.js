@@ -1,6 +1,6 @@
 import { useState, useEffect } from 'react';
 import { useAuth } from '../../context/AuthContext';
-import axios from 'axios';
+import { fetchAllPages } from '../../utils/pagination';
 import { FaCircleExclamation, FaPlus } from 'react-icons/fa6';
 import '../SharedStyles.css';
 
@@ -17,8 +17,7 @@ const DeferredDefects = () => {
 
   const fetchDefects = async () => {
     try {
-      const response = await axios.get(`/api/deferred-defects/?aircraft_id=${selectedAircraft.id}`);
-      setDefects(response.data);
+      setDefects(await fetchAllPages(`/api/deferred-defects/?aircraft_id=${selectedAircraft.id}&page_size=500`));
     } catch (error) {
       console.error('Failed to fetch deferred defects:', error);
     } finally {
@@ -17,9 +17,8 @@ const LeadingParticulars = () => {
 
   const fetchParticulars = async () => {
     try {
-      const response = await axios.get(`/api/leading-particulars/`);
-      const aircraftParticulars = response.data.find(p => p.aircraft === selectedAircraft.id);
-      setParticulars(aircraftParticulars);
+      const response = await axios.get(`/api/leading-particulars/?aircraft_id=${selectedAircraft.id}`);
+      setParticulars(response.data.results[0]);
     } catch (error) {
       console.error('Failed to fetch leading particulars:', error);
     } finally {
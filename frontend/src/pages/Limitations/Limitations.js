@@ -1,6 +1,6 @@
 import { useState, useEffect } from 'react';
 import { useAuth } from '../../context/AuthContext';
-import axios from 'axios';
+import { fetchAllPages } from '../../utils/pagination';
 import { FaTriangleExclamation, FaPlus } from 'react-icons/fa6';
 import '../SharedStyles.css';
 
@@ -17,8 +17,7 @@ const Limitations = () => {
 
   const fetchLimitations = async () => {
     try {
-      const response = await axios.get(`/api/limitations/?aircraft_id=${selectedAircraft.id}`);
-      setLimitations(response.data);
+      setLimitations(await fetchAllPages(`/api/limitations/?aircraft_id=${selectedAircraft.id}&page_size=500`));
     } catch (error) {
       console.error('Failed to fetch limitations:', error);
     } finally {
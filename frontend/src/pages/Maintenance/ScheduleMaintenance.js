@@ -468,22 +468,41 @@ const ScheduleMaintenance = () => {
       showAlert('error', 'ATO must sign to complete the job card');
       return;
     }
+    const badHours = SECTIONS.flatMap(section => jobs[section]).filter(job => {
+      const hours = Number(job.manHours);
+      return String(job.manHours ?? '').trim() === '' || !Number.isFinite(hours) || hours <= 0 || hours >= 1000;
+    });
+    if (badHours.length > 0) {
+      showAlert('error', `Enter man hours (more than 0, under 1000) for ${badHours.length} job(s)`);
+      return;
+    }
 
-    const payload = {
-      aircraft_id: selectedAircraft?.id,
-      maintenance_type: maintenanceType,
-      sections: SECTIONS.map(section => ({
-        name: section,
-        jobs: jobs[section].map(job => ({
-          description: job.description,
-          man_hours: job.manHours,
-          remarks: job.remarks,
+    // One item per job, created together in a single bulk request; the date is the local one.
+    // Job cards are periodic inspections, so they are ROUTINE; the card's own type is kept in
+    // inspection_type
+    const now = new Date();
+    const today = [
+      now.getFullYear(),
+      String(now.getMonth() + 1).padStart(2, '0'),
+      String(now.getDate()).padStart(2, '0'),
+    ].join('-');
+    const payload = SECTIONS.flatMap(section =>
+      jobs[section].map(job => ({
+        aircraft: selectedAircraft?.id,
+        maintenance_type: 'ROUTINE',
+        inspection_type: maintenanceType,
+        scheduled_date: today,
+        section,
+        description: job.description,
+        estimated_hours: Number(job.manHours).toFixed(2),
+        remarks: job.remarks,
+        sign_off: {
           tradesmen: job.tradesmen.map(t => ({ pno: t.pno, name: t.name })),
           supervisors: job.supervisors.map(s => ({ pno: s.pno, name: s.name })),
-        })),
-      })),
-      ato_signature: atoSignature,
-    };
+          ato_signature: atoSignature,
+        },
+      }))
+    );
 
     try {
       setSaving(true);
@@ -492,7 +511,10 @@ const ScheduleMaintenance = () => {
       setTimeout(() => navigate('/maintenance'), 2000);
     } catch (error) {
       console.error('Failed to save maintenance:', error);
-      showAlert('error', 'Failed to save maintenance record.');
+      const failed = error.response?.data?.errors;
+      showAlert('error', failed
+        ? `Failed to save ${failed.length} of ${payload.length} jobs; nothing was saved.`
+        : 'Failed to save maintenance record.');
     } finally {
       setSaving(false);
     }
@@ -1,6 +1,6 @@
 import { useState, useEffect } from 'react';
 import { useAuth } from '../../context/AuthContext';
-import axios from 'axios';
+import { fetchAllPages } from '../../utils/pagination';
 import { Line } from 'react-chartjs-2';
 import { FaChartLine } from 'react-icons/fa6';
 import '../SharedStyles.css';
@@ -18,8 +18,7 @@ const MaintenanceForecast = () => {
 
   const fetchForecasts = async () => {
     try {
-      const response = await axios.get(`/api/maintenance-forecasts/?aircraft_id=${selectedAircraft.id}`);
-      setForecasts(response.data);
+      setForecasts(await fetchAllPages(`/api/maintenance-forecasts/?aircraft_id=${selectedAircraft.id}&page_size=500`));
     } catch (error) {
       console.error('Failed to fetch maintenance forecasts:', error);
     } finally {
@@ -0,0 +1,19 @@
+import axios from 'axios';
+
+// List endpoints are cursor-paginated: follow `next` until every page is loaded. Only the
+// path and query of `next` are used, since behind a proxy its host is the backend's.
+export const fetchAllPages = async (url) => {
+  const results = [];
+  let next = url;
+  while (next) {
+    const response = await axios.get(next);
+    results.push(...response.data.results);
+    if (response.data.next) {
+      const nextUrl = new URL(response.data.next, window.location.origin);
+      next = nextUrl.pathname + nextUrl.search;
+    } else {
+      next = null;
+    }
+  }
+  return results;
+};
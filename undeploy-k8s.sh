@@ -27,16 +27,21 @@ kubectl delete -f k8s/backend-service.yaml --ignore-not-found=true
 kubectl delete -f k8s/backend-deployment.yaml --ignore-not-found=true
 
 echo ""
-echo "Deleting PostgreSQL..."
+echo "Deleting PostgreSQL and Redis..."
 kubectl delete -f k8s/postgres-service.yaml --ignore-not-found=true
 kubectl delete -f k8s/postgres-deployment.yaml --ignore-not-found=true
+kubectl delete -f k8s/redis-service.yaml --ignore-not-found=true
+kubectl delete -f k8s/redis-deployment.yaml --ignore-not-found=true
+kubectl delete -f k8s/redis-tokens-service.yaml --ignore-not-found=true
+kubectl delete -f k8s/redis-tokens-deployment.yaml --ignore-not-found=true
 
 echo ""
 read -p "Delete persistent data (database)? (y/N) " -n 1 -r
 echo
 if [[ $REPLY =~ ^[Yy]$ ]]; then
-    echo "Deleting PVC..."
+    echo "Deleting PVCs..."
     kubectl delete -f k8s/postgres-pvc.yaml --ignore-not-found=true
+    kubectl delete -f k8s/redis-tokens-pvc.yaml --ignore-not-found=true
 fi
 
 echo ""